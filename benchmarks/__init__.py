@@ -0,0 +1,9 @@
+"""Offline benchmarks for starlette-discord.
+
+Run from the repository root, e.g. ``python -m benchmarks.bench_json``.
+
+``python -m benchmarks.suite`` runs every micro-benchmark of the library's hot paths, and
+``python -m benchmarks.compare`` checks them against ``benchmarks/baseline.json``. Refresh the
+baseline with ``python -m benchmarks.suite --output benchmarks/baseline.json`` when a change is
+expected to move the numbers.
+"""
@@ -0,0 +1,75 @@
+"""Measures the cost of ``import starlette_discord`` in a fresh interpreter.
+
+Reports the import time and the resident memory added by the import, and fails if a module
+that should only be imported lazily (such as discord.py) was imported.
+
+Usage: ``python -m benchmarks.bench_import [--runs N] [--max-ms MS]``
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# modules that must not be imported by ``import starlette_discord``.
+LAZY_MODULES = ("discord", "numpy")
+
+_PROBE = """
+import json, resource, sys, time
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+import starlette_discord
+elapsed = time.perf_counter() - start
+after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({
+    "ms": elapsed * 1000,
+    "rss_kib": after - before,
+    "modules": sorted(name for name in %r if name in sys.modules),
+}))
+"""
+
+
+def probe():
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE % (LAZY_MODULES,)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument(
+        "--max-ms", type=float, default=None, help="fail if the median import time exceeds this"
+    )
+    args = parser.parse_args()
+
+    results = [probe() for _ in range(args.runs)]
+    times = [r["ms"] for r in results]
+    rss = [r["rss_kib"] for r in results]
+    leaked = sorted({name for r in results for name in r["modules"]})
+
+    title = f"import starlette_discord, {args.runs} runs"
+    print(title)
+    print("-" * len(title))
+    print(f"median time   {statistics.median(times):>8.1f} ms")
+    print(f"min time      {min(times):>8.1f} ms")
+    print(f"median RSS    {statistics.median(rss) / 1024:>8.1f} MiB")
+    print(f"lazy modules  {', '.join(leaked) or 'none imported'}")
+
+    failed = False
+    if leaked:
+        print(f"FAIL: {', '.join(leaked)} imported eagerly", file=sys.stderr)
+        failed = True
+    if args.max_ms is not None and statistics.median(times) > args.max_ms:
+        print(f"FAIL: median import time above {args.max_ms} ms", file=sys.stderr)
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
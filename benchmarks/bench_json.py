@@ -0,0 +1,66 @@
+"""Compares JSON decoding paths for API and token responses.
+
+``resp.json()`` decodes the body to str and then parses it with the stdlib, which is what the
+library did before responses were read as bytes and handed to the configured decoder.
+"""
+
+import asyncio
+import json
+
+from oauthlib.oauth2 import WebApplicationClient
+
+from starlette_discord import DiscordOAuthClient
+from starlette_discord.utils import json_loads, orjson
+
+from .common import bench, report
+from .payloads import encode, guilds, token
+
+
+def main():
+    for count in (20, 200):
+        body = encode(guilds(count))
+        results = {
+            "json.loads(body.decode())": bench(lambda: json.loads(body.decode("utf-8"))),
+            "json.loads(body)": bench(lambda: json.loads(body)),
+        }
+        if orjson is not None:
+            results["orjson.loads(body)"] = bench(lambda: orjson.loads(body))
+        results["utils.json_loads(body)"] = bench(lambda: json_loads(body))
+        report(
+            f"/users/@me/guilds, {count} guilds ({len(body)} bytes)",
+            results,
+            baseline="json.loads(body.decode())",
+        )
+
+    scope = "identify guilds"
+    body = encode(token(scope))
+    client = DiscordOAuthClient(
+        1, "secret", "https://example.com", scopes=scope.split()
+    )
+
+    async def make_session():
+        session = client.session("code")
+        await session.close()
+        await client.shutdown()
+        return session
+
+    session = asyncio.run(make_session())
+    oauthlib_client = WebApplicationClient("1")
+    report(
+        "/oauth2/token response",
+        {
+            "oauthlib parse_request_body_response": bench(
+                lambda: oauthlib_client.parse_request_body_response(
+                    body.decode("utf-8"), scope=scope
+                )
+            ),
+            "session._parse_token_response": bench(
+                lambda: session._parse_token_response(body)
+            ),
+        },
+        baseline="oauthlib parse_request_body_response",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Reports the memory cost of cached models.
+
+For every model, the retained bytes per object are reported:
+
+- ``object``: the model itself, when created with ``keep_json=False``.
+- ``object + payload``: the model and the raw payload it keeps a reference to (``keep_json=True``).
+- ``with __dict__``: the same model without ``__slots__``, for comparison.
+
+Usage: ``python -m benchmarks.bench_memory [--count N]`` (defaults to 1,000,000 objects).
+"""
+
+import argparse
+import gc
+import random
+import sys
+import tracemalloc
+
+from starlette_discord import Connection, Guild, User
+
+from .payloads import connections, guild, user
+
+
+def deep_size(obj, seen=None):
+    """Approximate size of an object and everything it references, in bytes."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(deep_size(item, seen) for item in obj)
+    return size
+
+
+def retained(factory, payloads, count):
+    """Bytes retained per object when ``count`` objects are built from ``payloads``."""
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    objects = [factory(payloads[i % len(payloads)]) for i in range(count)]
+    # don't count the list holding the objects.
+    end = tracemalloc.get_traced_memory()[0] - sys.getsizeof(objects)
+    tracemalloc.stop()
+    del objects
+    return (end - start) / count
+
+
+def _unslotted(cls):
+    # a subclass without __slots__ gets a __dict__, like the models used to.
+    return type(f"Unslotted{cls.__name__}", (cls,), {})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    # a pool of distinct payloads, reused so the payloads themselves stay out of the measurement.
+    models = {
+        "User": (User, [user(seed) for seed in range(1000)]),
+        "Guild": (Guild, [guild(rng) for _ in range(1000)]),
+        "Connection": (Connection, connections(1000)),
+    }
+
+    title = f"Retained bytes per model, {args.count:,} objects"
+    print(title)
+    print("-" * len(title))
+    print(f"{'model':<12}{'object':>10}{'object + payload':>20}{'with __dict__':>16}")
+    for name, (cls, payloads) in models.items():
+        slotted = retained(lambda d: cls(data=d, keep_json=False), payloads, args.count)
+        unslotted_cls = _unslotted(cls)
+        unslotted = retained(lambda d: unslotted_cls(data=d), payloads, args.count)
+        payload = sum(deep_size(p) for p in payloads) / len(payloads)
+        print(f"{name:<12}{slotted:>10.0f}{slotted + payload:>20.0f}{unslotted:>16.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Measures model construction from realistic payloads.
+
+Usage: ``python -m benchmarks.bench_models``
+"""
+
+import random
+
+from starlette_discord import Connection, Guild, GuildList, User
+
+from .common import bench, report
+from .payloads import connections, guild, guilds, user
+
+
+def cases():
+    """Returns the ``{name: callable}`` cases run by this module and by :mod:`benchmarks.suite`."""
+    user_payload = user()
+    guild_payload = guild(random.Random(0))
+    connection_payload = connections(1)[0]
+    guild_payloads = guilds(200)
+
+    return {
+        "models.User": lambda: User(data=user_payload),
+        "models.User(keep_json=False)": lambda: User(data=user_payload, keep_json=False),
+        "models.Guild": lambda: Guild(data=guild_payload),
+        "models.Connection": lambda: Connection(data=connection_payload),
+        "models.GuildList(200)": lambda: GuildList(guild_payloads),
+        "models.GuildList(200) iterate": lambda: list(GuildList(guild_payloads)),
+        "models.GuildList(200) lookup": lambda: GuildList(guild_payloads).get(
+            guild_payloads[-1]["id"]
+        ),
+    }
+
+
+def main():
+    report("Model construction", {name: bench(func) for name, func in cases().items()})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Measures the CPU cost of the OAuth2 flow, excluding the network.
+
+Covers building the login redirect, preparing and parsing token exchange and refresh
+requests (and sending them to a stubbed token endpoint), encoding session cookies
+and constructing sessions.
+
+Usage: ``python -m benchmarks.bench_oauth``
+"""
+
+import asyncio
+
+from starlette_discord import DiscordOAuthClient, GuildList, User
+from starlette_discord.cookie import CookieCodec
+
+from .common import bench, report, run_sync
+from .payloads import encode, guilds, token, user
+
+SCOPES = ("identify", "guilds")
+
+
+def cases(client):
+    """Returns the ``{name: callable}`` cases run by this module and by :mod:`benchmarks.suite`.
+
+    Must be called from a running event loop, since sessions can only be created inside one.
+    Sessions are detached from the client's pool, so they aren't reported as leaked once collected.
+    """
+    token_body = encode(token(" ".join(SCOPES)))
+    refresh_token = token()["refresh_token"]
+    grants = client.grants
+
+    class Response:
+        # stands in for the token endpoint's response, so no network is involved.
+        status = 200
+
+        async def read(self):
+            return token_body
+
+        def release(self):
+            pass
+
+    async def request(method, url, **kwargs):
+        return Response()
+
+    state = client.new_state(bind="session-id")
+    codec = CookieCodec(b"0123456789abcdef0123456789abcdef")
+    cookie_args = (token(), User(data=user()), GuildList(guilds(100)))
+    cookie = codec.dumps(*cookie_args)
+
+    return {
+        "oauth.redirect": lambda: client.redirect(),
+        "oauth.redirect(state)": lambda: client.redirect(state="abcdef0123456789"),
+        "oauth.new_state": lambda: client.new_state(bind="session-id"),
+        "oauth.verify_state": lambda: client.verify_state(state, bind="session-id"),
+        "oauth.prepare_token_request": lambda: grants.code_body("code"),
+        "oauth.prepare_refresh_request": lambda: grants.refresh_body(refresh_token),
+        "oauth.parse_token_response": lambda: grants.parse(token_body),
+        "oauth.exchange": lambda: run_sync(grants.exchange(request, "code")),
+        "oauth.refresh": lambda: run_sync(grants.refresh(request, refresh_token)),
+        "cookie.dumps(100 guilds)": lambda: codec.dumps(*cookie_args),
+        "cookie.loads(100 guilds)": lambda: codec.loads(cookie),
+        "oauth.session(code)": lambda: client.session("code").detach(),
+        "oauth.session_from_token": lambda: client.session_from_token(
+            dict(token())
+        ).detach(),
+        "oauth.user_session": lambda: client.user_session(dict(token())),
+    }
+
+
+def make_client():
+    return DiscordOAuthClient(
+        1,
+        "secret",
+        "https://example.com/callback",
+        scopes=SCOPES,
+        state_secret=b"0123456789abcdef0123456789abcdef",
+    )
+
+
+def main():
+    async def run():
+        client = make_client()
+        try:
+            return {name: bench(func) for name, func in cases(client).items()}
+        finally:
+            await client.shutdown()
+
+    report("OAuth2 flow", asyncio.run(run()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Compares the cost of a DiscordOAuthSession with a lightweight UserSession handle.
+
+Reports construction time, and the memory retained per session while ``--count`` sessions
+are alive at once, as a server holding one per in-flight request would.
+
+Usage: ``python -m benchmarks.bench_session [--count N]`` (defaults to 10,000 sessions).
+"""
+
+import argparse
+import asyncio
+import gc
+import tracemalloc
+
+from .bench_oauth import make_client
+from .common import bench, report
+from .payloads import token
+
+
+def retained(factory, count):
+    """Bytes retained per object while ``count`` objects made by ``factory`` are alive."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory() for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return (after - before) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=10_000)
+    args = parser.parse_args()
+
+    async def run():
+        client = make_client()
+        sessions = []
+
+        def oauth_session():
+            session = client.session_from_token(dict(token()))
+            sessions.append(session)
+            return session
+
+        factories = {
+            "DiscordOAuthSession": oauth_session,
+            "UserSession": lambda: client.user_session(dict(token())),
+        }
+        try:
+            timings = {name: bench(factory) for name, factory in factories.items()}
+            memory = {name: retained(factory, args.count) for name, factory in factories.items()}
+        finally:
+            # sessions borrow the client's pool, detach them so they aren't reported as leaked.
+            for session in sessions:
+                session.detach()
+            await client.shutdown()
+        return timings, memory
+
+    timings, memory = asyncio.run(run())
+    report("Session construction", timings, baseline="DiscordOAuthSession")
+
+    title = f"Memory per session ({args.count} alive)"
+    print(title)
+    print("-" * len(title))
+    width = max(len(name) for name in memory)
+    for name, size in memory.items():
+        ratio = memory["DiscordOAuthSession"] / size
+        print(f"{name:<{width}}  {size:>10.0f} bytes  {ratio:>6.2f}x")
+    print()
+
+
+if __name__ == "__main__":
+    main()
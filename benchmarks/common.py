@@ -0,0 +1,70 @@
+"""Shared helpers for the benchmark scripts."""
+
+import statistics
+import timeit
+
+
+def bench(func, repeat=5, min_time=0.2):
+    """Returns the best time per call of ``func``, in nanoseconds."""
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    if elapsed < min_time:
+        number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    best = min(timer.repeat(repeat=repeat, number=number))
+    return best / number * 1e9
+
+
+def calibration():
+    """A fixed pure-Python workload, timed with the suite to correct for the machine's speed."""
+    values = {}
+    for i in range(100):
+        values[str(i)] = i * 2
+    return sum(values.values())
+
+
+def bench_quartiles(cases, rounds=25, sample_time=0.02):
+    """Times ``{name: func}`` cases, returning ``{name: (q1, median, q3)}`` in nanoseconds per call.
+
+    Every round times each case once, so slow periods of a noisy machine are spread over all
+    the cases instead of skewing whichever case happened to be running.
+    """
+    timers = {}
+    for name, func in cases.items():
+        timer = timeit.Timer(func)
+        number, elapsed = timer.autorange()
+        timers[name] = (timer, max(1, int(number * sample_time / max(elapsed, 1e-9))))
+
+    samples = {name: [] for name in cases}
+    for _ in range(rounds):
+        for name, (timer, number) in timers.items():
+            samples[name].append(timer.timeit(number) / number * 1e9)
+    return {name: tuple(statistics.quantiles(values, n=4)) for name, values in samples.items()}
+
+
+def run_sync(coro):
+    """Runs a coroutine that never suspends to completion, returning its result.
+
+    Lets coroutines whose I/O is faked be benchmarked without an event loop.
+    """
+    try:
+        coro.send(None)
+    except StopIteration as e:
+        return e.value
+    coro.close()
+    raise RuntimeError("The coroutine suspended.")
+
+
+def report(title, results, baseline=None):
+    """Prints a table of ``{name: ns per call}`` results.
+
+    If ``baseline`` names one of the results, the speedup over it is shown as well.
+    """
+    print(title)
+    print("-" * len(title))
+    width = max(len(name) for name in results)
+    for name, ns in results.items():
+        line = f"{name:<{width}}  {ns / 1000:>10.2f} us"
+        if baseline is not None:
+            line += f"  {results[baseline] / ns:>6.2f}x"
+        print(line)
+    print()
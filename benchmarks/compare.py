@@ -0,0 +1,100 @@
+"""Compares benchmark results against a baseline and fails on regressions.
+
+Usage: ``python -m benchmarks.compare [--baseline FILE] [--results FILE] [--threshold 0.3]``
+
+Without ``--results``, the suite is run now. Timings only compare meaningfully when measured
+on the same machine. Even then, a shared VM can run everything 30% faster or slower from one
+run to the next, so the baseline is first scaled by how much faster or slower the
+``calibration`` case ran. A case regresses when its median is slower than the scaled baseline
+by more than ``threshold`` (a fraction, so ``0.3`` is 30%). Exits with status 1 if any case
+regressed.
+
+The default threshold was measured on a single-CPU VM: across 30 pairs of runs of an unchanged
+tree, no case changed by more than 28% after scaling, while making ``Guild`` parse its payload
+twice (about 40% slower) was caught in 11 of 12 comparisons.
+"""
+
+import argparse
+import json
+import sys
+
+from . import suite
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def _scale(baseline, current):
+    before = baseline["results"].get("calibration")
+    after = current["results"].get("calibration")
+    if not before or not after:
+        return 1.0
+    return after / before
+
+
+def compare(baseline, current, threshold):
+    """Prints a comparison table, returning the names of the cases that regressed.
+
+    ``baseline`` and ``current`` are results as saved by :mod:`benchmarks.suite`.
+    """
+    scale = _scale(baseline, current)
+    before_results, after_results = baseline["results"], current["results"]
+    quartiles = current.get("quartiles", {})
+
+    names = [name for name in before_results if name != "calibration"]
+    names += [name for name in after_results if name not in before_results]
+    width = max(len(name) for name in names)
+    print(f"Baseline scaled by {scale:.2f} for the machine's speed.\n")
+    print(f"{'case':<{width}}  {'baseline':>12}  {'current':>12}  {'spread':>7}  {'change':>8}")
+
+    regressions = []
+    for name in names:
+        before, after = before_results.get(name), after_results.get(name)
+        if before is None or after is None:
+            before_text = "" if before is None else f"{before * scale / 1000:.2f} us"
+            after_text = "" if after is None else f"{after / 1000:.2f} us"
+            status = "new" if before is None else "missing"
+            print(f"{name:<{width}}  {before_text:>12}  {after_text:>12}  {'':>7}  {status:>8}")
+            continue
+
+        before *= scale
+        change = after / before - 1
+        # the interquartile range of the current run, relative to its median.
+        q1, q3 = quartiles.get(name, (after, after))
+        spread = f"{(q3 - q1) / after:.0%}"
+        line = (
+            f"{name:<{width}}  {before / 1000:>9.2f} us  {after / 1000:>9.2f} us"
+            f"  {spread:>7}  {change:>+8.1%}"
+        )
+        if change > threshold:
+            regressions.append(name)
+            line += "  REGRESSION"
+        print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--baseline", default=suite.BASELINE)
+    parser.add_argument(
+        "--results", help="results saved by benchmarks.suite, runs the suite if omitted"
+    )
+    parser.add_argument("--threshold", type=float, default=0.3)
+    args = parser.parse_args()
+
+    baseline = load(args.baseline)
+    current = load(args.results) if args.results else suite.run()
+
+    if baseline.get("environment") != current.get("environment"):
+        print("Warning: the baseline was measured in a different environment.", file=sys.stderr)
+
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} case(s) regressed by more than {args.threshold:.0%}.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
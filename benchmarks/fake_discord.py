@@ -0,0 +1,265 @@
+"""A local stand-in for the parts of the Discord API the library uses.
+
+Serves ``/oauth2/token`` (authorization code and refresh grants), ``/users/@me``,
+``/users/@me/guilds`` (with pagination), ``/users/@me/connections`` and the guild member
+``PUT``, with configurable latency, rate limit headers and injected ``429`` and ``5xx`` errors.
+
+Usage: ``python -m benchmarks.fake_discord [--port 8765] [--latency 0.05] ...``
+
+Point a client at it with ``DiscordOAuthClient(..., api_url="http://127.0.0.1:8765/api/v9")``
+and ``OAUTHLIB_INSECURE_TRANSPORT=1``, since it is served over plain HTTP.
+"""
+
+import argparse
+import asyncio
+import itertools
+import random
+import time
+
+from aiohttp import web
+
+from .payloads import connections, guilds, token, user
+
+
+class FakeDiscord:
+    """Configuration and state of a fake Discord API.
+
+    Parameters
+    ----------
+    latency: :class:`float`
+        Mean seconds each response is delayed by.
+    jitter: :class:`float`
+        Maximum seconds added to or removed from ``latency``, uniformly at random.
+    ratelimit: :class:`int`
+        Requests allowed per route and access token in each ``ratelimit_window``, for requests
+        made with a user's access token. Exceeding it returns a ``429``. ``0`` disables it.
+    ratelimit_window: :class:`float`
+        Seconds after which rate limit buckets reset.
+    ratelimit_rate: :class:`float`
+        Probability of a request being rate limited regardless of its bucket.
+    error_rate: :class:`float`
+        Probability of a request failing with a ``502``.
+    guild_count: :class:`int`
+        Number of guilds every user is in.
+    scope: :class:`str`
+        Scope granted to every token, which should match the scope the client requests.
+    seed: :class:`int`
+        Seed for the random payloads and injected failures.
+    """
+
+    def __init__(
+        self,
+        *,
+        latency=0.0,
+        jitter=0.0,
+        ratelimit=5,
+        ratelimit_window=1.0,
+        ratelimit_rate=0.0,
+        error_rate=0.0,
+        guild_count=50,
+        scope="identify guilds",
+        seed=0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.ratelimit = ratelimit
+        self.ratelimit_window = ratelimit_window
+        self.ratelimit_rate = ratelimit_rate
+        self.error_rate = error_rate
+        self.guild_count = guild_count
+        self.scope = scope
+        self._rng = random.Random(seed)
+        self._ids = itertools.count(1)
+        self._guilds = sorted(guilds(guild_count, seed), key=lambda g: int(g["id"]))
+        self._connections = connections(3, seed)
+        self._tokens = {}
+        self._refresh_tokens = {}
+        self._buckets = {}
+        self.requests = 0
+        # transports are kept alive so closed connections aren't counted again under a reused id.
+        self.connections = set()
+        self.statuses = {}
+
+    def app(self):
+        """Returns the :class:`aiohttp.web.Application` serving the fake API."""
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_post("/api/v9/oauth2/token", self._token)
+        app.router.add_get("/api/v9/users/@me", self._identify)
+        app.router.add_get("/api/v9/users/@me/guilds", self._user_guilds)
+        app.router.add_get("/api/v9/users/@me/connections", self._user_connections)
+        app.router.add_put("/api/v9/guilds/{guild_id}/members/{user_id}", self._add_member)
+        return app
+
+    async def serve(self, host="127.0.0.1", port=0):
+        """Starts serving, returning ``(runner, base API URL)``. Port ``0`` picks a free port."""
+        runner = web.AppRunner(self.app(), access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, host, port)
+        await site.start()
+        port = runner.addresses[0][1]
+        return runner, f"http://{host}:{port}/api/v9"
+
+    def _bucket(self, request):
+        resource = request.match_info.route.resource
+        route = resource.canonical if resource is not None else request.path
+        return f"{request.method} {route}", request.headers.get("Authorization", "")
+
+    @web.middleware
+    async def _middleware(self, request, handler):
+        self.requests += 1
+        self.connections.add(request.transport)
+        delay = self.latency + self._rng.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if self._rng.random() < self.error_rate:
+            resp = web.json_response({"message": "Bad Gateway", "code": 0}, status=502)
+        else:
+            resp = self._ratelimited(request) or await handler(request)
+        self.statuses[resp.status] = self.statuses.get(resp.status, 0) + 1
+        return resp
+
+    def _ratelimited(self, request):
+        route, auth = self._bucket(request)
+        if not self.ratelimit or not auth.startswith("Bearer"):
+            if self._rng.random() < self.ratelimit_rate:
+                return self._too_many_requests({"Retry-After": "0.100"}, 0.1)
+            return None
+
+        now = time.monotonic()
+        reset_at, remaining = self._buckets.get((route, auth), (0.0, 0))
+        if now >= reset_at:
+            reset_at, remaining = now + self.ratelimit_window, self.ratelimit
+        forced = self._rng.random() < self.ratelimit_rate
+        if not forced:
+            remaining = max(remaining - 1, -1)
+        self._buckets[(route, auth)] = (reset_at, remaining)
+
+        headers = {
+            "X-RateLimit-Bucket": format(abs(hash(route)), "x"),
+            "X-RateLimit-Limit": str(self.ratelimit),
+            "X-RateLimit-Remaining": str(max(remaining, 0)),
+            "X-RateLimit-Reset-After": f"{reset_at - now:.3f}",
+        }
+        if forced or remaining < 0:
+            retry_after = reset_at - now
+            headers["Retry-After"] = f"{retry_after:.3f}"
+            return self._too_many_requests(headers, retry_after)
+        request["ratelimit_headers"] = headers
+        return None
+
+    def _too_many_requests(self, headers, retry_after):
+        body = {
+            "message": "You are being rate limited.",
+            "retry_after": retry_after,
+            "global": False,
+        }
+        return web.json_response(body, status=429, headers=headers)
+
+    def _json(self, request, data, status=200):
+        return web.json_response(data, status=status, headers=request.get("ratelimit_headers"))
+
+    def _issue_token(self, owner=None):
+        """Issues a token for the user numbered ``owner``, or for a new user if it is ``None``."""
+        n = next(self._ids)
+        issued = token(self.scope)
+        issued["access_token"] = f"access{n}"
+        issued["refresh_token"] = f"refresh{n}"
+        owner = n if owner is None else owner
+        self._tokens[issued["access_token"]] = owner
+        self._refresh_tokens[issued["refresh_token"]] = owner
+        return issued
+
+    def _user(self, request):
+        """Returns the number of the user the request's access token belongs to, or ``None``."""
+        auth = request.headers.get("Authorization", "")
+        return self._tokens.get(auth.rpartition(" ")[2])
+
+    def _unauthorized(self, request):
+        return self._json(request, {"message": "401: Unauthorized", "code": 0}, status=401)
+
+    async def _token(self, request):
+        form = await request.post()
+        grant_type = form.get("grant_type")
+        if grant_type == "authorization_code" and form.get("code"):
+            return self._json(request, self._issue_token())
+        if grant_type == "refresh_token":
+            # like Discord, a refresh token can only be used once.
+            owner = self._refresh_tokens.pop(form.get("refresh_token"), None)
+            if owner is not None:
+                return self._json(request, self._issue_token(owner))
+        return self._json(request, {"error": "invalid_grant"}, status=400)
+
+    async def _identify(self, request):
+        n = self._user(request)
+        if n is None:
+            return self._unauthorized(request)
+        return self._json(request, user(n))
+
+    async def _user_guilds(self, request):
+        if self._user(request) is None:
+            return self._unauthorized(request)
+        query = request.query
+        limit = min(int(query.get("limit", 200)), 200)
+        page = self._guilds
+        if "after" in query:
+            page = [g for g in page if int(g["id"]) > int(query["after"])][:limit]
+        elif "before" in query:
+            page = [g for g in page if int(g["id"]) < int(query["before"])][-limit:]
+        else:
+            page = page[:limit]
+        return self._json(request, page)
+
+    async def _user_connections(self, request):
+        if self._user(request) is None:
+            return self._unauthorized(request)
+        return self._json(request, self._connections)
+
+    async def _add_member(self, request):
+        if not request.headers.get("Authorization", "").startswith("Bot "):
+            return self._unauthorized(request)
+        body = await request.json()
+        if body.get("access_token") not in self._tokens:
+            error = {"message": "Invalid OAuth2 access token", "code": 50025}
+            return self._json(request, error, status=403)
+        member = {"user": {"id": request.match_info["user_id"]}, "roles": []}
+        return self._json(request, member, status=201)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--ratelimit", type=int, default=5)
+    parser.add_argument("--ratelimit-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--guilds", type=int, default=50)
+    args = parser.parse_args()
+
+    fake = FakeDiscord(
+        latency=args.latency,
+        jitter=args.jitter,
+        ratelimit=args.ratelimit,
+        ratelimit_rate=args.ratelimit_rate,
+        error_rate=args.error_rate,
+        guild_count=args.guilds,
+    )
+
+    async def serve():
+        runner, url = await fake.serve(args.host, args.port)
+        print(f"Serving a fake Discord API at {url}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await runner.cleanup()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
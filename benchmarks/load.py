@@ -0,0 +1,178 @@
+"""Drives concurrent login flows through a Starlette app against a local fake Discord API.
+
+Each flow calls the app's ``/callback`` route in-process, which exchanges the code and fetches
+the user (and optionally their guilds) from :mod:`benchmarks.fake_discord` over real sockets.
+Reports logins per second, latency percentiles, the responses the fake API sent, how
+many sockets the client opened to it and how many calls were coalesced.
+
+Usage: ``python -m benchmarks.load [--logins 1000] [--concurrency 100] [--latency 0.05] ...``
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import time
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from starlette_discord import DiscordOAuthClient
+
+from .fake_discord import FakeDiscord
+
+SCOPES = ("identify", "guilds")
+
+
+def make_app(client, fetch_guilds=True):
+    """Returns a Starlette app with ``/login`` and ``/callback`` routes, like a real one would have."""
+
+    async def login(request):
+        return client.redirect()
+
+    async def callback(request):
+        async with client.session(request.query_params["code"]) as session:
+            result = await session.fetch(identify=True, guilds=fetch_guilds)
+        if not result.ok:
+            errors = {name: repr(error) for name, error in result.errors.items()}
+            return JSONResponse({"errors": errors}, status_code=502)
+        guilds = len(result.guilds) if result.guilds is not None else None
+        return JSONResponse({"id": str(result.user.id), "guilds": guilds})
+
+    return Starlette(routes=[Route("/login", login), Route("/callback", callback)])
+
+
+async def call(app, path, query=""):
+    """Sends a ``GET`` request to an ASGI app in-process, returning the response status."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"testserver")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    status = None
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    try:
+        await app(scope, receive, send)
+    except Exception:
+        # Starlette re-raises errors after sending its 500 response.
+        status = status or 500
+    return status
+
+
+def percentile(values, fraction):
+    """Returns the nearest-rank percentile of sorted ``values``."""
+    if not values:
+        return float("nan")
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+
+async def run(args):
+    fake = FakeDiscord(
+        latency=args.latency,
+        jitter=args.jitter,
+        ratelimit=args.ratelimit,
+        ratelimit_rate=args.ratelimit_rate,
+        error_rate=args.error_rate,
+        guild_count=args.guilds,
+        scope=" ".join(SCOPES),
+    )
+    runner, api_url = await fake.serve()
+    client = DiscordOAuthClient(
+        1,
+        "secret",
+        "http://testserver/callback",
+        scopes=SCOPES,
+        api_url=api_url,
+        pool_limit=args.pool_limit,
+        max_ratelimit_retries=args.retries,
+    )
+    app = make_app(client, fetch_guilds=not args.no_guilds)
+
+    latencies = []
+    statuses = {}
+    # codes with at least one successful callback, so duplicates don't count as more logins.
+    logged_in = set()
+    codes = iter(range(args.logins))
+
+    async def callback(code):
+        start = time.perf_counter()
+        status = await call(app, "/callback", f"code={code}")
+        latencies.append(time.perf_counter() - start)
+        statuses[status] = statuses.get(status, 0) + 1
+        if status == 200:
+            logged_in.add(code)
+
+    async def worker():
+        for n in codes:
+            # concurrent duplicates stand in for double-submitted callbacks and several open tabs.
+            await asyncio.gather(*(callback(f"code{n}") for _ in range(args.duplicates)))
+
+    await client.startup()
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+    finally:
+        await client.shutdown()
+        await runner.cleanup()
+
+    latencies.sort()
+    print(
+        f"{args.logins} logins x {args.duplicates} callbacks, "
+        f"concurrency {args.concurrency}, {elapsed:.2f} s"
+    )
+    print(f"  logins/sec      {len(logged_in) / elapsed:10.1f}")
+    print(f"  failed logins   {args.logins - len(logged_in):10d}")
+    for name, fraction in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99)):
+        print(f"  {name} latency     {percentile(latencies, fraction) * 1000:10.1f} ms")
+    print(f"  max latency     {latencies[-1] * 1000:10.1f} ms")
+    print(f"  app responses   {dict(sorted(statuses.items()))}")
+    print(f"  API requests    {fake.requests}")
+    print(f"  API responses   {dict(sorted(fake.statuses.items()))}")
+    print(f"  sockets opened  {len(fake.connections)}")
+    print(f"  coalesced       {client.coalesced}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per API response")
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--ratelimit", type=int, default=5, help="requests per bucket per second")
+    parser.add_argument("--ratelimit-rate", type=float, default=0.0, help="injected 429 rate")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="injected 502 rate")
+    parser.add_argument("--guilds", type=int, default=50)
+    parser.add_argument("--no-guilds", action="store_true", help="only identify the user")
+    parser.add_argument("--pool-limit", type=int, default=100)
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument(
+        "--duplicates", type=int, default=1, help="concurrent callbacks sent per code"
+    )
+    args = parser.parse_args()
+
+    # the fake API is served over plain HTTP.
+    os.environ["OAUTHLIB_INSECURE_TRANSPORT"] = "1"
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Realistic Discord API payloads, shaped like real responses."""
+
+import json
+import random
+
+_FEATURES = (
+    "COMMUNITY",
+    "NEWS",
+    "INVITE_SPLASH",
+    "ANIMATED_ICON",
+    "BANNER",
+    "VANITY_URL",
+    "ROLE_ICONS",
+    "THREADS_ENABLED",
+    "WELCOME_SCREEN_ENABLED",
+    "MEMBER_VERIFICATION_GATE_ENABLED",
+)
+
+
+def _snowflake(rng):
+    return str(rng.randrange(1 << 56, 1 << 62))
+
+
+def user(seed=0):
+    rng = random.Random(seed)
+    return {
+        "id": _snowflake(rng),
+        "username": f"user{rng.randrange(10 ** 6)}",
+        "discriminator": f"{rng.randrange(10000):04d}",
+        "avatar": "%032x" % rng.getrandbits(128),
+        "flags": 0,
+        "public_flags": rng.choice((0, 64, 128, 256)),
+        "banner": None,
+        "banner_color": None,
+        "accent_color": rng.randrange(1 << 24),
+        "locale": "en-US",
+        "mfa_enabled": rng.random() < 0.3,
+        "email": "someone@example.com",
+        "verified": True,
+    }
+
+
+def guild(rng):
+    return {
+        "id": _snowflake(rng),
+        "name": "Guild %d" % rng.randrange(10 ** 6),
+        "icon": "%032x" % rng.getrandbits(128) if rng.random() < 0.8 else None,
+        "owner": rng.random() < 0.05,
+        "permissions": str(rng.getrandbits(41)),
+        "features": rng.sample(_FEATURES, rng.randrange(len(_FEATURES) // 2)),
+    }
+
+
+def guilds(count=200, seed=0):
+    rng = random.Random(seed)
+    return [guild(rng) for _ in range(count)]
+
+
+def connections(count=5, seed=0):
+    rng = random.Random(seed)
+    return [
+        {
+            "type": rng.choice(("github", "twitch", "steam", "spotify", "youtube")),
+            "id": _snowflake(rng),
+            "name": f"account{i}",
+            "visibility": 1,
+            "friend_sync": False,
+            "show_activity": True,
+            "verified": True,
+        }
+        for i in range(count)
+    ]
+
+
+def token(scope="identify guilds"):
+    return {
+        "access_token": "6qrZcUqja7812RVdnEKjpzOL4CvHBFG",
+        "token_type": "Bearer",
+        "expires_in": 604800,
+        "refresh_token": "D43f5y0ahjqew82jZ4NViEr2YafMKhue",
+        "scope": scope,
+    }
+
+
+def encode(payload):
+    """Encodes a payload the way Discord sends it over the wire."""
+    return json.dumps(payload).encode("utf-8")
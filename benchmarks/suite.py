@@ -0,0 +1,89 @@
+"""Runs every micro-benchmark and saves the results as JSON.
+
+Usage: ``python -m benchmarks.suite [--output results.json] [--filter TEXT] [--rounds 25]``
+
+Each case is timed once per round, interleaved with the others, and its median is reported.
+
+Save a new baseline with ``--output benchmarks/baseline.json``, and check for regressions
+against it with :mod:`benchmarks.compare`.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import sys
+from importlib import metadata
+
+from . import bench_models, bench_oauth
+from .common import bench_quartiles, calibration, report
+
+BASELINE = "benchmarks/baseline.json"
+
+
+def _version(package):
+    try:
+        return metadata.version(package)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def environment():
+    """Describes the interpreter and dependencies the results were measured with."""
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "aiohttp": _version("aiohttp"),
+        "oauthlib": _version("oauthlib"),
+        "orjson": _version("orjson"),
+    }
+
+
+def run(name_filter=None, rounds=25):
+    """Runs the suite, returning its results as saved by ``--output``.
+
+    ``results`` maps each case to its median time per call in nanoseconds, and ``quartiles``
+    to its first and third quartiles. The ``calibration`` case is always run: comparisons
+    scale the baseline by it, to correct for the machine running faster or slower overall.
+    """
+
+    async def measure():
+        client = bench_oauth.make_client()
+        try:
+            cases = {**bench_models.cases(), **bench_oauth.cases(client)}
+            cases = {
+                name: func
+                for name, func in cases.items()
+                if name_filter is None or name_filter in name
+            }
+            return bench_quartiles({"calibration": calibration, **cases}, rounds=rounds)
+        finally:
+            await client.shutdown()
+
+    quartiles = asyncio.run(measure())
+    return {
+        "environment": environment(),
+        "results": {name: round(median, 1) for name, (_, median, _) in quartiles.items()},
+        "quartiles": {name: [round(q1, 1), round(q3, 1)] for name, (q1, _, q3) in quartiles.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="file to write the results to, as JSON")
+    parser.add_argument("--filter", help="only run cases whose name contains this")
+    parser.add_argument("--rounds", type=int, default=25, help="times each case is sampled")
+    args = parser.parse_args()
+
+    results = run(args.filter, args.rounds)
+    report("Benchmark suite (median)", results["results"])
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"Saved {len(results['results'])} results to {args.output}.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+A FastAPI app that authenticates requests with DiscordAuthBackend.
+
+The user's token is kept in the session cookie. Pages that don't need to know who the user is
+never contact Discord, and pages that do only identify the user once every 30 seconds.
+"""
+
+import secrets
+from typing import Optional
+
+import uvicorn
+from fastapi import Depends, FastAPI
+from starlette.middleware.authentication import AuthenticationMiddleware
+from starlette.middleware.sessions import SessionMiddleware
+from starlette.requests import Request
+from starlette.responses import RedirectResponse
+
+from starlette_discord import User
+from starlette_discord.auth import DiscordAuthBackend, current_user, require_user
+from starlette_discord.client import DiscordOAuthClient
+
+CLIENT_ID = "YOUR_CLIENT_ID"
+CLIENT_SECRET = "YOUR_CLIENT_SECRET"
+REDIRECT_URI = "YOUR_REDIRECT_URI"
+
+
+client = DiscordOAuthClient(CLIENT_ID, CLIENT_SECRET, REDIRECT_URI, scopes=("identify", "guilds"))
+backend = DiscordAuthBackend(client)
+app = FastAPI(lifespan=client.lifespan)
+
+
+@app.get("/login")
+async def login_with_discord():
+    return client.redirect()
+
+
+# NOTE: REDIRECT_URI should be this path.
+@app.get("/callback")
+async def callback(request: Request, code: str):
+    async with client.session(code) as session:
+        request.session["token"] = session.token
+    return RedirectResponse("/")
+
+
+@app.get("/")
+async def index(request: Request):
+    # doesn't contact Discord, request.user is only resolved when it's awaited.
+    return {"logged_in": request.user.is_authenticated}
+
+
+@app.get("/hello")
+async def hello(user: Optional[User] = Depends(current_user)):
+    return {"hello": str(user) if user else "stranger"}
+
+
+@app.get("/guilds")
+async def guilds(request: Request, user: User = Depends(require_user)):
+    # the handle shares the client's connection pool and response cache.
+    guilds = await request.user.session.guilds()
+    return {"user": str(user), "guilds": [str(g) for g in guilds]}
+
+
+@app.get("/logout")
+async def logout(request: Request):
+    token = request.session.pop("token", None)
+    if token:
+        backend.invalidate(token)
+        client.invalidate(token)
+    return RedirectResponse("/")
+
+
+# middleware added last runs first, so the session is loaded before authentication.
+app.add_middleware(AuthenticationMiddleware, backend=backend)
+app.add_middleware(SessionMiddleware, secret_key=secrets.token_urlsafe(64))
+uvicorn.run(app)
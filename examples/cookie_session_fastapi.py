@@ -0,0 +1,80 @@
+"""
+A FastAPI app that keeps the user's token and identity in a compact, signed cookie.
+
+Requests are authenticated and authorized by guild from the cookie alone, without a server-side
+session store or any request to Discord.
+"""
+
+import secrets
+
+import uvicorn
+from fastapi import FastAPI
+from starlette.authentication import requires
+from starlette.exceptions import HTTPException
+from starlette.middleware.authentication import AuthenticationMiddleware
+from starlette.requests import Request
+from starlette.responses import RedirectResponse
+
+from starlette_discord.auth import DiscordAuthBackend
+from starlette_discord.client import DiscordOAuthClient
+from starlette_discord.cookie import CookieCodec
+
+CLIENT_ID = "YOUR_CLIENT_ID"
+CLIENT_SECRET = "YOUR_CLIENT_SECRET"
+REDIRECT_URI = "YOUR_REDIRECT_URI"
+GUILD_ID = 123456789012345678  # members of this guild can see /members
+
+
+client = DiscordOAuthClient(CLIENT_ID, CLIENT_SECRET, REDIRECT_URI, scopes=("identify", "guilds"))
+# the snapshot of the user's guilds is trusted for up to a day.
+codec = CookieCodec(secrets.token_bytes(32), max_age=24 * 60 * 60)
+app = FastAPI(lifespan=client.lifespan)
+
+
+@app.get("/login")
+async def login_with_discord():
+    return client.redirect()
+
+
+# NOTE: REDIRECT_URI should be this path.
+@app.get("/callback")
+async def callback(code: str):
+    async with client.session(code) as session:
+        result = await session.fetch(identify=True, guilds=True)
+    response = RedirectResponse("/")
+    response.set_cookie(
+        "discord_session",
+        codec.dumps(session.token, result.user, result.guilds),
+        max_age=24 * 60 * 60,
+        httponly=True,
+        secure=True,
+        samesite="lax",
+    )
+    return response
+
+
+@app.get("/")
+async def index(request: Request):
+    # read from the cookie, no request is made to Discord.
+    return {"user": request.user.display_name or None}
+
+
+@app.get("/members")
+@requires("authenticated")
+async def members(request: Request):
+    # guild_ids is None if the guilds couldn't be fetched at login.
+    guild_ids = request.user.guild_ids
+    if guild_ids is None or GUILD_ID not in guild_ids:
+        raise HTTPException(403)
+    return {"welcome": request.user.display_name}
+
+
+@app.get("/logout")
+async def logout():
+    response = RedirectResponse("/")
+    response.delete_cookie("discord_session")
+    return response
+
+
+app.add_middleware(AuthenticationMiddleware, backend=DiscordAuthBackend(client, cookie=codec))
+uvicorn.run(app)
@@ -4,6 +4,9 @@ A more advanced FastAPI app that demonstrates Starlette-Discord's versatile Disc
 While client.login(code) is a useful shortcut for identifying a user, DiscordOAuthSession within
 an async context manager is much more powerful. It can be used for getting other information like
 a user's guilds or account connections.
+
+session.fetch() requests several endpoints concurrently, so the callback only waits for
+roughly a single round trip to Discord.
 """
 
 import uvicorn
@@ -32,14 +35,13 @@ async def login_with_discord():
 async def callback(code: str):
     # it's recommended to use DiscordOAuthSession within an async context manager
     async with client.session(code) as session:
-        user = await session.identify()
-        guilds = await session.guilds()
-        connections = await session.connections()
+        data = await session.fetch(identify=True, guilds=True, connections=True)
 
     return {
-        "user": str(user),
-        "guilds": [str(g) for g in guilds],
-        "connections": [str(c) for c in connections],
+        "user": str(data.user),
+        "guilds": [str(g) for g in data.guilds or ()],
+        "connections": [str(c) for c in data.connections or ()],
+        "errors": {name: str(error) for name, error in data.errors.items()},
     }
 
 
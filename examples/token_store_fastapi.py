@@ -0,0 +1,70 @@
+"""
+A FastAPI app that persists users' tokens in a token store instead of the session cookie.
+
+The cookie only holds the user's ID. Tokens are looked up by ID in an SQLite database, and tokens
+that get refreshed are written back in batches in the background, so requests never wait on a write.
+"""
+
+import secrets
+
+import uvicorn
+from fastapi import FastAPI
+from starlette.exceptions import HTTPException
+from starlette.middleware.sessions import SessionMiddleware
+from starlette.requests import Request
+
+from starlette_discord.client import DiscordOAuthClient
+from starlette_discord.store import SQLiteTokenStore
+
+CLIENT_ID = "YOUR_CLIENT_ID"
+CLIENT_SECRET = "YOUR_CLIENT_SECRET"
+REDIRECT_URI = "YOUR_REDIRECT_URI"
+
+
+client = DiscordOAuthClient(
+    CLIENT_ID,
+    CLIENT_SECRET,
+    REDIRECT_URI,
+    scopes=("identify", "guilds"),
+    token_store=SQLiteTokenStore("tokens.db"),
+)
+app = FastAPI(lifespan=client.lifespan)
+
+
+@app.get("/login")
+async def login_with_discord():
+    return client.redirect()
+
+
+# NOTE: REDIRECT_URI should be this path.
+@app.get("/callback")
+async def callback(request: Request, code: str):
+    user, token = await client.login_return_token(code)
+    await client.save_token(user.id, token)
+    request.session["user_id"] = user.id
+    return {"user": str(user)}
+
+
+@app.get("/guilds")
+async def guilds(request: Request):
+    user_id = request.session.get("user_id")
+    session = await client.session_from_store(user_id) if user_id else None
+    if session is None:
+        raise HTTPException(401)
+
+    # if the token is refreshed here, the new one is saved to the store automatically.
+    async with session:
+        guilds = await session.guilds()
+    return {"guilds": [str(g) for g in guilds]}
+
+
+@app.get("/logout")
+async def logout(request: Request):
+    user_id = request.session.pop("user_id", None)
+    if user_id:
+        await client.delete_token(user_id)
+    return {}
+
+
+app.add_middleware(SessionMiddleware, secret_key=secrets.token_urlsafe(64))
+uvicorn.run(app)
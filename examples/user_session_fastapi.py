@@ -0,0 +1,64 @@
+"""
+A FastAPI app that stores the user's token in their session and makes requests with it
+through lightweight UserSession handles.
+
+A handle is cheap enough to create on every request: it holds only the token and sends
+requests through the client's shared connection pool, so it doesn't need to be closed.
+"""
+
+import secrets
+
+import uvicorn
+from fastapi import FastAPI
+from starlette.exceptions import HTTPException
+from starlette.middleware.sessions import SessionMiddleware
+from starlette.requests import Request
+from starlette.responses import RedirectResponse
+
+from starlette_discord.client import DiscordOAuthClient
+
+CLIENT_ID = "YOUR_CLIENT_ID"
+CLIENT_SECRET = "YOUR_CLIENT_SECRET"
+REDIRECT_URI = "YOUR_REDIRECT_URI"
+
+
+client = DiscordOAuthClient(
+    CLIENT_ID, CLIENT_SECRET, REDIRECT_URI, scopes=("identify", "guilds")
+)
+app = FastAPI(lifespan=client.lifespan)
+
+
+@app.get("/login")
+async def login_with_discord():
+    return client.redirect()
+
+
+# NOTE: REDIRECT_URI should be this path.
+@app.get("/callback")
+async def callback(request: Request, code: str):
+    user, token = await client.login_return_token(code)
+    request.session["token"] = token
+    return RedirectResponse("/guilds")
+
+
+@app.get("/guilds")
+async def guilds(request: Request):
+    # raise 401-Unauthorized if user isn't logged in
+    token = request.session.get("token")
+    if not token:
+        raise HTTPException(401)
+
+    # the token must be the whole dict obtained at login, so it can be refreshed.
+    session = client.user_session(token)
+    result = await session.fetch(identify=True, guilds=True)
+
+    # if the token was refreshed, store the new one, the old one no longer works.
+    if session.token is not token:
+        request.session["token"] = session.token
+    if not result.ok:
+        raise HTTPException(401)
+    return {"user": str(result.user), "guilds": [g.name for g in result.guilds]}
+
+
+app.add_middleware(SessionMiddleware, secret_key=secrets.token_urlsafe(64))
+uvicorn.run(app)
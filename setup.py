@@ -29,6 +29,15 @@ setuptools.setup(
     long_description_content_type="text/markdown",
     install_requires=requirements,
     extras_require={
+        "discord": [
+            "discord.py>=1.7",
+        ],
+        "speed": [
+            "orjson",
+        ],
+        "encryption": [
+            "cryptography",
+        ],
         "docs": [
             "sphinx",
             "sphinxcontrib_trio",
@@ -36,7 +45,7 @@ setuptools.setup(
         ],
     },
     python_requires=">=3.8",
-    packages=setuptools.find_packages(),
+    packages=setuptools.find_packages(exclude=("benchmarks", "benchmarks.*")),
     classifiers=[
         "Development Status :: 2 - Pre-Alpha",
         "License :: OSI Approved :: MIT License",
@@ -0,0 +1,270 @@
+import inspect
+
+import aiohttp
+from oauthlib.oauth2 import OAuth2Error
+from starlette.authentication import AuthCredentials, AuthenticationBackend, BaseUser
+from starlette.exceptions import HTTPException
+from starlette.requests import HTTPConnection
+
+from .cache import TTLCache
+from .utils import token_fingerprint
+
+
+class DiscordUser(BaseUser):
+    """The user of a request authenticated by :class:`DiscordAuthBackend`, as ``request.user``.
+
+    Creating one doesn't make any requests. The user is only identified when :meth:`resolve`
+    is first awaited, and the result is kept for the rest of the request.
+
+    Attributes
+    ----------
+    session: :class:`UserSession`
+        A handle for making requests on behalf of the user.
+    snapshot: Optional[:class:`~starlette_discord.cookie.CookieSession`]
+        The identity stored in the request's session cookie, if the backend reads one.
+    """
+
+    __slots__ = ("session", "snapshot", "_backend", "_conn", "_user", "_resolved")
+
+    def __init__(self, backend, conn, session, snapshot=None):
+        self.session = session
+        self.snapshot = snapshot
+        self._backend = backend
+        self._conn = conn
+        self._user = None
+        self._resolved = False
+
+    def __repr__(self):
+        return f"<DiscordUser user={self._user!r}>"
+
+    @property
+    def is_authenticated(self):
+        """:class:`bool`: Always ``True``, since the request has a token.
+
+        Whether the token is still valid is only known once :meth:`resolve` has been awaited.
+        """
+        return True
+
+    @property
+    def display_name(self):
+        """:class:`str`: The user's username, or an empty string if it isn't known yet.
+
+        Known without resolving the user if it is stored in the session cookie.
+        """
+        if self._user is not None:
+            return self._user.username
+        if self.snapshot is not None and self.snapshot.username:
+            return self.snapshot.username
+        return ""
+
+    @property
+    def identity(self):
+        """:class:`str`: The user's ID, or an empty string if it isn't known yet.
+
+        Known without resolving the user if it is stored in the session cookie.
+        """
+        user_id = self._user.id if self._user is not None else self.session.user_id
+        return str(user_id) if user_id is not None else ""
+
+    @property
+    def guild_ids(self):
+        """Optional[FrozenSet[:class:`int`]]: IDs of the user's guilds, if they are stored in the session cookie."""
+        return self.snapshot.guild_ids if self.snapshot is not None else None
+
+    @property
+    def user(self):
+        """Optional[:class:`User`]: The user, if :meth:`resolve` has been awaited and succeeded."""
+        return self._user
+
+    async def resolve(self):
+        """Identify the user, using the backend's identity cache when possible.
+
+        Returns
+        -------
+        Optional[:class:`User`]
+            The user, or ``None`` if Discord rejected their token, or it expired
+            and couldn't be refreshed.
+        """
+        if not self._resolved:
+            self._user = await self._backend._identify(self._conn, self.session)
+            self._resolved = True
+        return self._user
+
+
+class DiscordAuthBackend(AuthenticationBackend):
+    """Authenticates requests from the Discord token stored for them.
+
+    Use it with Starlette's ``AuthenticationMiddleware``. Requests with a token get a
+    :class:`DiscordUser` as ``request.user`` and the ``authenticated`` scope, plus the
+    OAuth2 scopes the token was granted, for use with ``starlette.authentication.requires``.
+    Requests without one get an ``UnauthenticatedUser``.
+
+    Authenticating a request makes no requests to Discord. Users are identified on demand
+    with :meth:`DiscordUser.resolve`, and identities are cached by access token for ``ttl``
+    seconds, so a user browsing several pages is only identified once.
+
+    .. note::
+        By default, tokens are read from ``request.session``, which requires Starlette's
+        ``SessionMiddleware`` to be installed outside of ``AuthenticationMiddleware``.
+        Tokens refreshed while resolving a user are written back to the session.
+
+        With ``cookie``, they are read from a cookie created by a
+        :class:`~starlette_discord.cookie.CookieCodec` instead. The user's ID, username and
+        guild IDs stored in it are available as :attr:`DiscordUser.identity`,
+        :attr:`DiscordUser.display_name` and :attr:`DiscordUser.guild_ids` without resolving the user.
+        Refreshed tokens aren't written back, since the backend can't set cookies: compare
+        ``request.user.session.token`` with ``request.user.snapshot`` and set a new cookie if it changed.
+
+    Parameters
+    ----------
+    client: :class:`DiscordOAuthClient`
+        The client requests are made with.
+    session_key: :class:`str`
+        Key of the token in ``request.session``. Defaults to ``"token"``.
+    get_token: Optional[Callable[[:class:`starlette.requests.HTTPConnection`], Any]]
+        Function (or coroutine function) returning the token for a request, or ``None``,
+        to use instead of ``request.session``. Tokens it returns aren't written back on refresh,
+        use the client's ``token_updater`` or ``token_store`` for that.
+    cookie: Optional[:class:`~starlette_discord.cookie.CookieCodec`]
+        Codec of the session cookie to read tokens from, instead of ``request.session``.
+    cookie_name: :class:`str`
+        Name of the session cookie. Defaults to ``"discord_session"``.
+    ttl: :class:`float`
+        Seconds an identity is cached for. Defaults to ``30``.
+    maxsize: :class:`int`
+        Maximum number of cached identities. Defaults to ``4096``.
+    """
+
+    def __init__(
+        self,
+        client,
+        *,
+        session_key="token",
+        get_token=None,
+        cookie=None,
+        cookie_name="discord_session",
+        ttl=30.0,
+        maxsize=4096,
+    ):
+        self.client = client
+        self.session_key = session_key
+        self.get_token = get_token
+        self.cookie = cookie
+        self.cookie_name = cookie_name
+        self.identities = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def _token(self, conn):
+        if self.get_token is not None:
+            token = self.get_token(conn)
+            if inspect.isawaitable(token):
+                token = await token
+            return token
+        if "session" not in conn.scope:
+            return None
+        return conn.session.get(self.session_key)
+
+    async def authenticate(self, conn):
+        if self.cookie is not None:
+            snapshot = self.cookie.loads(conn.cookies.get(self.cookie_name))
+            if snapshot is None:
+                return None
+            session = self.client.user_session(snapshot.token, snapshot.user_id)
+            user = DiscordUser(self, conn, session, snapshot)
+            return AuthCredentials(["authenticated", *snapshot.scope]), user
+
+        token = await self._token(conn)
+        if not token:
+            return None
+        if isinstance(token, str):
+            token = {"access_token": token}
+
+        scope = token.get("scope") or ()
+        if isinstance(scope, str):
+            scope = scope.split()
+        session = self.client.user_session(dict(token))
+        return AuthCredentials(["authenticated", *scope]), DiscordUser(self, conn, session)
+
+    async def _identify(self, conn, session):
+        key = token_fingerprint(session.access_token)
+        # an expired token is refreshed by identifying the user again.
+        user = self.identities.get(key) if not session.expired else None
+        if user is not None:
+            session.user_id = user.id
+            return user
+
+        if session.expired and not session.token.get("refresh_token"):
+            # the token expired and can't be refreshed.
+            return None
+
+        original = session.token
+        try:
+            user = await session.identify()
+        except aiohttp.ClientResponseError as e:
+            if e.status != 401:
+                raise
+            return None
+        except OAuth2Error:
+            # the token expired and couldn't be refreshed.
+            return None
+
+        if session.token is not original:
+            # cache under the new token, and store it so the old one isn't refreshed again.
+            key = token_fingerprint(session.access_token)
+            if self.cookie is None and self.get_token is None and "session" in conn.scope:
+                conn.session[self.session_key] = session.token
+        self.identities.set(key, user)
+        return user
+
+    def invalidate(self, token):
+        """Drop the identity cached for a token, like when the user logs out.
+
+        Parameters
+        ----------
+        token: Union[:class:`str`, :class:`dict`]
+            The token, or its access token.
+        """
+        if isinstance(token, dict):
+            token = token.get("access_token")
+        self.identities.pop(token_fingerprint(token))
+
+
+async def _request_user(conn):
+    if "user" not in conn.scope:
+        raise RuntimeError("AuthenticationMiddleware must be installed to resolve the user.")
+    user = conn.user
+    if not isinstance(user, DiscordUser):
+        return None
+    return await user.resolve()
+
+
+async def current_user(request: HTTPConnection):
+    """FastAPI dependency returning the request's :class:`User`, or ``None`` if it has none.
+
+    The user is resolved once per request, however many dependencies use it.
+    Requires :class:`DiscordAuthBackend`.
+
+    .. code-block:: python3
+
+        @app.get("/")
+        async def index(user: Optional[User] = Depends(current_user)):
+            ...
+    """
+    return await _request_user(request)
+
+
+async def require_user(request: HTTPConnection):
+    """FastAPI dependency returning the request's :class:`User`, raising a ``401`` if it has none.
+
+    The user is resolved once per request, however many dependencies use it.
+    Requires :class:`DiscordAuthBackend`.
+
+    .. code-block:: python3
+
+        @app.get("/me")
+        async def me(user: User = Depends(require_user)):
+            ...
+    """
+    user = await _request_user(request)
+    if user is None:
+        raise HTTPException(401)
+    return user
@@ -0,0 +1,197 @@
+from urllib.parse import quote
+
+
+class BotHTTP:
+    """A minimal REST client authenticated with your bot's token.
+
+    Requests are sent through the shared transport, rate limiter and JSON functions of the
+    :class:`DiscordOAuthClient` that owns this object, so they never open new connections
+    or race the client's own requests for rate limits.
+
+    .. note::
+        Available as :attr:`DiscordOAuthClient.bot` when the client is given a ``bot_token``.
+
+    Parameters
+    ----------
+    client: :class:`DiscordOAuthClient`
+        The client whose pool and rate limiter are shared.
+    token: :class:`str`
+        Your bot's token.
+    """
+
+    def __init__(self, client, token):
+        if not token:
+            raise ValueError("Parameter 'token' must be a bot token.")
+        self._client = client
+        self._headers = {"Authorization": f"Bot {token}"}
+
+    def __repr__(self):
+        return "<BotHTTP>"
+
+    async def request(self, method, url_fragment, *, reason=None, **kwargs):
+        """Send a bot-authenticated request to the Discord API.
+
+        Parameters
+        ----------
+        method: :class:`str`
+            The HTTP method.
+        url_fragment: :class:`str`
+            The path of the endpoint, relative to the API's base URL, e.g. ``/guilds/123``.
+        reason: Optional[:class:`str`]
+            Reason shown in the guild's audit log.
+        **kwargs
+            Passed to :meth:`aiohttp.ClientSession.request`.
+
+        Returns
+        -------
+        Optional[Union[:class:`dict`, :class:`list`]]
+            The decoded JSON response, or ``None`` for ``204 No Content`` responses.
+
+        Raises
+        ------
+        :class:`aiohttp.ClientResponseError`
+            The request failed.
+        """
+        headers = {**self._headers, **kwargs.pop("headers", {})}
+        if reason is not None:
+            headers["X-Audit-Log-Reason"] = quote(reason, safe=" ")
+
+        return await self._client._api_request(
+            method, url_fragment, headers=headers, **kwargs
+        )
+
+    async def get_member(self, guild_id, user_id):
+        """Fetch a guild member.
+
+        Parameters
+        ----------
+        guild_id: :class:`int`
+            The ID of the guild.
+        user_id: :class:`int`
+            The ID of the user.
+
+        Returns
+        -------
+        :class:`dict`
+            The guild member object.
+        """
+        return await self.request("GET", f"/guilds/{guild_id}/members/{user_id}")
+
+    async def add_member(self, guild_id, user_id, access_token, **fields):
+        """Add a user to a guild. Requires an access token with the ``guilds.join`` scope.
+
+        Parameters
+        ----------
+        guild_id: :class:`int`
+            The ID of the guild.
+        user_id: :class:`int`
+            The ID of the user.
+        access_token: :class:`str`
+            The user's access token.
+        **fields
+            Extra member fields to set, such as ``nick`` or ``roles``.
+
+        Returns
+        -------
+        Optional[:class:`dict`]
+            The guild member object, or ``None`` if the user was already a member.
+        """
+        return await self.request(
+            "PUT",
+            f"/guilds/{guild_id}/members/{user_id}",
+            json={"access_token": access_token, **fields},
+        )
+
+    async def edit_member(self, guild_id, user_id, *, reason=None, **fields):
+        """Edit a guild member, e.g. their ``nick`` or ``roles``.
+
+        Parameters
+        ----------
+        guild_id: :class:`int`
+            The ID of the guild.
+        user_id: :class:`int`
+            The ID of the user.
+        reason: Optional[:class:`str`]
+            Reason shown in the guild's audit log.
+        **fields
+            The member fields to change.
+
+        Returns
+        -------
+        :class:`dict`
+            The updated guild member object.
+        """
+        return await self.request(
+            "PATCH", f"/guilds/{guild_id}/members/{user_id}", reason=reason, json=fields
+        )
+
+    async def remove_member(self, guild_id, user_id, *, reason=None):
+        """Remove (kick) a member from a guild.
+
+        Parameters
+        ----------
+        guild_id: :class:`int`
+            The ID of the guild.
+        user_id: :class:`int`
+            The ID of the user.
+        reason: Optional[:class:`str`]
+            Reason shown in the guild's audit log.
+        """
+        await self.request(
+            "DELETE", f"/guilds/{guild_id}/members/{user_id}", reason=reason
+        )
+
+    async def add_role(self, guild_id, user_id, role_id, *, reason=None):
+        """Give a role to a guild member.
+
+        Parameters
+        ----------
+        guild_id: :class:`int`
+            The ID of the guild.
+        user_id: :class:`int`
+            The ID of the user.
+        role_id: :class:`int`
+            The ID of the role.
+        reason: Optional[:class:`str`]
+            Reason shown in the guild's audit log.
+        """
+        await self.request(
+            "PUT",
+            f"/guilds/{guild_id}/members/{user_id}/roles/{role_id}",
+            reason=reason,
+        )
+
+    async def remove_role(self, guild_id, user_id, role_id, *, reason=None):
+        """Take a role away from a guild member.
+
+        Parameters
+        ----------
+        guild_id: :class:`int`
+            The ID of the guild.
+        user_id: :class:`int`
+            The ID of the user.
+        role_id: :class:`int`
+            The ID of the role.
+        reason: Optional[:class:`str`]
+            Reason shown in the guild's audit log.
+        """
+        await self.request(
+            "DELETE",
+            f"/guilds/{guild_id}/members/{user_id}/roles/{role_id}",
+            reason=reason,
+        )
+
+    async def get_roles(self, guild_id):
+        """Fetch a guild's roles.
+
+        Parameters
+        ----------
+        guild_id: :class:`int`
+            The ID of the guild.
+
+        Returns
+        -------
+        List[:class:`dict`]
+            The guild's role objects.
+        """
+        return await self.request("GET", f"/guilds/{guild_id}/roles")
@@ -0,0 +1,172 @@
+import time
+from collections import OrderedDict
+
+from .utils import token_fingerprint
+
+
+class TTLCache:
+    """A bounded mapping whose entries expire after a time-to-live.
+
+    When the cache is full, the least recently used entry is evicted.
+
+    Parameters
+    ----------
+    maxsize: :class:`int`
+        Maximum number of entries kept in the cache.
+    ttl: :class:`float`
+        Default number of seconds an entry stays valid for.
+    """
+
+    __slots__ = ("maxsize", "ttl", "_data")
+
+    def __init__(self, maxsize=1024, ttl=60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def get(self, key, default=None):
+        """Returns the value stored under ``key``, or ``default`` if it is missing or expired."""
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value, ttl=None):
+        """Stores ``value`` under ``key`` for ``ttl`` seconds (defaults to the cache's TTL)."""
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        """Removes ``key`` from the cache, returning its value if it was present."""
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        """Removes every entry from the cache."""
+        self._data.clear()
+
+
+class ResponseCache:
+    """Caches API responses across sessions, keyed by the access token they were fetched with.
+
+    Entries can also be invalidated by user ID once the user has been identified.
+    Hit and miss counters are kept per endpoint, see :attr:`stats`.
+
+    .. note::
+        One cache is shared by every session created by a :class:`DiscordOAuthClient`.
+
+    Parameters
+    ----------
+    maxsize: :class:`int`
+        Maximum number of cached responses. ``0`` disables caching.
+    ttls: Optional[Dict[:class:`str`, :class:`float`]]
+        Seconds responses are cached for, per endpoint (``identify``, ``guilds`` and ``connections``).
+        Missing endpoints use :attr:`DEFAULT_TTLS`.
+    metrics: Optional[:class:`~starlette_discord.metrics.Metrics`]
+        Registry to count hits and misses in, in addition to :attr:`stats`.
+    """
+
+    DEFAULT_TTLS = {
+        "identify": 60.0,
+        "guilds": 30.0,
+        "connections": 300.0,
+    }
+
+    def __init__(self, maxsize=4096, ttls=None, metrics=None):
+        self.metrics = metrics
+        self.ttls = {**self.DEFAULT_TTLS, **(ttls or {})}
+        self._entries = TTLCache(maxsize=maxsize, ttl=min(self.ttls.values()))
+        self._users = TTLCache(maxsize=maxsize, ttl=max(self.ttls.values()))
+        self._hits = dict.fromkeys(self.ttls, 0)
+        self._misses = dict.fromkeys(self.ttls, 0)
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def enabled(self):
+        """:class:`bool`: Whether this cache stores anything at all."""
+        return self._entries.maxsize > 0
+
+    @property
+    def stats(self):
+        """Dict[:class:`str`, Dict[:class:`str`, :class:`int`]]: Hit and miss counters per endpoint."""
+        return {
+            endpoint: {"hits": self._hits[endpoint], "misses": self._misses[endpoint]}
+            for endpoint in self.ttls
+        }
+
+    def get(self, endpoint, token):
+        """Returns the cached response for ``endpoint`` fetched with ``token``, if there is one."""
+        fingerprint = token_fingerprint(token)
+        if fingerprint is None:
+            return None
+        value = self._entries.get((endpoint, fingerprint))
+        if value is None:
+            self._misses[endpoint] = self._misses.get(endpoint, 0) + 1
+            if self.metrics is not None:
+                self.metrics.inc("discord_cache_misses_total", endpoint=endpoint)
+        else:
+            self._hits[endpoint] = self._hits.get(endpoint, 0) + 1
+            if self.metrics is not None:
+                self.metrics.inc("discord_cache_hits_total", endpoint=endpoint)
+        return value
+
+    def set(self, endpoint, token, value, user_id=None):
+        """Caches ``value`` as the response for ``endpoint`` fetched with ``token``."""
+        fingerprint = token_fingerprint(token)
+        if fingerprint is None:
+            return
+        self._entries.set((endpoint, fingerprint), value, ttl=self.ttls.get(endpoint))
+        if user_id is not None:
+            fingerprints = self._users.get(user_id)
+            if fingerprints is None:
+                fingerprints = set()
+            fingerprints.add(fingerprint)
+            self._users.set(user_id, fingerprints)
+
+    def invalidate(self, token=None, *, user_id=None, endpoint=None):
+        """Drops cached responses.
+
+        Parameters
+        ----------
+        token: Optional[:class:`str`]
+            Drop responses fetched with this access token.
+        user_id: Optional[:class:`int`]
+            Drop responses fetched with any token known to belong to this user.
+        endpoint: Optional[:class:`str`]
+            Only drop responses for this endpoint. Defaults to every endpoint.
+        """
+        fingerprints = set()
+        if token is not None:
+            fingerprints.add(token_fingerprint(token))
+        if user_id is not None:
+            if endpoint is None:
+                fingerprints |= self._users.pop(user_id, None) or set()
+            else:
+                fingerprints |= self._users.get(user_id) or set()
+        endpoints = (endpoint,) if endpoint else tuple(self.ttls)
+        for fingerprint in fingerprints:
+            for name in endpoints:
+                self._entries.pop((name, fingerprint))
+
+    def clear(self):
+        """Drops every cached response."""
+        self._entries.clear()
+        self._users.clear()
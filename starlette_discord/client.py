@@ -1,22 +1,326 @@
-from datetime import datetime
+import asyncio
+import contextlib
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+from urllib.parse import quote, urlencode
+
 import aiohttp
 
-from oauthlib.common import generate_token, urldecode
-from oauthlib.oauth2 import (
-    InsecureTransportError,
-    WebApplicationClient,
-    is_secure_transport,
-)
+from oauthlib.common import generate_token
+from oauthlib.oauth2 import WebApplicationClient
 from starlette.responses import RedirectResponse
 
-from .models import Connection, Guild, User
+from .bot import BotHTTP
+from .cache import ResponseCache, TTLCache
+from .grants import TokenGrants
+from .models import Connection, Guild, GuildList, User
 from .oauth import OAuth2Session
+from .ratelimit import RateLimiter
+from .refresher import TokenRefresher
+from .state import StateSigner
+from .store import WriteBehindQueue
+from .tracing import RequestTracer, raise_for_status
+from .utils import SingleFlight
+from .utils import json_dumps as _json_dumps
+from .utils import json_loads as _json_loads
+from .utils import token_fingerprint
 
 DISCORD_URL = "https://discord.com"
 API_URL = DISCORD_URL + "/api/v9"
+# operations whose duplicate calls are counted in DiscordOAuthClient.coalesced.
+COALESCED_OPERATIONS = ("exchange", "refresh", "identify", "guilds", "connections")
+
+
+class FetchResult(NamedTuple):
+    """The data returned by :meth:`DiscordOAuthSession.fetch` and :meth:`UserSession.fetch`.
+
+    Endpoints that were not requested, or whose request failed, are ``None``.
+
+    Attributes
+    ----------
+    user: Optional[:class:`User`]
+        The user who authorized the application.
+    guilds: Optional[:class:`GuildList`]
+        The user's guild list.
+    connections: Optional[List[:class:`Connection`]]
+        The user's connections.
+    errors: Dict[:class:`str`, :class:`BaseException`]
+        The exception raised by each failed endpoint, keyed by field name.
+    """
+
+    user: Optional[User]
+    guilds: Optional[GuildList]
+    connections: Optional[List[Connection]]
+    errors: Dict[str, BaseException]
+
+    @property
+    def ok(self):
+        """:class:`bool`: Whether every requested endpoint succeeded."""
+        return not self.errors
+
+
+async def _fetch(session, identify, guilds, connections, use_cache):
+    requests = {}
+    if identify:
+        requests["user"] = session.identify(use_cache=use_cache)
+    if guilds:
+        requests["guilds"] = session.guilds(use_cache=use_cache)
+    if connections:
+        requests["connections"] = session.connections(use_cache=use_cache)
+
+    results = await asyncio.gather(*requests.values(), return_exceptions=True)
+
+    data, errors = {}, {}
+    for name, result in zip(requests, results):
+        if isinstance(result, BaseException):
+            errors[name] = result
+        else:
+            data[name] = result
+    return FetchResult(
+        user=data.get("user"),
+        guilds=data.get("guilds"),
+        connections=data.get("connections"),
+        errors=errors,
+    )
+
+
+async def _guild_pages(request, limit=None, before=None, after=None, page_size=200):
+    # Discord returns pages in ascending ID order. Paging with only 'before' walks backwards,
+    # with both, pages walk forwards from 'after' until they reach 'before'.
+    backwards = before is not None and after is None
+    bound = int(before) if before is not None and not backwards else None
+    cursor = before if backwards else after
+    page_size = max(1, min(int(page_size), 200))
+    remaining = limit
+    while remaining is None or remaining > 0:
+        size = page_size if remaining is None else min(page_size, remaining)
+        params = {"limit": size}
+        if cursor is not None:
+            params["before" if backwards else "after"] = str(int(cursor))
+        page = await request("/users/@me/guilds", params=params)
+        if not page:
+            return
+        if backwards:
+            cursor = page[0]["id"]
+            page.reverse()
+        else:
+            cursor = page[-1]["id"]
+        if bound is not None and int(cursor) >= bound:
+            page = [g for g in page if int(g["id"]) < bound]
+            if page:
+                yield page
+            return
+        if remaining is not None:
+            remaining -= len(page)
+        yield page
+        if len(page) < size:
+            return
+
+
+async def _fetch_all_guilds(request):
+    guilds = []
+    async for page in _guild_pages(request):
+        guilds.extend(page)
+    return guilds
+
+
+class JoinResult(NamedTuple):
+    """The outcome of adding one user to one guild with :meth:`DiscordOAuthClient.join_guilds`.
+
+    Attributes
+    ----------
+    guild_id: :class:`int`
+        The ID of the guild.
+    user_id: Optional[:class:`int`]
+        The ID of the user, if it was known or could be identified.
+    member: Optional[:class:`dict`]
+        The guild member object returned by Discord, or ``None`` if the user was already
+        a member of the guild or the request failed.
+    error: Optional[:class:`Exception`]
+        The exception that made the request fail, if it failed.
+    token: Dict[:class:`str`, Union[:class:`str`, :class:`int`, :class:`float`]]
+        The user's token after the request. If the token had expired it was refreshed,
+        even if the request then failed. Store this token in place of the old one,
+        whose refresh token no longer works.
+    """
+
+    guild_id: int
+    user_id: Optional[int]
+    member: Optional[dict]
+    error: Optional[Exception]
+    token: Dict[str, Any]
+
+    @property
+    def ok(self):
+        """:class:`bool`: Whether the user is now a member of the guild."""
+        return self.error is None
+
+
+class _UserEndpoints:
+    # the user endpoints shared by DiscordOAuthSession and UserSession. Subclasses provide
+    # _ensure_token(), _api_get(url_fragment, params=None), access_token, user_id, _oauth_client,
+    # _cache, _keep_json and the _cached_user, _cached_guilds and _cached_connections attributes.
+
+    __slots__ = ()
+
+    async def _cached_request(self, endpoint, fetch, build, use_cache):
+        await self._ensure_token()
+        cache = self._cache if use_cache else None
+        if cache is not None and cache.enabled:
+            cached = cache.get(endpoint, self.access_token)
+            if cached is not None:
+                return cached
+
+        if self._oauth_client is None:
+            return await self._load(endpoint, fetch, build)
+        return await self._oauth_client._coalesce(
+            endpoint, self.access_token, self._load, endpoint, fetch, build
+        )
+
+    async def _load(self, endpoint, fetch, build):
+        result = build(await fetch())
+        if self._cache is not None:
+            user_id = result.id if isinstance(result, User) else None
+            self._cache.set(endpoint, self.access_token, result, user_id=user_id)
+        return result
+
+    async def identify(self, use_cache=True):
+        """Identify a user.
+
+        Parameters
+        ----------
+        use_cache: :class:`bool`
+            Whether a response cached by the client may be returned. Defaults to ``True``.
+
+        Returns
+        -------
+        :class:`User`
+            The user who authorized the application.
+        """
+        user = await self._cached_request(
+            "identify",
+            lambda: self._api_get("/users/@me"),
+            lambda data: User(data=data, keep_json=self._keep_json),
+            use_cache,
+        )
+        self._cached_user = user
+        self.user_id = user.id
+        return user
+
+    async def _fetch_guilds(self):
+        return await _fetch_all_guilds(self._api_get)
+
+    async def iter_guilds(self, limit=None, *, before=None, after=None, page_size=200):
+        """Iterate over a user's guilds, fetching them a page at a time.
+
+        Guilds are yielded as soon as their page arrives, and no more pages are fetched once the
+        loop is exited. Responses are not cached.
+
+        .. note::
+            This is an async generator. Use it with ``async for``.
+
+        Parameters
+        ----------
+        limit: Optional[:class:`int`]
+            Maximum number of guilds to yield. Defaults to every guild.
+        before: Optional[:class:`int`]
+            Only yield guilds with an ID lower than this one. Given alone, guilds are yielded
+            in descending ID order.
+        after: Optional[:class:`int`]
+            Only yield guilds with an ID higher than this one, in ascending ID order.
+            Can be combined with ``before`` to yield the guilds between both IDs.
+        page_size: :class:`int`
+            Number of guilds requested per page. Values above Discord's maximum of ``200``
+            are clamped to it. Defaults to ``200``.
+
+        Yields
+        ------
+        :class:`Guild`
+            The user's guilds. In ascending ID order, unless only ``before`` is given.
+        """
+        async for page in _guild_pages(self._api_get, limit, before, after, page_size):
+            for data in page:
+                yield Guild(data=data, keep_json=self._keep_json)
+
+    async def guilds(self, use_cache=True):
+        """Fetch a user's guild list.
+
+        Every page of the user's guilds is fetched, see :meth:`iter_guilds` to stream them instead.
+
+        Parameters
+        ----------
+        use_cache: :class:`bool`
+            Whether a response cached by the client may be returned. Defaults to ``True``.
+
+        Returns
+        -------
+        :class:`GuildList`
+            The user's guild list. :class:`Guild` objects are created lazily as they are accessed.
+        """
+        guilds = await self._cached_request(
+            "guilds",
+            self._fetch_guilds,
+            lambda data: GuildList(data, keep_json=self._keep_json),
+            use_cache,
+        )
+        self._cached_guilds = guilds
+        return guilds
+
+    async def connections(self, use_cache=True):
+        """Fetch a user's linked 3rd-party accounts.
+
+        Parameters
+        ----------
+        use_cache: :class:`bool`
+            Whether a response cached by the client may be returned. Defaults to ``True``.
+
+        Returns
+        -------
+        List[:class:`Connection`]
+            The user's connections.
+        """
+        connections = await self._cached_request(
+            "connections",
+            lambda: self._api_get("/users/@me/connections"),
+            lambda data: [Connection(data=c, keep_json=self._keep_json) for c in data],
+            use_cache,
+        )
+        self._cached_connections = connections
+        return connections
+
+    async def fetch(self, identify=True, guilds=False, connections=False, use_cache=True):
+        """Fetch several endpoints concurrently.
+
+        The access token is resolved once, then the requested endpoints are fetched in parallel.
+        If an endpoint fails, the others' results are still returned and the exception is
+        available in :attr:`FetchResult.errors`.
+
+        Parameters
+        ----------
+        identify: :class:`bool`
+            Whether to fetch the user. Defaults to ``True``.
+        guilds: :class:`bool`
+            Whether to fetch the user's guild list.
+        connections: :class:`bool`
+            Whether to fetch the user's connections.
+        use_cache: :class:`bool`
+            Whether responses cached by the client may be returned. Defaults to ``True``.
+
+        Returns
+        -------
+        :class:`FetchResult`
+            The fetched data.
+        """
+        await self._ensure_token()
+        return await _fetch(self, identify, guilds, connections, use_cache)
 
+    def invalidate_cache(self):
+        """Drop every response cached by the client for this session's access token."""
+        if self._cache is not None and self.access_token:
+            self._cache.invalidate(self.access_token)
 
-class DiscordOAuthSession(OAuth2Session):
+
+class DiscordOAuthSession(_UserEndpoints, OAuth2Session):
     """Session containing data for a single authorized user. Handles authorization internally.
 
     .. warning::
@@ -42,9 +346,27 @@ class DiscordOAuthSession(OAuth2Session):
         Authorization code included with user request after redirect from Discord.
     token: Optional[Dict[:class:`str`, Union[:class:`str`, :class:`int`, :class`float`]]]
         A previously generated, valid, access token to use instead of the OAuth code exchange
+    user_id: Optional[:class:`int`]
+        ID of the user the token belongs to, if known. Set automatically by :meth:`identify`.
+    oauth_client: Optional[:class:`DiscordOAuthClient`]
+        The client that created this session. If provided, the session borrows the client's
+        shared connection pool, rate limiter, response cache, JSON decoder and model settings
+        instead of creating its own.
     """
 
-    def __init__(self, client_id, client_secret, scope, redirect_uri, *, code, token):
+    def __init__(
+        self,
+        client_id,
+        client_secret,
+        scope,
+        redirect_uri,
+        *,
+        code,
+        token,
+        user_id=None,
+        oauth_client=None,
+        **kwargs,
+    ):
         client = WebApplicationClient(client_id, token=token)
         if (not (code or token)) or (code and token):
             raise ValueError(
@@ -66,16 +388,37 @@ class DiscordOAuthSession(OAuth2Session):
             client.populate_code_attributes({"code": code})
 
         self._discord_client_secret = client_secret
+        self._oauth_client = oauth_client
+        self.user_id = int(user_id) if user_id is not None else None
+        self._ratelimiter = (
+            oauth_client.ratelimiter if oauth_client is not None else RateLimiter()
+        )
+        self._cache = oauth_client.cache if oauth_client is not None else None
+        self._json_loads = oauth_client.json_loads if oauth_client is not None else _json_loads
+        self._keep_json = oauth_client.keep_json if oauth_client is not None else True
+        self._metrics = oauth_client.metrics if oauth_client is not None else None
+        self._api_url = oauth_client.api_url if oauth_client is not None else API_URL
+        kwargs.setdefault(
+            "json_serialize",
+            oauth_client.json_dumps if oauth_client is not None else _json_dumps,
+        )
         self._cached_user = None
         self._cached_guilds = None
         self._cached_connections = None
 
+        if oauth_client is not None:
+            # borrow the client's pooled connector rather than opening a new one per user.
+            kwargs.setdefault("connector", oauth_client.connector)
+            kwargs.setdefault("connector_owner", False)
+            kwargs.setdefault("trace_configs", oauth_client._trace_configs())
+
         super().__init__(
             client_id=client_id,
             scope=scope,
             redirect_uri=redirect_uri,
             token=token,
             client=client,
+            **kwargs,
         )
 
     @property
@@ -92,7 +435,9 @@ class DiscordOAuthSession(OAuth2Session):
 
     @property
     def session_expired(self):
-        return datetime.fromtimestamp(self.token["expires_at"]) < datetime.now()
+        """:class:`bool`: Whether the session's access token has expired."""
+        expires_at = self.token.get("expires_at") if self.token else None
+        return expires_at is not None and expires_at < time.time()
 
     @property
     def cached_user(self):
@@ -101,7 +446,7 @@ class DiscordOAuthSession(OAuth2Session):
 
     @property
     def cached_guilds(self):
-        """List[:class:`dict`]: The session's cached guilds, if a `guilds()` request has previously been made."""
+        """:class:`GuildList`: The session's cached guilds, if a `guilds()` request has previously been made."""
         return self._cached_guilds
 
     @property
@@ -112,6 +457,9 @@ class DiscordOAuthSession(OAuth2Session):
     def new_state(self):
         """Generate a new state string for verifying authorizations.
 
+        The state is a random string that you need to store and compare yourself. Signed states
+        have to be bound to the user's session, see :meth:`DiscordOAuthClient.new_state`.
+
         Returns
         -------
         :class:`str`
@@ -123,91 +471,106 @@ class DiscordOAuthSession(OAuth2Session):
         self,
     ):
         if not self.token:
-            url = API_URL + "/oauth2/token"
-            self.token = await self.fetch_token(
-                url,
-                code=self._client.code,
-                client_secret=self._discord_client_secret,
-            )
+            if self._oauth_client is not None:
+                self.token = await self._oauth_client._exchange(self._client.code)
+            else:
+                self.token = await self._token_grants().exchange(
+                    self._token_request, self._client.code
+                )
+        elif self.session_expired:
+            await self.refresh()
+
+    async def _request(self, method, url, **kwargs):
+        # every request made by the session, including token exchanges, goes through the limiter.
+        token = None
+        if not kwargs.get("withhold_token") and "/users/@me" in str(url):
+            token = self.access_token
+        return await self._ratelimiter.request(
+            super()._request, method, url, token=token, **kwargs
+        )
 
-    async def _discord_request(self, url_fragment, method="GET"):
+    async def _discord_request(self, url_fragment, method="GET", params=None):
         await self.ensure_token()
 
         access_token = self.token["access_token"]
-        url = API_URL + url_fragment
+        url = self._api_url + url_fragment
         headers = {"Authorization": "Authorization: Bearer " + access_token}
-        async with self.request(method, url, headers=headers) as resp:
-            resp.raise_for_status()
-            return await resp.json()
-
-    async def identify(self):
-        """Identify a user.
-
-        Returns
-        -------
-        :class:`User`
-            The user who authorized the application.
-        """
-        data_user = await self._discord_request("/users/@me")
-        user = User(data=data_user)
-        self._cached_user = user
-        return user
+        async with self.request(method, url, headers=headers, params=params) as resp:
+            raise_for_status(resp)
+            return self._json_loads(await resp.read())
+
+    def _token_grants(self):
+        if self._oauth_client is not None:
+            return self._oauth_client.grants
+        return TokenGrants(
+            self._api_url + "/oauth2/token",
+            self.client_id,
+            self._discord_client_secret,
+            self.redirect_uri,
+            json_loads=self._json_loads,
+        )
 
-    async def guilds(self):
-        """Fetch a user's guild list.
+    async def _token_request(self, method, url, **kwargs):
+        return await self._request(method, url, withhold_token=True, **kwargs)
 
-        Returns
-        -------
-        List[:class:`Guild`]
-            The user's guild list.
-        """
-        data_guilds = await self._discord_request("/users/@me/guilds")
-        guilds = [Guild(data=g) for g in data_guilds]
-        self._cached_guilds = guilds
-        return guilds
+    def _parse_token_response(self, content):
+        # used by the generic fetch_token and refresh_token as well.
+        return self._token_grants().parse(content)
 
-    async def connections(self):
-        """Fetch a user's linked 3rd-party accounts.
+    async def _ensure_token(self):
+        await self.ensure_token()
 
-        Returns
-        -------
-        List[:class:`Connection`]
-            The user's connections.
-        """
-        data_connections = await self._discord_request("/users/@me/connections")
-        connections = [Connection(data=c) for c in data_connections]
-        self._cached_connections = connections
-        return connections
+    def _api_get(self, url_fragment, params=None):
+        return self._discord_request(url_fragment, params=params)
 
-    async def join_guild(self, guild_id, bot_token, user_id=None):
+    async def join_guild(self, guild_id, bot_token=None, user_id=None):
         """Add a user to a guild.
 
         Parameters
         ----------
         guild_id: :class:`int`
             The ID of the guild to add the user to.
-        bot_token: :class:`str`
-            Your bot's token.
+        bot_token: Optional[:class:`str`]
+            Your bot's token. If not specified, the request is sent through the
+            :attr:`~DiscordOAuthClient.bot` of the client that created this session.
         user_id: Optional[:class:`int`]
             ID of the user, if known. If not specified, will first identify the user.
         """
+        user_id = user_id or self.user_id
         if not user_id:
             user = await self.identify()
             user_id = user.id
 
+        if bot_token is None:
+            bot = self._oauth_client.bot if self._oauth_client is not None else None
+            if bot is None:
+                raise ValueError(
+                    "Parameter 'bot_token' is required when the client has no bot token."
+                )
+            member = await bot.add_member(guild_id, user_id, self.access_token)
+            if self._cache is not None:
+                self._cache.invalidate(self.access_token, endpoint="guilds")
+            return member
+
         headers = {
             "Authorization": f"Bot {bot_token}",
             "Content-Type": "application/json"
         }
 
-        async with aiohttp.ClientSession(headers=headers, raise_for_status=True) as session:
-            _url = API_URL + f"/guilds/{guild_id}/members/{user_id}"
-            resp = await session.put(
-                _url,
-                json={"access_token": self.access_token}
-            )
-
-        return await resp.json()
+        _url = self._api_url + f"/guilds/{guild_id}/members/{user_id}"
+        async with self.put(
+            _url,
+            headers=headers,
+            json={"access_token": self.access_token},
+            withhold_token=True,
+        ) as resp:
+            raise_for_status(resp)
+            if self._cache is not None:
+                self._cache.invalidate(self.access_token, endpoint="guilds")
+            if resp.status == 204:
+                # the user was already a member of the guild.
+                return None
+            return self._json_loads(await resp.read())
 
     # This code does not work and I have no idea how this bot/oauth feature is supposed to work.f
     # async def join_group_dm(self, dm_channel_id, user_id=None):
@@ -227,82 +590,40 @@ class DiscordOAuthSession(OAuth2Session):
     #         f"/channels/{dm_channel_id}/recipients/{user_id}", method="PUT"
     #     )
 
-    async def refresh_token(
-        self,
-        token_url,
-        refresh_token=None,
-        body="",
-        auth=None,
-        timeout=None,
-        headers=None,
-        verify_ssl=True,
-        proxies=None,
-        **kwargs,
-    ):
-        """Fetch a new access token using a refresh token.
-        :param token_url: The token endpoint, must be HTTPS.
-        :param refresh_token: The refresh_token to use.
-        :param body: Optional application/x-www-form-urlencoded body to add the
-                     include in the token request. Prefer kwargs over body.
-        :param auth: An auth tuple or method as accepted by `requests`.
-        :param timeout: Timeout of the request in seconds.
-        :param headers: A dict of headers to be used by `requests`.
-        :param verify: Verify SSL certificate.
-        :param proxies: The `proxies` argument will be passed to `requests`.
-        :param kwargs: Extra parameters to include in the token request.
-        :return: A token dict
-        """
-        if not token_url:
-            raise ValueError("No token endpoint set for auto_refresh.")
-
-        if not is_secure_transport(token_url):
-            raise InsecureTransportError()
-
-        refresh_token = refresh_token or self.token.get("refresh_token")
-
-        kwargs.update(self.auto_refresh_kwargs)
-        body = self._client.prepare_refresh_body(
-            body=body, refresh_token=refresh_token, **kwargs
+    async def _refresh_token(self, refresh_token=None):
+        # only used by sessions without a client, which record no metrics.
+        return await self._token_grants().refresh(
+            self._token_request, refresh_token or self.token.get("refresh_token")
         )
 
-        if headers is None:
-            headers = {
-                "Accept": "application/json",
-                "Content-Type": "application/x-www-form-urlencoded;charset=UTF-8",
-            }
-
-        async with self.post(
-            token_url,
-            data=dict(urldecode(body)),
-            auth=auth,
-            timeout=timeout,
-            headers=headers,
-            verify_ssl=verify_ssl,
-            withhold_token=True,
-            # proxy=proxies,
-        ) as resp:
-            text = await resp.text()
-            (resp,) = self._invoke_hooks("refresh_token_response", resp)
+    async def refresh(self):
+        """Refresh the session's access token if it has expired.
 
-        self.token = self._client.parse_request_body_response(text, scope=self.scope)
-        if "refresh_token" not in self.token:
-            self.token["refresh_token"] = refresh_token
-        return self.token
+        If the session was created by a :class:`DiscordOAuthClient`, concurrent refreshes
+        of the same token are shared, so only one request is made to Discord.
 
-    async def refresh(self):
+        Returns
+        -------
+        Dict[:class:`str`, Union[:class:`str`, :class:`int`, :class:`float`]]
+            The session's current token.
+        """
         if self.session_expired:
-            refreshed_token = await self.refresh_token(
-                API_URL + "/oauth2/token",
-                client_secret=self._discord_client_secret,
-                client_id=self.client_id,
-            )
+            if self._oauth_client is not None:
+                refreshed_token = await self._oauth_client._refresh(self.token, self.user_id)
+            else:
+                refreshed_token = await self._refresh_token()
             self.token = refreshed_token
             return refreshed_token
         return self.token
 
     async def __aenter__(self):
-        await self.ensure_token()
-        await self.refresh()
+        try:
+            await self.ensure_token()
+            await self.refresh()
+        except BaseException:
+            # __aexit__ isn't called when entering fails, so close here.
+            await self.close()
+            raise
 
         return self
 
@@ -310,6 +631,115 @@ class DiscordOAuthSession(OAuth2Session):
         await self.close()
 
 
+class UserSession(_UserEndpoints):
+    """A lightweight handle for making requests on behalf of a user with an existing token.
+
+    Unlike :class:`DiscordOAuthSession`, a handle is not an :class:`aiohttp.ClientSession`.
+    It only holds the user's token and the data fetched with it, and sends requests through its
+    client's shared transport, rate limiter and cache. Handles are cheap enough to create on every
+    incoming request, and don't need to be closed.
+
+    Expired tokens are refreshed through the client before a request is made, see
+    :meth:`DiscordOAuthClient.refresh`.
+
+    .. note::
+        Create handles with :meth:`DiscordOAuthClient.user_session`.
+
+    Attributes
+    ----------
+    token: Dict[:class:`str`, Union[:class:`str`, :class:`int`, :class:`float`]]
+        The user's current token.
+    user_id: Optional[:class:`int`]
+        The user's ID, if known.
+    """
+
+    __slots__ = (
+        "_client",
+        "token",
+        "user_id",
+        "_cached_user",
+        "_cached_guilds",
+        "_cached_connections",
+    )
+
+    def __init__(self, client, token, user_id=None):
+        if not isinstance(token, dict) or "access_token" not in token:
+            raise ValueError("Parameter 'token' requires 'access_token' key.")
+        self._client = client
+        self.token = token
+        self.user_id = int(user_id) if user_id is not None else None
+        self._cached_user = None
+        self._cached_guilds = None
+        self._cached_connections = None
+
+    def __repr__(self):
+        return f"<UserSession user_id={self.user_id}>"
+
+    @property
+    def access_token(self):
+        """:class:`str`: The user's current access token."""
+        return self.token["access_token"]
+
+    @property
+    def expired(self):
+        """:class:`bool`: Whether the access token has expired."""
+        expires_at = self.token.get("expires_at")
+        return expires_at is not None and expires_at < time.time()
+
+    @property
+    def cached_user(self):
+        """Optional[:class:`User`]: The user, if :meth:`identify` has been called."""
+        return self._cached_user
+
+    @property
+    def cached_guilds(self):
+        """Optional[:class:`GuildList`]: The user's guilds, if :meth:`guilds` has been called."""
+        return self._cached_guilds
+
+    @property
+    def cached_connections(self):
+        """Optional[List[:class:`Connection`]]: The user's connections, if :meth:`connections` has been called."""
+        return self._cached_connections
+
+    async def refresh(self):
+        """Refresh the access token if it has expired.
+
+        Returns
+        -------
+        Dict[:class:`str`, Union[:class:`str`, :class:`int`, :class:`float`]]
+            The current token.
+        """
+        if self.expired:
+            self.token = await self._client.refresh(self.token, user_id=self.user_id)
+        return self.token
+
+    @property
+    def _oauth_client(self):
+        return self._client
+
+    @property
+    def _cache(self):
+        return self._client.cache
+
+    @property
+    def _keep_json(self):
+        return self._client.keep_json
+
+    async def _ensure_token(self):
+        await self.refresh()
+
+    async def _api_get(self, url_fragment, params=None):
+        await self.refresh()
+        access_token = self.token["access_token"]
+        return await self._client._api_request(
+            "GET",
+            url_fragment,
+            token=access_token,
+            headers={"Authorization": "Bearer " + access_token},
+            params=params,
+        )
+
+
 class DiscordOAuthClient:
     """Client for Discord Oauth2.
 
@@ -323,13 +753,650 @@ class DiscordOAuthClient:
         Discord application redirect URI.
     scopes: Tuple[:class:`str`]
         Discord authorization scopes.
+    pool_limit: :class:`int`
+        Maximum number of simultaneous connections in the shared connection pool.
+        ``0`` means no limit. Defaults to ``100``.
+    pool_limit_per_host: :class:`int`
+        Maximum number of simultaneous connections to a single host. ``0`` means no limit.
+    keepalive_timeout: :class:`float`
+        Seconds an idle connection is kept open for reuse. Defaults to ``30``.
+    dns_cache_ttl: Optional[:class:`int`]
+        Seconds resolved DNS entries are cached for. ``None`` caches them forever.
+        Defaults to ``300``.
+    max_ratelimit_retries: :class:`int`
+        How many times a rate limited request is retried before giving up. Defaults to ``3``.
+    cache_size: :class:`int`
+        Maximum number of API responses cached across sessions. ``0`` disables the cache.
+        Defaults to ``4096``.
+    cache_ttls: Optional[Dict[:class:`str`, :class:`float`]]
+        Seconds responses are cached for, per endpoint (``identify``, ``guilds``, ``connections``).
+    json_loads: Optional[Callable[[Union[:class:`bytes`, :class:`str`]], Any]]
+        Function used to decode API and token responses. Receives the raw response body as bytes.
+        Defaults to ``orjson.loads`` if orjson is installed, ``json.loads`` otherwise.
+    json_dumps: Optional[Callable[[Any], :class:`str`]]
+        Function used to encode JSON request bodies. Defaults to orjson if installed.
+    keep_json: :class:`bool`
+        Whether models keep a reference to the raw payload they were created from.
+        If ``False``, ``model.json()`` rebuilds an equivalent payload on demand,
+        which saves memory when many models are cached. Defaults to ``True``.
+    token_updater: Optional[Callable[[Dict[:class:`str`, Any]], Awaitable[None]]]
+        Coroutine function called with the new token whenever a token is refreshed.
+        It is called exactly once per refresh, even if several sessions shared it.
+    refresh_grace: :class:`float`
+        Seconds a refreshed token is remembered for, so requests still holding the old
+        refresh token receive the new token instead of refreshing again. Defaults to ``60``.
+        With ``background_refresh``, ``refresh_margin`` is added to it: other holders of
+        a token only refresh it once it has expired, up to ``refresh_margin`` seconds after
+        the refresher did.
+    exchange_grace: :class:`float`
+        Seconds a token exchanged for an authorization code is remembered for, so a callback
+        retried with the same code receives the same token instead of failing with
+        ``invalid_grant``.
+        Defaults to ``0``, which only shares exchanges that are still in progress.
+
+        .. warning::
+            While a token is remembered, anyone replaying its code receives it, so codes are
+            no longer single-use. Only enable this if codes can't leak, e.g. through logs.
+    background_refresh: :class:`bool`
+        Whether to refresh tokens registered with :attr:`refresher` in the background,
+        before they expire. Defaults to ``False``.
+    refresh_margin: :class:`float`
+        Seconds before expiry registered tokens are refreshed. Defaults to ``300``.
+    refresh_concurrency: :class:`int`
+        Maximum number of background refreshes running at once. Defaults to ``10``.
+    token_store: Optional[:class:`~starlette_discord.store.TokenStore`]
+        Where users' tokens are persisted, keyed by user ID. When set, refreshed tokens of sessions
+        whose user is known are saved to it with batched, write-behind flushes.
+        The store is closed by :meth:`shutdown`.
+    store_flush_interval: :class:`float`
+        Seconds between write-behind flushes to ``token_store``. Defaults to ``1``.
+    bot_token: Optional[:class:`str`]
+        Your bot's token. Enables :attr:`bot` and :meth:`join_guilds`.
+    metrics: Optional[:class:`~starlette_discord.metrics.Metrics`]
+        Registry to record token exchange, refresh and API request latencies, status codes,
+        rate limits, cache hits and connection pool usage in.
+    trace_requests: :class:`bool`
+        Whether to record DNS, connect, pool wait and time-to-first-byte timings of every request
+        with a :class:`~starlette_discord.tracing.RequestTracer`. Defaults to ``False``.
+    api_url: :class:`str`
+        Base URL of the Discord API. Only needs changing to test against a local stand-in.
+    state_secret: Optional[Union[:class:`str`, :class:`bytes`]]
+        Key used to sign states issued by :meth:`new_state`, so they can be checked with
+        :meth:`verify_state` without storing them. Use at least 32 random bytes.
+    state_ttl: :class:`float`
+        Seconds a signed state stays valid for. Defaults to ``600``.
+
+    Attributes
+    ----------
+    ratelimiter: :class:`~starlette_discord.ratelimit.RateLimiter`
+        The rate limiter shared by every session created by this client.
+    cache: :class:`~starlette_discord.cache.ResponseCache`
+        The API response cache shared by every session created by this client.
+        Its ``stats`` can be used to tune ``cache_ttls``.
+    refresher: Optional[:class:`~starlette_discord.refresher.TokenRefresher`]
+        The background token refresher, if ``background_refresh`` is enabled.
+        Register tokens with ``client.refresher.register(token, key=user_id)``.
+    token_store: Optional[:class:`~starlette_discord.store.TokenStore`]
+        The client's token store, if one was provided.
+    bot: Optional[:class:`~starlette_discord.bot.BotHTTP`]
+        A REST client authenticated with ``bot_token``, if one was provided.
+        It shares this client's connection pool and rate limiter.
+    metrics: Optional[:class:`~starlette_discord.metrics.Metrics`]
+        The client's metrics registry, if one was provided.
+    tracer: Optional[:class:`~starlette_discord.tracing.RequestTracer`]
+        The client's request tracer, if ``trace_requests`` is enabled.
+        Register callbacks with ``client.tracer.add_callback(func)``.
+    state_signer: Optional[:class:`~starlette_discord.state.StateSigner`]
+        Signs and verifies states, if a ``state_secret`` was provided.
+    grants: :class:`~starlette_discord.grants.TokenGrants`
+        Sends the authorization code and refresh token requests of every session created by this client.
+    coalesced: Dict[:class:`str`, :class:`int`]
+        Calls that didn't need their own request, per operation (``exchange``, ``refresh``,
+        ``identify``, ``guilds`` and ``connections``). Concurrent identical calls made with the same
+        token, or exchanging the same code, share one request to Discord. Refreshes repeated within
+        ``refresh_grace`` seconds, and exchanges repeated within ``exchange_grace`` seconds,
+        are served the same token as well.
+
+    .. note::
+        The client owns a single connection pool which every :class:`DiscordOAuthSession`
+        it creates borrows, so connections to Discord are reused between logins.
+        Call :meth:`startup` and :meth:`shutdown` from your app's lifespan
+        (or pass :meth:`lifespan` to Starlette) to open and close it cleanly.
     """
 
-    def __init__(self, client_id, client_secret, redirect_uri, scopes=("identify",)):
+    def __init__(
+        self,
+        client_id,
+        client_secret,
+        redirect_uri,
+        scopes=("identify",),
+        *,
+        pool_limit=100,
+        pool_limit_per_host=0,
+        keepalive_timeout=30.0,
+        dns_cache_ttl=300,
+        max_ratelimit_retries=3,
+        cache_size=4096,
+        cache_ttls=None,
+        json_loads=None,
+        json_dumps=None,
+        keep_json=True,
+        token_updater=None,
+        refresh_grace=60.0,
+        exchange_grace=0.0,
+        background_refresh=False,
+        refresh_margin=300.0,
+        refresh_concurrency=10,
+        token_store=None,
+        store_flush_interval=1.0,
+        bot_token=None,
+        metrics=None,
+        trace_requests=False,
+        api_url=API_URL,
+        state_secret=None,
+        state_ttl=600.0,
+    ):
         self.client_id = str(client_id)
         self.client_secret = client_secret
         self.redirect_uri = redirect_uri
         self.scope = " ".join(scope for scope in scopes)
+        self.api_url = api_url
+        self.state_signer = (
+            StateSigner(state_secret, ttl=state_ttl) if state_secret else None
+        )
+        self._authorize_urls = {}
+        self.json_loads = json_loads or _json_loads
+        self.json_dumps = json_dumps or _json_dumps
+        self.grants = TokenGrants(
+            api_url + "/oauth2/token",
+            self.client_id,
+            client_secret,
+            redirect_uri,
+            json_loads=self.json_loads,
+        )
+
+        self._pool_limit = pool_limit
+        self._pool_limit_per_host = pool_limit_per_host
+        self._keepalive_timeout = keepalive_timeout
+        self._dns_cache_ttl = dns_cache_ttl
+        self._connector = None
+        self.metrics = metrics
+        self.tracer = RequestTracer(metrics) if trace_requests else None
+        self.ratelimiter = RateLimiter(max_retries=max_ratelimit_retries, metrics=metrics)
+        self.cache = ResponseCache(maxsize=cache_size, ttls=cache_ttls, metrics=metrics)
+        self.keep_json = keep_json
+        self.token_updater = token_updater
+        self._refreshes = SingleFlight()
+        if background_refresh:
+            refresh_grace += refresh_margin
+        self._refreshed = TTLCache(maxsize=cache_size or 1024, ttl=refresh_grace)
+        self._inflight = SingleFlight()
+        self._exchanged = (
+            TTLCache(maxsize=cache_size or 1024, ttl=exchange_grace) if exchange_grace > 0 else None
+        )
+        self.coalesced = dict.fromkeys(COALESCED_OPERATIONS, 0)
+        self.refresher = (
+            TokenRefresher(
+                self, margin=refresh_margin, concurrency=refresh_concurrency
+            )
+            if background_refresh
+            else None
+        )
+        self._http = None
+        self.bot = BotHTTP(self, bot_token) if bot_token else None
+        if metrics is not None:
+            metrics.add_collector(self._collect_metrics)
+        self.token_store = token_store
+        self._token_writes = (
+            WriteBehindQueue(token_store, flush_interval=store_flush_interval)
+            if token_store is not None
+            else None
+        )
+
+    @property
+    def connector(self):
+        """:class:`aiohttp.TCPConnector`: The client's shared connection pool.
+
+        The pool is created on first access if :meth:`startup` has not been called yet.
+        """
+        if self._connector is None or self._connector.closed:
+            self._connector = aiohttp.TCPConnector(
+                limit=self._pool_limit,
+                limit_per_host=self._pool_limit_per_host,
+                keepalive_timeout=self._keepalive_timeout,
+                use_dns_cache=True,
+                ttl_dns_cache=self._dns_cache_ttl,
+            )
+        return self._connector
+
+    @property
+    def http(self):
+        """:class:`aiohttp.ClientSession`: A session shared by :class:`UserSession` handles and :attr:`bot`.
+
+        It borrows the client's connection pool and is created on first access.
+        """
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(
+                connector=self.connector,
+                connector_owner=False,
+                json_serialize=self.json_dumps,
+                trace_configs=self._trace_configs(),
+            )
+        return self._http
+
+    async def _api_request(self, method, url_fragment, *, token=None, **kwargs):
+        resp = await self.ratelimiter.request(
+            self.http._request, method, self.api_url + url_fragment, token=token, **kwargs
+        )
+        try:
+            raise_for_status(resp)
+            if resp.status == 204:
+                return None
+            return self.json_loads(await resp.read())
+        finally:
+            resp.release()
+
+    def _trace_configs(self):
+        return [self.tracer.trace_config] if self.tracer is not None else None
+
+    def _collect_metrics(self):
+        connector = self._connector
+        if connector is None or connector.closed:
+            acquired = 0
+        else:
+            # aiohttp has no public API for the number of connections in use.
+            acquired = len(getattr(connector, "_acquired", ()))
+        self.metrics.set("discord_pool_connections_acquired", acquired)
+        self.metrics.set("discord_pool_connections_limit", self._pool_limit)
+
+    async def _join_guild(self, item):
+        token, guild_id, *rest = item
+        user_id = rest[0] if rest else None
+        if isinstance(token, str):
+            token = {"access_token": token}
+        session = self.user_session(dict(token), user_id)
+        try:
+            await session.refresh()
+            if session.user_id is None:
+                await session.identify()
+            member = await self.bot.add_member(guild_id, session.user_id, session.access_token)
+            self.cache.invalidate(session.access_token, endpoint="guilds")
+        except Exception as e:
+            return JoinResult(int(guild_id), session.user_id, None, e, session.token)
+        return JoinResult(int(guild_id), session.user_id, member, None, session.token)
+
+    async def join_guilds(self, items, *, concurrency=10):
+        """Add users to guilds in bulk, yielding each result as soon as it completes.
+
+        Requests are sent through :attr:`bot`, so they share the client's connection pool
+        and rate limiter, and at most ``concurrency`` of them run at once.
+        Users whose ID isn't given are identified first, and expired tokens are refreshed.
+        Requires the client's ``bot_token``.
+
+        .. note::
+            This is an async generator. Use it with ``async for``. Breaking out of the loop
+            cancels the remaining requests.
+
+        Parameters
+        ----------
+        items: Iterable[Tuple[Union[:class:`str`, :class:`dict`], :class:`int`]]
+            ``(token, guild_id)`` or ``(token, guild_id, user_id)`` tuples. ``token`` is either
+            the user's token dict or their access token string. Requires the ``guilds.join`` scope.
+        concurrency: :class:`int`
+            Maximum number of users being added at once. Defaults to ``10``.
+
+        Yields
+        ------
+        :class:`JoinResult`
+            The outcome of each item, in completion order. Its ``token`` replaces the token
+            that was passed in, in case it was refreshed.
+        """
+        if self.bot is None:
+            raise RuntimeError("This client has no bot token.")
+
+        iterator = iter(items)
+        results = asyncio.Queue()
+
+        async def worker():
+            try:
+                for item in iterator:
+                    results.put_nowait(await self._join_guild(item))
+            finally:
+                results.put_nowait(None)
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(concurrency)]
+        remaining = len(workers)
+        try:
+            while remaining:
+                result = await results.get()
+                if result is None:
+                    remaining -= 1
+                else:
+                    yield result
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def _token_request(self, method, url, **kwargs):
+        return await self.ratelimiter.request(self.http._request, method, url, **kwargs)
+
+    def _count_coalesced(self, operation):
+        self.coalesced[operation] = self.coalesced.get(operation, 0) + 1
+        if self.metrics is not None:
+            self.metrics.inc("discord_coalesced_total", operation=operation)
+
+    async def _coalesce(self, operation, token, func, *args):
+        # concurrent identical requests made with the same token (or code) share one request.
+        key = (operation, token_fingerprint(token))
+        if key in self._inflight:
+            self._count_coalesced(operation)
+        return await self._inflight.run(key, func, *args)
+
+    async def _exchange(self, code):
+        # codes can only be used once: concurrent exchanges of the same code, like a double
+        # submitted callback, share one request instead of all but one failing with invalid_grant.
+        key = token_fingerprint(code)
+        exchanged = self._exchanged.get(key) if self._exchanged is not None else None
+        if exchanged is not None:
+            self._count_coalesced("exchange")
+        else:
+            exchanged = await self._coalesce("exchange", code, self._do_exchange, code, key)
+        return dict(exchanged)
+
+    async def _do_exchange(self, code, key):
+        start = time.perf_counter()
+        token = await self.grants.exchange(self._token_request, code)
+        if self.metrics is not None:
+            self.metrics.observe("discord_token_exchange_seconds", time.perf_counter() - start)
+        if self._exchanged is not None:
+            self._exchanged.set(key, token)
+        return token
+
+    async def _refresh(self, token, user_id=None):
+        # refreshes are keyed by refresh token: concurrent (and shortly later) refreshes of the
+        # same token share one request, since Discord revokes a refresh token once it is used.
+        key = token_fingerprint(token.get("refresh_token"))
+        if key is None:
+            raise ValueError("The token has no 'refresh_token'.")
+
+        refreshed = self._refreshed.get(key)
+        if refreshed is not None:
+            self._count_coalesced("refresh")
+        else:
+            if key in self._refreshes:
+                self._count_coalesced("refresh")
+            refreshed = await self._refreshes.run(key, self._do_refresh, token, user_id, key)
+        # every caller gets its own copy, so sessions can't modify each other's token.
+        return dict(refreshed)
+
+    async def _do_refresh(self, token, user_id, key):
+        start = time.perf_counter()
+        new_token = await self.grants.refresh(self._token_request, token["refresh_token"])
+        if self.metrics is not None:
+            self.metrics.observe("discord_token_refresh_seconds", time.perf_counter() - start)
+        if token.get("access_token"):
+            self.cache.invalidate(token["access_token"])
+        self._refreshed.set(key, new_token)
+        if self._token_writes is not None and user_id is not None:
+            self._token_writes.put(user_id, new_token)
+        if self.token_updater is not None:
+            await self.token_updater(new_token)
+        return new_token
+
+    async def refresh(self, token, user_id=None):
+        """Refresh a token now, regardless of whether it has expired.
+
+        Concurrent refreshes of the same token share a single request.
+
+        Parameters
+        ----------
+        token: Dict[:class:`str`, Union[:class:`str`, :class:`int`, :class:`float`]]
+            The token to refresh. Must have a ``refresh_token`` key.
+        user_id: Optional[:class:`int`]
+            ID of the user the token belongs to. If the client has a token store,
+            the new token is saved under this ID.
+
+        Returns
+        -------
+        Dict[:class:`str`, Union[:class:`str`, :class:`int`, :class:`float`]]
+            The new token.
+        """
+        return await self._refresh(token, user_id)
+
+    async def load_token(self, user_id):
+        """Returns a user's token from the client's token store, or ``None``.
+
+        Tokens that are waiting to be flushed to the store are returned as well.
+
+        Parameters
+        ----------
+        user_id: :class:`int`
+            The user's ID.
+        """
+        if self.token_store is None:
+            raise RuntimeError("This client has no token store.")
+        token = self._token_writes.get(user_id)
+        if token is None:
+            token = await self.token_store.get(user_id)
+        return token
+
+    async def save_token(self, user_id, token):
+        """Saves a user's token to the client's token store immediately.
+
+        Parameters
+        ----------
+        user_id: :class:`int`
+            The user's ID.
+        token: Dict[:class:`str`, Union[:class:`str`, :class:`int`, :class:`float`]]
+            The user's token.
+        """
+        if self.token_store is None:
+            raise RuntimeError("This client has no token store.")
+        self._token_writes.discard(user_id)
+        await self.token_store.set(user_id, token)
+
+    async def delete_token(self, user_id):
+        """Removes a user's token from the client's token store and drops their cached data,
+        e.g. when they log out.
+
+        Parameters
+        ----------
+        user_id: :class:`int`
+            The user's ID.
+        """
+        if self.token_store is None:
+            raise RuntimeError("This client has no token store.")
+        self._token_writes.discard(user_id)
+        await self.token_store.delete(user_id)
+        if self.refresher is not None:
+            self.refresher.unregister(user_id)
+        self.invalidate(user_id=int(user_id))
+
+    def invalidate(self, token=None, *, user_id=None):
+        """Drop cached API responses for a user, e.g. when they log out.
+
+        Parameters
+        ----------
+        token: Optional[Union[:class:`str`, Dict[:class:`str`, Union[:class:`str`, :class:`int`, :class:`float`]]]]
+            The user's access token, or token dict.
+        user_id: Optional[:class:`int`]
+            The user's ID. Drops responses cached under any of the user's known tokens.
+        """
+        if isinstance(token, dict):
+            token = token.get("access_token")
+        self.cache.invalidate(token, user_id=user_id)
+
+    async def startup(self):
+        """Open the client's shared connection pool.
+
+        Also starts the token store's write-behind queue and the background token refresher,
+        if enabled. Meant to be called from your app's lifespan, along with :meth:`shutdown`:
+
+        .. code-block:: python3
+
+            @contextlib.asynccontextmanager
+            async def lifespan(app):
+                await client.startup()
+                try:
+                    yield
+                finally:
+                    await client.shutdown()
+
+            app = Starlette(lifespan=lifespan)
+
+        If the client is the only thing your app needs to start, pass :meth:`lifespan` instead.
+        """
+        # the pool is created on first access.
+        self.connector
+        if self._token_writes is not None:
+            await self._token_writes.start()
+        if self.refresher is not None:
+            await self.refresher.start()
+
+    async def shutdown(self):
+        """Close the client's shared connection pool.
+
+        Also stops the background token refresher and flushes pending token writes, if enabled.
+        Meant to be called when your app's lifespan exits, see :meth:`startup`.
+        """
+        try:
+            if self.refresher is not None:
+                await self.refresher.stop()
+            if self._token_writes is not None:
+                try:
+                    await self._token_writes.stop()
+                finally:
+                    await self.token_store.close()
+        finally:
+            if self._http is not None:
+                await self._http.close()
+                self._http = None
+            if self._connector is not None:
+                await self._connector.close()
+                self._connector = None
+
+    @contextlib.asynccontextmanager
+    async def lifespan(self, app):
+        """Lifespan context that wraps :meth:`startup` and :meth:`shutdown`.
+
+        Can be passed directly to Starlette or FastAPI: ``Starlette(lifespan=client.lifespan)``.
+        """
+        await self.startup()
+        try:
+            yield
+        finally:
+            await self.shutdown()
+
+    async def __aenter__(self):
+        await self.startup()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.shutdown()
+
+    def new_state(self, bind=None):
+        """Generate a new state string for verifying authorizations.
+
+        If the client has a ``state_secret``, the state is signed, bound to ``bind`` and expires
+        after ``state_ttl``, so it can be checked with :meth:`verify_state` without being stored.
+        Otherwise, it is a random string that you need to store and compare yourself.
+
+        .. warning::
+            A signed state only protects against login CSRF when it is bound to something only
+            the user's browser has, such as their session ID. An attacker could otherwise get a
+            valid state from this client and send it to a victim along with the attacker's own
+            authorization code. ``bind`` is therefore required with a ``state_secret``.
+
+        Parameters
+        ----------
+        bind: Optional[:class:`str`]
+            Value to bind a signed state to, such as the user's session ID.
+            The same value must be passed to :meth:`verify_state`.
+
+        Returns
+        -------
+        :class:`str`
+            The state string that was generated.
+
+        Raises
+        ------
+        :class:`ValueError`
+            The client has a ``state_secret`` and ``bind`` is ``None``.
+        """
+        if self.state_signer is None:
+            if bind is not None:
+                raise RuntimeError("Binding a state requires the client to have a state_secret.")
+            return generate_token()
+        if bind is None:
+            raise ValueError("Signed states must be bound to the user's session with 'bind'.")
+        return self.state_signer.issue(bind)
+
+    def verify_state(self, state, bind):
+        """Check a signed state returned to your callback.
+
+        .. warning::
+            Pass the same value the state was bound to with :meth:`new_state`, taken from the
+            request the callback received, so a state issued to someone else is rejected.
+
+        Parameters
+        ----------
+        state: :class:`str`
+            The ``state`` query parameter of the callback request.
+        bind: :class:`str`
+            The value the state was bound to, such as the user's session ID.
+
+        Returns
+        -------
+        :class:`bool`
+            Whether the state was issued by this client for the same ``bind`` and hasn't expired.
+
+        Raises
+        ------
+        :class:`ValueError`
+            ``bind`` is ``None``.
+        """
+        if self.state_signer is None:
+            raise RuntimeError("This client has no state_secret.")
+        if bind is None:
+            raise ValueError("Signed states must be bound to the user's session with 'bind'.")
+        return self.state_signer.verify(state, bind)
+
+    def _authorize_url(self, redirect_uri):
+        url = self._authorize_urls.get(redirect_uri)
+        if url is None:
+            query = urlencode(
+                {
+                    "client_id": self.client_id,
+                    "redirect_uri": redirect_uri,
+                    "scope": self.scope,
+                    "response_type": "code",
+                },
+                quote_via=quote,
+            )
+            url = f"{DISCORD_URL}/api/oauth2/authorize?{query}"
+            # redirect URIs must be registered with Discord, so there are only ever a few.
+            if len(self._authorize_urls) < 16:
+                self._authorize_urls[redirect_uri] = url
+        return url
+
+    def authorization_url(self, state=None, prompt=None, redirect_uri=None):
+        """Returns the URL of Discord's authorization page. See :meth:`redirect` for the parameters.
+
+        The URL is built and encoded once per redirect URI, then only ``state`` and ``prompt``
+        are appended to it.
+
+        Returns
+        -------
+        :class:`str`
+            The authorization URL.
+        """
+        url = self._authorize_url(redirect_uri or self.redirect_uri)
+        if state:
+            url += "&state=" + quote(state, safe="")
+        if prompt:
+            url += "&prompt=" + quote(prompt, safe="")
+        return url
 
     def redirect(self, state=None, prompt=None, redirect_uri=None):
         """Returns a RedirectResponse that directs to Discord login.
@@ -337,7 +1404,7 @@ class DiscordOAuthClient:
         Parameters
         ----------
         state: Optional[:class:`str`]
-            Optional state parameter for Discord redirect URL.
+            Optional state parameter for Discord redirect URL, e.g. from :meth:`new_state`.
             Docs can be found `here <https://discord.com/developers/docs/topics/oauth2#state-and-security>`_.
         prompt: Optional[:class:`str`]
             Optional prompt parameter for Discord redirect URL.
@@ -346,19 +1413,7 @@ class DiscordOAuthClient:
         redirect_uri: Optional[:class:`str`]
             Optional redirect URI to pass to Discord. Defaults to the client's redirect URI.
         """
-        client_id = f"client_id={self.client_id}"
-        redirect_uri = f"redirect_uri={redirect_uri or self.redirect_uri}"
-        scopes = f"scope={self.scope}"
-        response_type = "response_type=code"
-        url = (
-            DISCORD_URL
-            + f"/api/oauth2/authorize?{client_id}&{redirect_uri}&{scopes}&{response_type}"
-        )
-        if state:
-            url += f"&state={state}"
-        if prompt:
-            url += f"&prompt={prompt}"
-        return RedirectResponse(url)
+        return RedirectResponse(self.authorization_url(state, prompt, redirect_uri))
 
     def session(self, code) -> DiscordOAuthSession:
         """Create a new DiscordOAuthSession from an authorization code.
@@ -380,15 +1435,18 @@ class DiscordOAuthClient:
             client_secret=self.client_secret,
             scope=self.scope,
             redirect_uri=self.redirect_uri,
+            oauth_client=self,
         )
 
-    def session_from_token(self, token) -> DiscordOAuthSession:
+    def session_from_token(self, token, user_id=None) -> DiscordOAuthSession:
         """Create a new DiscordOAuthSession from an existing token.
 
         Parameters
         ----------
         token: Dict[:class:`str`, Union[:class:`str`, :class:`int`, :class:`float`]]
             An existing (valid) access token to use instead of the OAuth code exchange.
+        user_id: Optional[:class:`int`]
+            ID of the user the token belongs to, if known.
 
         Returns
         -------
@@ -398,12 +1456,52 @@ class DiscordOAuthClient:
         return DiscordOAuthSession(
             code=None,
             token=token,
+            user_id=user_id,
             client_id=self.client_id,
             client_secret=self.client_secret,
             scope=self.scope,
             redirect_uri=self.redirect_uri,
+            oauth_client=self,
         )
 
+    def user_session(self, token, user_id=None) -> UserSession:
+        """Create a lightweight :class:`UserSession` handle from an existing token.
+
+        Handles send requests through the client's shared transport, so they are much cheaper
+        to create than a :class:`DiscordOAuthSession` and don't need to be closed.
+
+        Parameters
+        ----------
+        token: Dict[:class:`str`, Union[:class:`str`, :class:`int`, :class:`float`]]
+            The user's token.
+        user_id: Optional[:class:`int`]
+            The user's ID, if known.
+
+        Returns
+        -------
+        :class:`UserSession`
+            A new handle.
+        """
+        return UserSession(self, token, user_id)
+
+    async def session_from_store(self, user_id):
+        """Create a new DiscordOAuthSession from a token in the client's token store.
+
+        Parameters
+        ----------
+        user_id: :class:`int`
+            The user's ID.
+
+        Returns
+        -------
+        Optional[:class:`DiscordOAuthSession`]
+            A new OAuth session, or ``None`` if no token is stored for the user.
+        """
+        token = await self.load_token(user_id)
+        if token is None:
+            return None
+        return self.session_from_token(dict(token), user_id=user_id)
+
     async def login(self, code):
         """Shorthand for session setup + identify.
 
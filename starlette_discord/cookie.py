@@ -0,0 +1,292 @@
+import binascii
+import hashlib
+import hmac
+import secrets
+import struct
+import time
+from typing import FrozenSet, NamedTuple, Optional, Tuple
+
+from .models import GuildList
+from .utils import urlsafe_b64decode, urlsafe_b64encode
+
+# issued at, expires at, user ID, number of guilds.
+_HEADER = struct.Struct(">IIQH")
+_SIGNED = 1
+_ENCRYPTED = 2
+_MAC_SIZE = 16
+_NONCE_SIZE = 12
+# browsers drop cookies larger than 4096 bytes, name and attributes included.
+MAX_SIZE = 4000
+
+
+def _import_aead():
+    # cryptography is only needed to encrypt cookies, so it is imported on first use.
+    try:
+        from cryptography.exceptions import InvalidTag
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    except ImportError as e:
+        raise ImportError(
+            "cryptography is required to encrypt session cookies. "
+            "Install it with 'pip install starlette-discord[encryption]'."
+        ) from e
+    return AESGCM, InvalidTag
+
+
+def _pack_str(value):
+    data = (value or "").encode("utf-8")
+    if len(data) > 255:
+        raise ValueError(f"Value {value!r} is too long to store in a session cookie.")
+    return bytes((len(data),)) + data
+
+
+def _unpack_str(raw, offset):
+    size = raw[offset]
+    end = offset + 1 + size
+    if end > len(raw):
+        raise ValueError("Truncated session cookie.")
+    return raw[offset + 1 : end].decode("utf-8"), end
+
+
+class CookieSession(NamedTuple):
+    """A user's token and identity, as stored in a session cookie by :class:`CookieCodec`.
+
+    Attributes
+    ----------
+    access_token: :class:`str`
+        The user's access token.
+    refresh_token: Optional[:class:`str`]
+        The user's refresh token, if any.
+    expires_at: Optional[:class:`int`]
+        When the access token expires, as a UNIX timestamp.
+    user_id: Optional[:class:`int`]
+        The user's ID, if it was stored.
+    username: Optional[:class:`str`]
+        The user's username, if it was stored.
+    guild_ids: Optional[FrozenSet[:class:`int`]]
+        IDs of the user's guilds, if they were stored.
+    scope: Tuple[:class:`str`]
+        The OAuth2 scopes the token was granted.
+    issued_at: :class:`int`
+        When the cookie was created, as a UNIX timestamp.
+    """
+
+    access_token: str
+    refresh_token: Optional[str]
+    expires_at: Optional[int]
+    user_id: Optional[int]
+    username: Optional[str]
+    guild_ids: Optional[FrozenSet[int]]
+    scope: Tuple[str, ...]
+    issued_at: int
+
+    @property
+    def token(self):
+        """Dict[:class:`str`, Union[:class:`str`, :class:`int`, :class:`list`]]: The stored token, as a token dict."""
+        token = {
+            "access_token": self.access_token,
+            "token_type": "Bearer",
+            "scope": list(self.scope),
+        }
+        if self.refresh_token:
+            token["refresh_token"] = self.refresh_token
+        if self.expires_at:
+            token["expires_at"] = self.expires_at
+        return token
+
+    @property
+    def expired(self):
+        """:class:`bool`: Whether the access token has expired."""
+        return self.expires_at is not None and self.expires_at < time.time()
+
+
+class CookieCodec:
+    """Packs a user's token and a snapshot of their identity into a compact, signed cookie value.
+
+    The value holds the access and refresh tokens, their expiry, the user's ID and username,
+    and their guild IDs, in a binary layout encoded as URL-safe base64. It is signed with
+    HMAC-SHA256, or encrypted with AES-GCM when ``encrypt`` is set, so requests can be
+    authenticated (and authorized by guild) from the cookie alone, without any server-side
+    lookup or request to Discord.
+
+    .. note::
+        Pass the codec to :class:`~starlette_discord.auth.DiscordAuthBackend` as ``cookie``
+        to authenticate requests from it.
+
+    .. warning::
+        Without ``encrypt``, anyone holding the cookie can read the tokens in it.
+        Always set it with ``httponly=True`` and ``secure=True``.
+
+    Parameters
+    ----------
+    secret: Union[:class:`str`, :class:`bytes`]
+        Key cookies are signed (and encrypted) with. Use at least 32 random bytes.
+    encrypt: :class:`bool`
+        Whether to encrypt cookies, which requires the ``cryptography`` package.
+        Install it with ``pip install starlette-discord[encryption]``.
+    max_age: Optional[:class:`float`]
+        Seconds after which cookies are rejected, so the identity snapshot in them can't get
+        too stale. ``None`` means cookies never expire.
+    """
+
+    __slots__ = ("encrypt", "max_age", "_hmac", "_aead", "_invalid_tag")
+
+    def __init__(self, secret, *, encrypt=False, max_age=None):
+        if isinstance(secret, str):
+            secret = secret.encode("utf-8")
+        if not secret:
+            raise ValueError("Parameter 'secret' must not be empty.")
+        self.encrypt = encrypt
+        self.max_age = max_age
+        # separate keys are derived for signing and encryption.
+        self._hmac = hmac.new(
+            hmac.digest(secret, b"starlette-discord cookie signing", "sha256"),
+            digestmod=hashlib.sha256,
+        )
+        self._aead = self._invalid_tag = None
+        if encrypt:
+            aesgcm, self._invalid_tag = _import_aead()
+            key = hmac.digest(secret, b"starlette-discord cookie encryption", "sha256")
+            self._aead = aesgcm(key)
+
+    def _sign(self, data):
+        mac = self._hmac.copy()
+        mac.update(data)
+        return mac.digest()[:_MAC_SIZE]
+
+    def dumps(self, token, user=None, guilds=None):
+        """Returns the cookie value for a token and, optionally, the user and their guilds.
+
+        Parameters
+        ----------
+        token: Dict[:class:`str`, Union[:class:`str`, :class:`int`, :class:`float`]]
+            The user's token.
+        user: Optional[:class:`User`]
+            The user the token belongs to.
+        guilds: Optional[Union[:class:`GuildList`, Iterable[:class:`int`]]]
+            The user's guilds, or their IDs.
+
+        Returns
+        -------
+        :class:`str`
+            The cookie value.
+        """
+        if guilds is None:
+            guild_ids = None
+        elif isinstance(guilds, GuildList):
+            guild_ids = guilds.ids
+        else:
+            guild_ids = [int(getattr(guild, "id", guild)) for guild in guilds]
+
+        scope = token.get("scope") or ()
+        if not isinstance(scope, str):
+            scope = " ".join(scope)
+        # a count of 0xFFFF means no guilds were stored, rather than an empty guild list.
+        count = len(guild_ids) if guild_ids is not None else 0xFFFF
+        if guild_ids is not None and count >= 0xFFFF:
+            raise ValueError("Too many guilds to store in a session cookie.")
+
+        body = b"".join(
+            (
+                _HEADER.pack(
+                    int(time.time()),
+                    int(token.get("expires_at") or 0),
+                    int(user.id) if user is not None else 0,
+                    count,
+                ),
+                _pack_str(token["access_token"]),
+                _pack_str(token.get("refresh_token")),
+                _pack_str(user.username if user is not None else None),
+                _pack_str(scope),
+                struct.pack(f">{len(guild_ids)}Q", *sorted(guild_ids)) if guild_ids else b"",
+            )
+        )
+
+        if self._aead is not None:
+            header = bytes((_ENCRYPTED,))
+            nonce = secrets.token_bytes(_NONCE_SIZE)
+            raw = header + nonce + self._aead.encrypt(nonce, body, header)
+        else:
+            raw = bytes((_SIGNED,)) + body
+            raw += self._sign(raw)
+
+        value = urlsafe_b64encode(raw)
+        if len(value) > MAX_SIZE:
+            raise ValueError(
+                f"Session cookie is {len(value)} bytes long, browsers only keep cookies "
+                "up to 4096 bytes. Store fewer guilds."
+            )
+        return value
+
+    def _open(self, raw):
+        if raw[0] == _ENCRYPTED:
+            if self._aead is None or len(raw) < 1 + _NONCE_SIZE:
+                return None
+            nonce = raw[1 : 1 + _NONCE_SIZE]
+            try:
+                return self._aead.decrypt(nonce, raw[1 + _NONCE_SIZE :], raw[:1])
+            except self._invalid_tag:
+                return None
+
+        # signed cookies are rejected when encryption is required.
+        if raw[0] != _SIGNED or self._aead is not None or len(raw) <= _MAC_SIZE:
+            return None
+        data, mac = raw[:-_MAC_SIZE], raw[-_MAC_SIZE:]
+        if not hmac.compare_digest(mac, self._sign(data)):
+            return None
+        return data[1:]
+
+    def loads(self, value):
+        """Returns the session stored in a cookie value, or ``None`` if it is invalid.
+
+        Values that were tampered with, created with another secret or older than ``max_age``
+        are invalid. Cookies holding an expired access token are still returned,
+        since the token can be refreshed.
+
+        Parameters
+        ----------
+        value: :class:`str`
+            The cookie value.
+
+        Returns
+        -------
+        Optional[:class:`CookieSession`]
+            The stored session.
+        """
+        if not value or len(value) > MAX_SIZE:
+            return None
+        try:
+            raw = urlsafe_b64decode(value)
+        except (binascii.Error, ValueError):
+            return None
+        if not raw:
+            return None
+
+        body = self._open(raw)
+        if body is None or len(body) < _HEADER.size:
+            return None
+        try:
+            issued_at, expires_at, user_id, count = _HEADER.unpack_from(body)
+            offset = _HEADER.size
+            access_token, offset = _unpack_str(body, offset)
+            refresh_token, offset = _unpack_str(body, offset)
+            username, offset = _unpack_str(body, offset)
+            scope, offset = _unpack_str(body, offset)
+            if count == 0xFFFF:
+                guild_ids = None
+            else:
+                guild_ids = frozenset(struct.unpack_from(f">{count}Q", body, offset))
+        except (IndexError, UnicodeDecodeError, ValueError, struct.error):
+            return None
+
+        if self.max_age is not None and issued_at + self.max_age < time.time():
+            return None
+        return CookieSession(
+            access_token=access_token,
+            refresh_token=refresh_token or None,
+            expires_at=expires_at or None,
+            user_id=user_id or None,
+            username=username or None,
+            guild_ids=guild_ids,
+            scope=tuple(scope.split()),
+            issued_at=issued_at,
+        )
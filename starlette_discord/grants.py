@@ -0,0 +1,154 @@
+import time
+from urllib.parse import quote
+
+from oauthlib.oauth2.rfc6749.errors import (
+    MissingTokenError,
+    MissingTokenTypeError,
+    raise_from_error,
+)
+
+from .tracing import raise_for_status
+from .utils import json_loads as _json_loads
+
+HEADERS = {
+    "Accept": "application/json",
+    "Content-Type": "application/x-www-form-urlencoded",
+}
+
+
+def _form(**params):
+    return "&".join(f"{name}={quote(str(value), safe='')}" for name, value in params.items())
+
+
+class TokenGrants:
+    """Sends Discord's authorization code and refresh token grants without going through oauthlib.
+
+    Form bodies are built from a prefix encoded once per client, and token responses are
+    decoded directly with the configured JSON decoder. Errors returned by the token endpoint
+    are raised as the same :class:`oauthlib.oauth2.OAuth2Error` subclasses oauthlib raises.
+
+    .. note::
+        Created by :class:`DiscordOAuthClient` as :attr:`DiscordOAuthClient.grants`.
+        The generic oauthlib implementation is still available as
+        :meth:`DiscordOAuthSession.fetch_token` and :meth:`DiscordOAuthSession.refresh_token`.
+
+    Parameters
+    ----------
+    token_url: :class:`str`
+        URL of the token endpoint.
+    client_id: Union[:class:`str`, :class:`int`]
+        Discord application client ID.
+    client_secret: :class:`str`
+        Discord application client secret.
+    redirect_uri: :class:`str`
+        Discord application redirect URI.
+    json_loads: Callable[[:class:`bytes`], Any]
+        Function used to decode token responses.
+    """
+
+    __slots__ = ("token_url", "_code_body", "_refresh_body", "_json_loads")
+
+    def __init__(
+        self, token_url, client_id, client_secret, redirect_uri, *, json_loads=_json_loads
+    ):
+        self.token_url = token_url
+        credentials = _form(client_id=client_id, client_secret=client_secret)
+        self._code_body = (
+            f"grant_type=authorization_code&{credentials}"
+            f"&{_form(redirect_uri=redirect_uri)}&code="
+        )
+        self._refresh_body = f"grant_type=refresh_token&{credentials}&refresh_token="
+        self._json_loads = json_loads
+
+    def code_body(self, code):
+        """Returns the form body exchanging an authorization ``code`` for a token, as bytes."""
+        return (self._code_body + quote(code, safe="")).encode("ascii")
+
+    def refresh_body(self, refresh_token):
+        """Returns the form body exchanging a ``refresh_token`` for a new token, as bytes."""
+        return (self._refresh_body + quote(refresh_token, safe="")).encode("ascii")
+
+    def parse(self, content):
+        """Parses the body of a successful token response into a token dict.
+
+        ``scope`` is split into a list and ``expires_at`` is computed from ``expires_in``,
+        as oauthlib does.
+
+        Raises
+        ------
+        :class:`oauthlib.oauth2.OAuth2Error`
+            The response is an error, or has no ``access_token`` or ``token_type``.
+        """
+        token = self._json_loads(content)
+        if "error" in token:
+            raise_from_error(token["error"], token)
+        if "access_token" not in token:
+            raise MissingTokenError()
+        if "token_type" not in token:
+            raise MissingTokenTypeError()
+
+        scope = token.get("scope")
+        if isinstance(scope, str):
+            token["scope"] = scope.split()
+        expires_in = token.get("expires_in")
+        if expires_in is not None:
+            token["expires_in"] = expires_in = int(expires_in)
+            token["expires_at"] = round(time.time() + expires_in)
+        return token
+
+    async def _send(self, request, body):
+        resp = await request("POST", self.token_url, data=body, headers=HEADERS)
+        try:
+            content = await resp.read()
+        finally:
+            resp.release()
+        if resp.status >= 400:
+            try:
+                error = self._json_loads(content)
+            except ValueError:
+                error = None
+            if isinstance(error, dict) and "error" in error:
+                raise_from_error(error["error"], error)
+            # not an OAuth2 error, like a rate limit or a gateway error page.
+            raise_for_status(resp)
+        return self.parse(content)
+
+    async def exchange(self, request, code):
+        """Exchanges an authorization code for a token.
+
+        Parameters
+        ----------
+        request: Callable[..., Awaitable[:class:`aiohttp.ClientResponse`]]
+            Sends the request, called as ``request(method, url, data=..., headers=...)``.
+        code: :class:`str`
+            The authorization code.
+
+        Returns
+        -------
+        Dict[:class:`str`, Union[:class:`str`, :class:`int`, :class:`float`]]
+            The new token.
+        """
+        return await self._send(request, self.code_body(code))
+
+    async def refresh(self, request, refresh_token):
+        """Exchanges a refresh token for a new token.
+
+        If Discord doesn't return a new refresh token, the old one is kept.
+
+        Parameters
+        ----------
+        request: Callable[..., Awaitable[:class:`aiohttp.ClientResponse`]]
+            Sends the request, called as ``request(method, url, data=..., headers=...)``.
+        refresh_token: :class:`str`
+            The refresh token.
+
+        Returns
+        -------
+        Dict[:class:`str`, Union[:class:`str`, :class:`int`, :class:`float`]]
+            The new token.
+        """
+        if not refresh_token:
+            raise ValueError("The token has no 'refresh_token'.")
+        token = await self._send(request, self.refresh_body(refresh_token))
+        token.setdefault("refresh_token", refresh_token)
+        return token
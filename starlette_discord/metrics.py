@@ -0,0 +1,256 @@
+import contextlib
+import time
+from bisect import bisect_left
+
+from starlette.responses import Response
+
+# seconds, tuned for HTTP round trips to Discord.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# name: (type, help). Metrics that aren't listed here are still recorded and rendered.
+METRICS = {
+    "discord_token_exchange_seconds": (
+        "histogram",
+        "Time taken to exchange an authorization code for a token.",
+    ),
+    "discord_token_refresh_seconds": (
+        "histogram",
+        "Time taken to refresh a token.",
+    ),
+    "discord_request_seconds": (
+        "histogram",
+        "Time taken by requests to the Discord API, including rate limit waits and retries.",
+    ),
+    "discord_responses_total": (
+        "counter",
+        "Responses received from the Discord API, by route and status code.",
+    ),
+    "discord_ratelimited_total": (
+        "counter",
+        "429 responses received from the Discord API.",
+    ),
+    "discord_retries_total": (
+        "counter",
+        "Requests retried after being rate limited.",
+    ),
+    "discord_cache_hits_total": (
+        "counter",
+        "API responses served from the response cache.",
+    ),
+    "discord_cache_misses_total": (
+        "counter",
+        "API responses not found in the response cache.",
+    ),
+    "discord_coalesced_total": (
+        "counter",
+        "Calls that shared an identical call's request instead of making their own, by operation.",
+    ),
+    "discord_requests_in_flight": (
+        "gauge",
+        "Requests to the Discord API currently in progress.",
+    ),
+    "discord_pool_connections_acquired": (
+        "gauge",
+        "Connections currently in use in the client's connection pool.",
+    ),
+    "discord_pool_connections_limit": (
+        "gauge",
+        "Maximum number of connections in the client's connection pool.",
+    ),
+    "discord_connections_total": (
+        "counter",
+        "Requests sent, by whether they reused a pooled connection.",
+    ),
+    "discord_pool_wait_seconds": (
+        "histogram",
+        "Time requests spent waiting for a free connection in the pool.",
+    ),
+    "discord_dns_seconds": (
+        "histogram",
+        "Time spent resolving Discord's hostname.",
+    ),
+    "discord_connect_seconds": (
+        "histogram",
+        "Time spent opening new connections, including the TLS handshake.",
+    ),
+    "discord_ttfb_seconds": (
+        "histogram",
+        "Time from a request being sent to its response headers being received.",
+    ),
+}
+
+
+def _labels_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (
+        (name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, size):
+        self.counts = [0] * size
+        self.sum = 0.0
+        self.count = 0
+
+
+class Metrics:
+    """A small in-process registry of counters, gauges and histograms.
+
+    The client and its sessions record into this registry when it is passed to
+    :class:`DiscordOAuthClient`. Every recorded value is also passed to the registry's listeners,
+    which can forward it to another metrics system (e.g. statsd).
+
+    Use :meth:`render` to get the metrics in the Prometheus text format,
+    or mount :meth:`endpoint` as a Starlette route::
+
+        metrics = Metrics()
+        client = DiscordOAuthClient(..., metrics=metrics)
+        app = Starlette(routes=[Route("/metrics", metrics.endpoint)])
+
+    Parameters
+    ----------
+    buckets: Sequence[:class:`float`]
+        Upper bounds of the histogram buckets, in seconds. Defaults to :data:`DEFAULT_BUCKETS`.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+        self._collectors = []
+        self._listeners = []
+
+    def add_listener(self, listener):
+        """Register a function called with ``(kind, name, value, labels)`` for every recorded value.
+
+        ``kind`` is ``"counter"``, ``"gauge"`` or ``"histogram"``.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """Unregister a listener added with :meth:`add_listener`."""
+        self._listeners.remove(listener)
+
+    def add_collector(self, collector):
+        """Register a function called before rendering, to update gauges that are sampled lazily."""
+        self._collectors.append(collector)
+
+    def _notify(self, kind, name, value, labels):
+        for listener in self._listeners:
+            listener(kind, name, value, labels)
+
+    def inc(self, name, value=1, **labels):
+        """Increment a counter."""
+        series = self._counters.setdefault(name, {})
+        key = _labels_key(labels)
+        series[key] = series.get(key, 0) + value
+        if self._listeners:
+            self._notify("counter", name, value, labels)
+
+    def set(self, name, value, **labels):
+        """Set a gauge."""
+        self._gauges.setdefault(name, {})[_labels_key(labels)] = value
+        if self._listeners:
+            self._notify("gauge", name, value, labels)
+
+    def add(self, name, value, **labels):
+        """Add ``value`` (which may be negative) to a gauge."""
+        series = self._gauges.setdefault(name, {})
+        key = _labels_key(labels)
+        series[key] = series.get(key, 0) + value
+        if self._listeners:
+            self._notify("gauge", name, series[key], labels)
+
+    def observe(self, name, value, **labels):
+        """Record a value, usually a duration in seconds, in a histogram."""
+        series = self._histograms.setdefault(name, {})
+        key = _labels_key(labels)
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = _Histogram(len(self.buckets) + 1)
+        histogram.counts[bisect_left(self.buckets, value)] += 1
+        histogram.sum += value
+        histogram.count += 1
+        if self._listeners:
+            self._notify("histogram", name, value, labels)
+
+    @contextlib.contextmanager
+    def time(self, name, **labels):
+        """Context manager which observes how long its body took in a histogram."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def get(self, name, **labels):
+        """Returns the current value of a counter or gauge, or the number of observations of a histogram."""
+        key = _labels_key(labels)
+        if name in self._histograms:
+            histogram = self._histograms[name].get(key)
+            return histogram.count if histogram is not None else 0
+        series = self._counters.get(name) or self._gauges.get(name) or {}
+        return series.get(key, 0)
+
+    def _header(self, lines, name, kind):
+        help_text = METRICS.get(name, (kind, None))[1]
+        if help_text:
+            lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    def render(self):
+        """Returns every metric in the Prometheus text exposition format.
+
+        Returns
+        -------
+        :class:`str`
+            The rendered metrics.
+        """
+        for collector in self._collectors:
+            collector()
+
+        lines = []
+        for kind, store in (("counter", self._counters), ("gauge", self._gauges)):
+            for name in sorted(store):
+                self._header(lines, name, kind)
+                for key, value in store[name].items():
+                    lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+
+        bounds = self.buckets + (float("inf"),)
+        for name in sorted(self._histograms):
+            self._header(lines, name, "histogram")
+            for key, histogram in self._histograms[name].items():
+                cumulative = 0
+                for bound, count in zip(bounds, histogram.counts):
+                    cumulative += count
+                    le = (("le", _format_value(float(bound))),)
+                    lines.append(f"{name}_bucket{_format_labels(key, le)} {cumulative}")
+                labels = _format_labels(key)
+                lines.append(f"{name}_sum{labels} {_format_value(histogram.sum)}")
+                lines.append(f"{name}_count{labels} {histogram.count}")
+        lines.append("")
+        return "\n".join(lines)
+
+    async def endpoint(self, request):
+        """A Starlette endpoint serving :meth:`render`. Mount it with ``Route("/metrics", metrics.endpoint)``."""
+        return Response(self.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,6 +1,19 @@
+from collections.abc import Sequence
 from typing import List, Optional
 
-import discord
+from .permissions import GuildPermissionIndex
+
+
+def _import_discord():
+    # discord.py is only needed by the to_dpy() bridges, so it is imported on first use.
+    try:
+        import discord
+    except ImportError as e:
+        raise ImportError(
+            "discord.py is required to convert models to discord.py objects. "
+            "Install it with 'pip install starlette-discord[discord]'."
+        ) from e
+    return discord
 
 
 class DiscordObject:
@@ -12,8 +25,10 @@ class DiscordObject:
         The Discord object's unique ID.
     """
 
-    def __init__(self, data):
-        self._json_data = data
+    __slots__ = ("_json_data", "id")
+
+    def __init__(self, data, keep_json=True):
+        self._json_data = data if keep_json else None
         self.id = int(data["id"])
 
     @classmethod
@@ -41,9 +56,18 @@ class DiscordObject:
         return self.id >> 22
 
     def json(self):
-        """Returns the original JSON data for this model."""
+        """Returns the original JSON data for this model.
+
+        If the model was created without keeping its JSON data, an equivalent payload is rebuilt
+        from the model's attributes instead.
+        """
+        if self._json_data is None:
+            return self._to_json()
         return self._json_data
 
+    def _to_json(self):
+        return {"id": str(self.id)}
+
 
 class User(DiscordObject):
     """A `user`_ model from Discord. Returned by ``session.identify()``.
@@ -83,14 +107,14 @@ class User(DiscordObject):
     """
 
     __slots__ = (
-        "_json_data",
-        "id",
         "username",
         "discriminator",
         "avatar",
         "flags",
-        "public_flags" "banner",
-        "banner_color" "accent_color",
+        "public_flags",
+        "banner",
+        "banner_color",
+        "accent_color",
         "locale",
         "mfa_enabled",
         "email",
@@ -112,8 +136,8 @@ class User(DiscordObject):
     email: Optional[str]
     verified: bool
 
-    def __init__(self, *, data):
-        super().__init__(data)
+    def __init__(self, *, data, keep_json=True):
+        super().__init__(data, keep_json)
         self._update(data)
 
     def __repr__(self) -> str:
@@ -139,6 +163,23 @@ class User(DiscordObject):
         self.email = data.get("email", None)
         self.verified = data.get("verified", None)
 
+    def _to_json(self):
+        return {
+            "id": str(self.id),
+            "username": self.username,
+            "discriminator": self.discriminator,
+            "avatar": self.avatar,
+            "flags": self.flags,
+            "public_flags": self.public_flags,
+            "banner": self.banner,
+            "banner_color": self.banner_color,
+            "accent_color": self.accent_color,
+            "locale": self.locale,
+            "mfa_enabled": self.mfa_enabled,
+            "email": self.email,
+            "verified": self.verified,
+        }
+
     async def to_dpy(self, client):
         """Tries to convert this User to a ``discord.User``.
 
@@ -158,6 +199,7 @@ class User(DiscordObject):
         :class:`discord.User`
             The discord.py User object, if it could be found.
         """
+        discord = _import_discord()
         user = client.get_user(self.id)
         if not user:
             try:
@@ -192,8 +234,6 @@ class Guild(DiscordObject):
     """
 
     __slots__ = (
-        "_json_data",
-        "id",
         "name",
         "icon",
         "owner",
@@ -209,9 +249,9 @@ class Guild(DiscordObject):
     permissions: int
     features: List[str]
 
-    def __init__(self, *, data):
+    def __init__(self, *, data, keep_json=True):
         self._update(data)
-        super().__init__(data)
+        super().__init__(data, keep_json)
 
     def __repr__(self) -> str:
         return f"<Guild id={self.id} name={self.name!r}>"
@@ -229,6 +269,16 @@ class Guild(DiscordObject):
         self.permissions = int(data["permissions"])
         self.features = data["features"]
 
+    def _to_json(self):
+        return {
+            "id": str(self.id),
+            "name": self.name,
+            "icon": self.icon,
+            "owner": self.owner,
+            "permissions": str(self.permissions),
+            "features": self.features,
+        }
+
     async def to_dpy(self, client):
         """Tries to convert this Guild to a ``discord.Guild``.
 
@@ -248,6 +298,7 @@ class Guild(DiscordObject):
         :class:`discord.Guild`
             The discord.py Guild object, if the guild could be found.
         """
+        discord = _import_discord()
         guild = client.get_guild(self.id)
         if not guild:
             try:
@@ -257,6 +308,121 @@ class Guild(DiscordObject):
         return guild
 
 
+class GuildList(Sequence):
+    """A read-only list of :class:`Guild` models, returned by ``session.guilds()``.
+
+    The raw guild payloads are kept as-is and :class:`Guild` objects are only created
+    when they are accessed, either by index or by iterating. Length, membership tests
+    and lookups by ID never create any objects.
+
+    Supports ``len(guilds)``, ``guilds[i]``, ``iter(guilds)`` and ``guild_id in guilds``
+    (where the ID can be an :class:`int`, a :class:`str` or any object with an ``id``).
+
+    Parameters
+    ----------
+    data: List[:class:`dict`]
+        The raw guild payloads.
+    keep_json: :class:`bool`
+        Whether the list and the :class:`Guild` objects it creates keep the raw payloads.
+        If ``False``, each payload is dropped once its :class:`Guild` has been created,
+        and :meth:`json` rebuilds the dropped ones on demand.
+    """
+
+    __slots__ = ("_data", "_guilds", "_index", "_permission_index", "_keep_json")
+
+    def __init__(self, data, keep_json=True):
+        # payloads are dropped from the list as guilds are created, so don't touch the caller's.
+        self._data = data if keep_json else list(data)
+        self._guilds = [None] * len(data)
+        self._index = None
+        self._permission_index = None
+        self._keep_json = keep_json
+
+    def __repr__(self) -> str:
+        return f"<GuildList len={len(self._data)}>"
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._get(i) for i in range(*index.indices(len(self._data)))]
+        if index < 0:
+            index += len(self._data)
+        if not 0 <= index < len(self._data):
+            raise IndexError("GuildList index out of range")
+        return self._get(index)
+
+    def __iter__(self):
+        for i in range(len(self._data)):
+            yield self._get(i)
+
+    def __contains__(self, item) -> bool:
+        return self._position(item) is not None
+
+    def _get(self, index):
+        guild = self._guilds[index]
+        if guild is None:
+            guild = self._guilds[index] = Guild(
+                data=self._data[index], keep_json=self._keep_json
+            )
+            if not self._keep_json:
+                self._data[index] = None
+        return guild
+
+    def _id(self, index):
+        data = self._data[index]
+        return int(data["id"]) if data is not None else self._guilds[index].id
+
+    def _position(self, item):
+        if self._index is None:
+            self._index = {self._id(i): i for i in range(len(self._data))}
+        guild_id = getattr(item, "id", item)
+        try:
+            return self._index.get(int(guild_id))
+        except (TypeError, ValueError):
+            return None
+
+    @property
+    def ids(self):
+        """List[:class:`int`]: The IDs of every guild in the list."""
+        return [self._id(i) for i in range(len(self._data))]
+
+    def get(self, guild_id, default=None):
+        """Returns the guild with the given ID, or ``default`` if the user isn't in it.
+
+        Parameters
+        ----------
+        guild_id: Union[:class:`int`, :class:`str`]
+            The ID of the guild to look up.
+        """
+        position = self._position(guild_id)
+        if position is None:
+            return default
+        return self._get(position)
+
+    def permission_index(self):
+        """Returns a :class:`~starlette_discord.permissions.GuildPermissionIndex` for this list.
+
+        The index is built on first call and reused afterwards.
+        """
+        if self._permission_index is None:
+            self._permission_index = GuildPermissionIndex(self.json())
+        return self._permission_index
+
+    def json(self):
+        """Returns the original JSON data for this guild list.
+
+        If ``keep_json`` is ``False``, payloads that were dropped are rebuilt from their guilds.
+        """
+        if self._keep_json:
+            return self._data
+        return [
+            data if data is not None else self._guilds[i].json()
+            for i, data in enumerate(self._data)
+        ]
+
+
 class Connection:
     """An account `connection`_ model from Discord.
 
@@ -302,8 +468,10 @@ class Connection:
     show_activity: bool
     verified: bool
 
-    def __init__(self, *, data):
+    def __init__(self, *, data, keep_json=True):
         self._update(data)
+        if not keep_json:
+            self._json_data = None
 
     def __repr__(self) -> str:
         return f"<Connection type={self.type}>"
@@ -322,5 +490,19 @@ class Connection:
         self.verified = data["verified"]
 
     def json(self):
-        """Returns the original JSON data for this model."""
+        """Returns the original JSON data for this model.
+
+        If the model was created without keeping its JSON data, an equivalent payload is rebuilt
+        from the model's attributes instead.
+        """
+        if self._json_data is None:
+            return {
+                "type": self.type,
+                "id": self.id,
+                "name": self.name,
+                "visibility": self.visibility,
+                "friend_sync": self.friend_sync,
+                "show_activity": self.show_activity,
+                "verified": self.verified,
+            }
         return self._json_data
@@ -252,12 +252,11 @@ class OAuth2Session(aiohttp.ClientSession):
             raise InsecureTransportError()
 
         if not code and authorization_response:
-            log.debug("-- response %s", authorization_response)
+            log.debug("Parsing authorization response.")
             self._client.parse_request_uri_response(
                 str(authorization_response), state=self._state
             )
             code = self._client.code
-            log.debug("--code %s", code)
         elif not code and isinstance(self._client, WebApplicationClient):
             code = self._client.code
             if not code:
@@ -362,16 +361,11 @@ class OAuth2Session(aiohttp.ClientSession):
             data=request_kwargs["data"],
         ) as resp:
             log.debug("Request to fetch token completed with status %s.", resp.status)
-            log.debug("Request headers were %s", headers)
-            log.debug("Request body was %s", body)
-            text = await resp.text()
+            content = await resp.read()
 
-            log.debug("Response headers were %s and content %s.", resp.headers, text)
             (resp,) = self._invoke_hooks("access_token_response", resp)
-        # print(text, self.scope)
-        self._client.parse_request_body_response(text, scope=self.scope)
-        self.token = self._client.token
-        log.debug("Obtained token %s.", self.token)
+        self.token = self._parse_token_response(content)
+        log.debug("Obtained token.")
         return self.token
 
     def token_from_fragment(self, authorization_response):
@@ -426,7 +420,6 @@ class OAuth2Session(aiohttp.ClientSession):
         body = self._client.prepare_refresh_body(
             body=body, refresh_token=refresh_token, scope=self.scope, **kwargs
         )
-        log.debug("Prepared refresh token request body %s", body)
 
         if headers is None:
             headers = {
@@ -445,16 +438,25 @@ class OAuth2Session(aiohttp.ClientSession):
             # proxy=proxies,
         ) as resp:
             log.debug("Request to refresh token completed with status %s.", resp.status)
-            text = await resp.text()
-            log.debug("Response headers were %s and content %s.", resp.headers, text)
+            content = await resp.read()
             (resp,) = self._invoke_hooks("refresh_token_response", resp)
 
-        self.token = self._client.parse_request_body_response(text, scope=self.scope)
+        self.token = self._parse_token_response(content)
         if "refresh_token" not in self.token:
             log.debug("No new refresh token given. Re-using old.")
             self.token["refresh_token"] = refresh_token
         return self.token
 
+    def _parse_token_response(self, content):
+        """Parse the raw body of a token endpoint response into a token dict.
+        Override this to use a different decoder.
+        :param content: The response body, as bytes.
+        :return: A token dict
+        """
+        return self._client.parse_request_body_response(
+            content.decode("utf-8"), scope=self.scope
+        )
+
     async def _request(
         self,
         method,
@@ -475,7 +477,7 @@ class OAuth2Session(aiohttp.ClientSession):
             url, headers, data = self._invoke_hooks(
                 "protected_request", url, headers, data
             )
-            log.debug("Adding token %s to request.", self.token)
+            log.debug("Adding token to request.")
             try:
                 url, headers, data = self._client.add_token(
                     url, http_method=method, body=data, headers=headers
@@ -502,9 +504,7 @@ class OAuth2Session(aiohttp.ClientSession):
                         self.auto_refresh_url, auth=auth, **kwargs
                     )
                     if self.token_updater:
-                        log.debug(
-                            "Updating token to %s using %s.", token, self.token_updater
-                        )
+                        log.debug("Updating token using %s.", self.token_updater)
                         await self.token_updater(token)
                         url, headers, data = self._client.add_token(
                             url, http_method=method, body=data, headers=headers
@@ -515,8 +515,7 @@ class OAuth2Session(aiohttp.ClientSession):
                     raise
 
         log.debug("Requesting url %s using method %s.", url, method)
-        log.debug("Supplying headers %s and data %s", headers, data)
-        log.debug("Passing through key word arguments %s.", kwargs)
+        log.debug("Supplying headers %s.", list(headers or ()))
         return await super()._request(method, url, headers=headers, data=data, **kwargs)
 
     def register_compliance_hook(self, hook_type, hook):
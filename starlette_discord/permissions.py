@@ -0,0 +1,183 @@
+import functools
+from array import array
+from bisect import bisect_left
+
+# commonly checked permission bits, see https://discord.com/developers/docs/topics/permissions
+KICK_MEMBERS = 1 << 1
+BAN_MEMBERS = 1 << 2
+ADMINISTRATOR = 1 << 3
+MANAGE_CHANNELS = 1 << 4
+MANAGE_GUILD = 1 << 5
+MANAGE_MESSAGES = 1 << 13
+MANAGE_ROLES = 1 << 28
+MANAGE_WEBHOOKS = 1 << 29
+
+
+@functools.lru_cache(maxsize=None)
+def _import_numpy():
+    # NumPy is heavy to import, so only pay for it once an index is actually built.
+    try:
+        import numpy
+    except ImportError:  # pragma: no cover
+        return None
+    return numpy
+
+
+def _guild_payloads(guilds):
+    if hasattr(guilds, "json"):
+        # a GuildList
+        return guilds.json()
+    return [g.json() if hasattr(g, "json") else g for g in guilds]
+
+
+class GuildPermissionIndex:
+    """A compact, column-oriented index of a user's guild permissions.
+
+    Guild IDs, permission bitfields and owner flags are stored in parallel arrays sorted by
+    guild ID, so lookups by ID are a binary search and bulk queries never touch :class:`Guild`
+    objects. If NumPy is installed, the columns are NumPy arrays and bulk queries are vectorized.
+
+    .. note::
+        Owners and administrators are treated as having every permission, like Discord does.
+
+    Parameters
+    ----------
+    guilds: Union[:class:`GuildList`, List[:class:`Guild`], List[:class:`dict`]]
+        The user's guilds, as returned by ``session.guilds()``, or the raw guild payloads.
+    """
+
+    __slots__ = ("_numpy", "_ids", "_permissions", "_owner")
+
+    def __init__(self, guilds):
+        rows = sorted(
+            (int(g["id"]), int(g["permissions"]), bool(g.get("owner")))
+            for g in _guild_payloads(guilds)
+        )
+        ids = [row[0] for row in rows]
+        permissions = [row[1] for row in rows]
+        owner = [row[2] for row in rows]
+
+        numpy = self._numpy = _import_numpy()
+        if numpy is not None:
+            self._ids = numpy.array(ids, dtype=numpy.uint64)
+            self._permissions = numpy.array(permissions, dtype=numpy.uint64)
+            self._owner = numpy.array(owner, dtype=numpy.bool_)
+        else:
+            self._ids = array("Q", ids)
+            self._permissions = array("Q", permissions)
+            self._owner = array("B", owner)
+
+    def __repr__(self) -> str:
+        return f"<GuildPermissionIndex len={len(self)}>"
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, guild_id) -> bool:
+        return self.contains(guild_id)
+
+    def _position(self, guild_id):
+        guild_id = int(getattr(guild_id, "id", guild_id))
+        numpy = self._numpy
+        if numpy is not None:
+            position = int(numpy.searchsorted(self._ids, numpy.uint64(guild_id)))
+        else:
+            position = bisect_left(self._ids, guild_id)
+        if position < len(self._ids) and int(self._ids[position]) == guild_id:
+            return position
+        return None
+
+    def contains(self, guild_id):
+        """Whether the user is in the guild with the given ID.
+
+        Parameters
+        ----------
+        guild_id: Union[:class:`int`, :class:`str`]
+            The ID of the guild.
+        """
+        return self._position(guild_id) is not None
+
+    def permissions(self, guild_id):
+        """Returns the user's permission bitfield in a guild, or ``None`` if they aren't in it.
+
+        Parameters
+        ----------
+        guild_id: Union[:class:`int`, :class:`str`]
+            The ID of the guild.
+        """
+        position = self._position(guild_id)
+        if position is None:
+            return None
+        return int(self._permissions[position])
+
+    def is_owner(self, guild_id):
+        """Whether the user owns the guild with the given ID.
+
+        Parameters
+        ----------
+        guild_id: Union[:class:`int`, :class:`str`]
+            The ID of the guild.
+        """
+        position = self._position(guild_id)
+        return position is not None and bool(self._owner[position])
+
+    def has_permissions(self, guild_id, mask):
+        """Whether the user has every permission in ``mask`` in a guild.
+
+        Parameters
+        ----------
+        guild_id: Union[:class:`int`, :class:`str`]
+            The ID of the guild.
+        mask: :class:`int`
+            The permission bits to check for, e.g. ``MANAGE_GUILD | MANAGE_ROLES``.
+        """
+        position = self._position(guild_id)
+        if position is None:
+            return False
+        permissions = int(self._permissions[position])
+        return (
+            bool(self._owner[position])
+            or permissions & ADMINISTRATOR == ADMINISTRATOR
+            or permissions & mask == mask
+        )
+
+    def with_permissions(self, mask):
+        """Returns the IDs of every guild the user has every permission in ``mask`` in.
+
+        Parameters
+        ----------
+        mask: :class:`int`
+            The permission bits to check for, e.g. ``MANAGE_GUILD | MANAGE_ROLES``.
+
+        Returns
+        -------
+        List[:class:`int`]
+            The matching guild IDs, in ascending order.
+        """
+        numpy = self._numpy
+        if numpy is not None:
+            mask = numpy.uint64(mask)
+            admin = numpy.uint64(ADMINISTRATOR)
+            matches = (
+                self._owner
+                | ((self._permissions & admin) == admin)
+                | ((self._permissions & mask) == mask)
+            )
+            return self._ids[matches].tolist()
+        return [
+            guild_id
+            for guild_id, permissions, owner in zip(
+                self._ids, self._permissions, self._owner
+            )
+            if owner or permissions & ADMINISTRATOR or permissions & mask == mask
+        ]
+
+    def owned(self):
+        """Returns the IDs of every guild the user owns, in ascending order."""
+        if self._numpy is not None:
+            return self._ids[self._owner].tolist()
+        return [guild_id for guild_id, owner in zip(self._ids, self._owner) if owner]
+
+    def ids(self):
+        """Returns the IDs of every guild in the index, in ascending order."""
+        return self._ids.tolist()
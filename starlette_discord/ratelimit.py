@@ -0,0 +1,222 @@
+import asyncio
+import logging
+import re
+import time
+from urllib.parse import urlsplit
+
+from .utils import token_fingerprint
+
+log = logging.getLogger(__name__)
+
+# Discord scopes rate limits by these "major" parameters.
+_MAJOR_PARAM_RE = re.compile(r"/(?:guilds|channels|webhooks)/(\d+)")
+_SNOWFLAKE_RE = re.compile(r"/\d{15,}")
+
+
+def _float_header(headers, name):
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+class RateLimitBucket:
+    """Local view of a single Discord rate limit bucket.
+
+    Requests acquire the bucket before they are sent. When the bucket is known to be
+    exhausted, acquiring it waits (in order) until the bucket resets.
+    """
+
+    __slots__ = ("limit", "remaining", "reset_at", "_lock")
+
+    def __init__(self):
+        self.limit = None
+        self.remaining = None
+        self.reset_at = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def locked(self):
+        return self._lock.locked()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                # nothing is known about this bucket yet, let the request through.
+                if self.remaining is None:
+                    return
+                now = time.monotonic()
+                if now >= self.reset_at:
+                    self.remaining = self.limit
+                if self.remaining is None or self.remaining > 0:
+                    if self.remaining is not None:
+                        self.remaining -= 1
+                    return
+                delay = self.reset_at - now
+                log.debug("Bucket exhausted, waiting %.2f seconds.", delay)
+                await asyncio.sleep(delay)
+
+    def update(self, headers):
+        limit = _float_header(headers, "X-RateLimit-Limit")
+        remaining = _float_header(headers, "X-RateLimit-Remaining")
+        reset_after = _float_header(headers, "X-RateLimit-Reset-After")
+
+        if limit is not None:
+            self.limit = int(limit)
+        if remaining is not None:
+            remaining = int(remaining)
+            # requests that are still in flight have already been counted locally.
+            if self.remaining is None or remaining < self.remaining:
+                self.remaining = remaining
+        if reset_after is not None:
+            self.reset_at = time.monotonic() + reset_after
+
+
+class RateLimiter:
+    """Schedules requests according to the rate limit headers returned by Discord.
+
+    State is tracked per bucket, as reported by the ``X-RateLimit-Bucket`` header, and per major
+    parameter. Requests to ``/users/@me`` endpoints are additionally tracked per access token.
+    Requests that would exceed a bucket are queued until it resets, and ``429`` responses are
+    retried after the delay given by Discord instead of being returned to the caller.
+
+    .. note::
+        A single limiter is shared by every session created by a :class:`DiscordOAuthClient`.
+
+    Parameters
+    ----------
+    max_retries: :class:`int`
+        How many times a request that was rate limited is retried before the ``429``
+        response is returned. Defaults to ``3``.
+    max_buckets: :class:`int`
+        Number of tracked buckets after which expired buckets are pruned. Defaults to ``10000``.
+    metrics: Optional[:class:`~starlette_discord.metrics.Metrics`]
+        Registry to record request latencies, status codes and rate limits in.
+    """
+
+    def __init__(self, *, max_retries=3, max_buckets=10000, metrics=None):
+        self.max_retries = max_retries
+        self.max_buckets = max_buckets
+        self.metrics = metrics
+        self._bucket_hashes = {}
+        self._buckets = {}
+        self._global_reset_at = 0.0
+
+    @staticmethod
+    def route(method, url):
+        """Returns the (route, major parameter) pair a request is rate limited under."""
+        path = urlsplit(str(url)).path
+        major = _MAJOR_PARAM_RE.search(path)
+        return f"{method.upper()} {_SNOWFLAKE_RE.sub('/{id}', path)}", (
+            major.group(1) if major else None
+        )
+
+    def _key(self, route, major, token_key):
+        return self._bucket_hashes.get(route, route), major, token_key
+
+    def get_bucket(self, route, major=None, token_key=None):
+        key = self._key(route, major, token_key)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_buckets:
+                self._prune()
+            bucket = self._buckets[key] = RateLimitBucket()
+        return bucket
+
+    def _prune(self):
+        now = time.monotonic()
+        for key, bucket in list(self._buckets.items()):
+            if bucket.reset_at <= now and not bucket.locked:
+                del self._buckets[key]
+
+    async def _wait_global(self):
+        delay = self._global_reset_at - time.monotonic()
+        if delay > 0:
+            log.debug("Globally rate limited, waiting %.2f seconds.", delay)
+            await asyncio.sleep(delay)
+
+    def _update(self, route, major, token_key, headers):
+        bucket_hash = headers.get("X-RateLimit-Bucket")
+        if bucket_hash is not None and self._bucket_hashes.get(route) != bucket_hash:
+            self._bucket_hashes[route] = bucket_hash
+        self.get_bucket(route, major, token_key).update(headers)
+
+    async def request(self, send, method, url, *, token=None, **kwargs):
+        """Send a request through the limiter.
+
+        Parameters
+        ----------
+        send: Callable[..., Awaitable[:class:`aiohttp.ClientResponse`]]
+            The coroutine function that actually performs the request,
+            called as ``send(method, url, **kwargs)``.
+        method: :class:`str`
+            The HTTP method.
+        url: :class:`str`
+            The request URL.
+        token: Optional[:class:`str`]
+            Access token to track the request's bucket under, for per-user endpoints.
+
+        Returns
+        -------
+        :class:`aiohttp.ClientResponse`
+            The response. May still be a ``429`` if ``max_retries`` was exceeded.
+        """
+        metrics = self.metrics
+        if metrics is None:
+            return await self._request(send, method, url, token, kwargs)
+
+        route = self.route(method, url)[0]
+        metrics.add("discord_requests_in_flight", 1)
+        start = time.perf_counter()
+        try:
+            return await self._request(send, method, url, token, kwargs)
+        finally:
+            metrics.add("discord_requests_in_flight", -1)
+            metrics.observe("discord_request_seconds", time.perf_counter() - start, route=route)
+
+    async def _request(self, send, method, url, token, kwargs):
+        route, major = self.route(method, url)
+        token_key = token_fingerprint(token)
+        metrics = self.metrics
+
+        for attempt in range(self.max_retries + 1):
+            await self._wait_global()
+            await self.get_bucket(route, major, token_key).acquire()
+
+            resp = await send(method, url, **kwargs)
+            self._update(route, major, token_key, resp.headers)
+            if metrics is not None:
+                metrics.inc("discord_responses_total", route=route, status=resp.status)
+
+            if resp.status != 429:
+                return resp
+
+            retry_after = _float_header(resp.headers, "Retry-After")
+            if retry_after is None:
+                retry_after = _float_header(resp.headers, "X-RateLimit-Reset-After") or 1.0
+            is_global = resp.headers.get("X-RateLimit-Global", "").lower() == "true"
+            if is_global:
+                # recorded even when the 429 is returned, so other requests still wait.
+                self._global_reset_at = time.monotonic() + retry_after
+            if metrics is not None:
+                metrics.inc(
+                    "discord_ratelimited_total",
+                    route=route,
+                    scope="global" if is_global else "bucket",
+                )
+            if attempt == self.max_retries:
+                return resp
+            if metrics is not None:
+                metrics.inc("discord_retries_total", route=route)
+            log.warning(
+                "Rate limited on %s, retrying in %.2f seconds (attempt %d/%d).",
+                route,
+                retry_after,
+                attempt + 1,
+                self.max_retries,
+            )
+            resp.release()
+            await asyncio.sleep(retry_after)
@@ -0,0 +1,197 @@
+import asyncio
+import contextlib
+import heapq
+import itertools
+import logging
+import time
+
+from oauthlib.oauth2 import OAuth2Error
+
+from .utils import token_fingerprint
+
+log = logging.getLogger(__name__)
+
+
+class TokenRefresher:
+    """Refreshes registered tokens in the background, shortly before they expire.
+
+    Tokens are kept in a min-heap ordered by expiry, so the refresher only ever sleeps until
+    the next token is due, no matter how many tokens are registered. New tokens are reported
+    through the client's ``token_updater``, and registered tokens are replaced by their
+    refreshed versions.
+
+    .. note::
+        Created by :class:`DiscordOAuthClient` when ``background_refresh=True``,
+        and started and stopped by the client's :meth:`~DiscordOAuthClient.startup`
+        and :meth:`~DiscordOAuthClient.shutdown`.
+
+    Parameters
+    ----------
+    client: :class:`DiscordOAuthClient`
+        The client used to refresh tokens.
+    margin: :class:`float`
+        Seconds before expiry a token is refreshed. Defaults to ``300``.
+    concurrency: :class:`int`
+        Maximum number of refreshes running at once. Defaults to ``10``.
+    retry_delay: :class:`float`
+        Seconds to wait before retrying a refresh that failed with a transient error.
+        Defaults to ``30``.
+    """
+
+    def __init__(self, client, *, margin=300.0, concurrency=10, retry_delay=30.0):
+        self.margin = margin
+        self.concurrency = concurrency
+        self.retry_delay = retry_delay
+        self._client = client
+        self._heap = []
+        self._tokens = {}
+        self._counter = itertools.count()
+        self._semaphore = None
+        self._wakeup = None
+        self._task = None
+        self._inflight = set()
+
+    def __len__(self):
+        return len(self._tokens)
+
+    def __contains__(self, key):
+        return key in self._tokens
+
+    @property
+    def running(self):
+        """:class:`bool`: Whether the refresher's background task is running."""
+        return self._task is not None and not self._task.done()
+
+    def get(self, key):
+        """Returns the current token registered under ``key``, or ``None``."""
+        entry = self._tokens.get(key)
+        return entry[1] if entry is not None else None
+
+    def register(self, token, key=None):
+        """Track a token so it is refreshed before it expires.
+
+        Registering a new token under an existing key replaces the old one.
+
+        Parameters
+        ----------
+        token: Dict[:class:`str`, Union[:class:`str`, :class:`int`, :class:`float`]]
+            The token to track. Must have ``refresh_token`` and ``expires_at`` keys.
+        key: Optional[Hashable]
+            Key to track the token under, such as the user's ID.
+            Defaults to a fingerprint of the refresh token. Required if the client has a
+            token store, in which case it must be the user's ID.
+
+        Returns
+        -------
+        Hashable
+            The key the token was registered under.
+        """
+        if not token.get("refresh_token") or token.get("expires_at") is None:
+            raise ValueError(
+                "Parameter 'token' requires 'refresh_token' and 'expires_at' keys."
+            )
+        if key is None:
+            if self._client.token_store is not None:
+                raise ValueError(
+                    "Parameter 'key' must be the user's ID when the client has a token store."
+                )
+            key = token_fingerprint(token["refresh_token"])
+
+        refresh_at = token["expires_at"] - self.margin
+        self._tokens[key] = (refresh_at, token)
+        heapq.heappush(self._heap, (refresh_at, next(self._counter), key))
+        if len(self._heap) > 2 * len(self._tokens) + 64:
+            self._compact()
+        if self._wakeup is not None and self._heap[0][2] == key:
+            self._wakeup.set()
+        return key
+
+    def unregister(self, key):
+        """Stop tracking the token registered under ``key``."""
+        # the heap entry is dropped lazily, once it reaches the top.
+        self._tokens.pop(key, None)
+
+    def _compact(self):
+        self._heap = [
+            (refresh_at, counter, key)
+            for refresh_at, counter, key in self._heap
+            if self._is_current(key, refresh_at)
+        ]
+        heapq.heapify(self._heap)
+
+    def _is_current(self, key, refresh_at):
+        entry = self._tokens.get(key)
+        return entry is not None and entry[0] == refresh_at
+
+    def _next_delay(self):
+        while self._heap and not self._is_current(self._heap[0][2], self._heap[0][0]):
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return None
+        return self._heap[0][0] - time.time()
+
+    async def start(self):
+        """Start refreshing tokens in the background."""
+        if self.running:
+            return
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        """Stop the background task, cancelling any refreshes in progress."""
+        tasks = list(self._inflight)
+        if self._task is not None:
+            tasks.append(self._task)
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._task = None
+        self._wakeup = None
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            delay = self._next_delay()
+            if delay is None or delay > 0:
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                continue
+
+            refresh_at, _, key = heapq.heappop(self._heap)
+            token = self._tokens[key][1]
+            await self._semaphore.acquire()
+            task = asyncio.ensure_future(self._refresh(key, token))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _refresh(self, key, token):
+        try:
+            user_id = key if self._client.token_store is not None else None
+            new_token = await self._client.refresh(token, user_id=user_id)
+        except asyncio.CancelledError:
+            raise
+        except OAuth2Error as e:
+            # the refresh token was revoked or is otherwise unusable, stop tracking it.
+            log.warning("Dropping token %r, refresh failed: %s", key, e)
+            if self.get(key) is token:
+                self.unregister(key)
+        except Exception:
+            log.exception(
+                "Refreshing token %r failed, retrying in %.0f seconds.",
+                key,
+                self.retry_delay,
+            )
+            if self.get(key) is token:
+                retry_at = time.time() + self.retry_delay
+                self._tokens[key] = (retry_at, token)
+                heapq.heappush(self._heap, (retry_at, next(self._counter), key))
+                self._wakeup.set()
+        else:
+            # don't overwrite a token that was registered while this one was refreshing.
+            if self.get(key) is token:
+                self.register(new_token, key)
+        finally:
+            self._semaphore.release()
@@ -0,0 +1,91 @@
+import binascii
+import hashlib
+import hmac
+import secrets
+import struct
+import time
+
+from .utils import urlsafe_b64decode, urlsafe_b64encode
+
+_EXPIRY = struct.Struct(">I")
+_NONCE_SIZE = 12
+_MAC_SIZE = 16
+_BODY_SIZE = _EXPIRY.size + _NONCE_SIZE
+
+
+class StateSigner:
+    """Issues and verifies stateless, expiring OAuth2 ``state`` values.
+
+    A state is an expiry time and a random nonce, signed with HMAC-SHA256 and encoded as
+    43 URL-safe characters. It can be verified on the callback without storing it anywhere.
+
+    .. warning::
+        A state that isn't bound to a value only the user's browser has, like a session ID,
+        gives no protection against login CSRF: anyone can get a valid state and send it to
+        a victim along with their own authorization code.
+
+    .. note::
+        Created by :class:`DiscordOAuthClient` when it is given a ``state_secret``. Use the
+        client's :meth:`~DiscordOAuthClient.new_state` and :meth:`~DiscordOAuthClient.verify_state`.
+
+    Parameters
+    ----------
+    secret: Union[:class:`str`, :class:`bytes`]
+        Key states are signed with. Keep it secret, and make it at least 32 random bytes long.
+    ttl: :class:`float`
+        Seconds a state stays valid for. Defaults to ``600``.
+    """
+
+    __slots__ = ("ttl", "_hmac")
+
+    def __init__(self, secret, *, ttl=600.0):
+        if isinstance(secret, str):
+            secret = secret.encode("utf-8")
+        if not secret:
+            raise ValueError("Parameter 'secret' must not be empty.")
+        self.ttl = ttl
+        # keyed once, then copied for every signature.
+        self._hmac = hmac.new(secret, digestmod=hashlib.sha256)
+
+    def _sign(self, body, bind):
+        mac = self._hmac.copy()
+        mac.update(body)
+        if bind is not None:
+            mac.update(str(bind).encode("utf-8"))
+        return mac.digest()[:_MAC_SIZE]
+
+    def issue(self, bind=None):
+        """Returns a new signed state.
+
+        Parameters
+        ----------
+        bind: Optional[:class:`str`]
+            Value the state is bound to. The same value must be passed to :meth:`verify`.
+        """
+        body = _EXPIRY.pack(int(time.time() + self.ttl)) + secrets.token_bytes(_NONCE_SIZE)
+        return urlsafe_b64encode(body + self._sign(body, bind))
+
+    def verify(self, state, bind=None):
+        """Whether ``state`` was issued by this signer (with the same ``bind``) and hasn't expired.
+
+        Parameters
+        ----------
+        state: :class:`str`
+            The state returned to the callback.
+        bind: Optional[:class:`str`]
+            The value the state was bound to, if any.
+        """
+        if not state or len(state) > 64:
+            return False
+        try:
+            raw = urlsafe_b64decode(state)
+        except (binascii.Error, ValueError):
+            return False
+        if len(raw) != _BODY_SIZE + _MAC_SIZE:
+            return False
+
+        body, mac = raw[:_BODY_SIZE], raw[_BODY_SIZE:]
+        if not hmac.compare_digest(mac, self._sign(body, bind)):
+            return False
+        (expires_at,) = _EXPIRY.unpack_from(body)
+        return time.time() < expires_at
@@ -0,0 +1,260 @@
+import abc
+import asyncio
+import contextlib
+import logging
+import re
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+from .utils import json_dumps, json_loads
+
+log = logging.getLogger(__name__)
+
+_IDENTIFIER_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class TokenStore(abc.ABC):
+    """Base class for token stores, which persist users' tokens keyed by user ID.
+
+    Subclasses must implement :meth:`get`, :meth:`set_many` and :meth:`delete`.
+    User IDs are normalized to :class:`str`.
+    """
+
+    @abc.abstractmethod
+    async def get(self, user_id):
+        """Returns the token stored for a user, or ``None``.
+
+        Parameters
+        ----------
+        user_id: Union[:class:`int`, :class:`str`]
+            The user's ID.
+        """
+
+    async def set(self, user_id, token):
+        """Stores a user's token, replacing any previous one.
+
+        Parameters
+        ----------
+        user_id: Union[:class:`int`, :class:`str`]
+            The user's ID.
+        token: Dict[:class:`str`, Union[:class:`str`, :class:`int`, :class:`float`]]
+            The token to store.
+        """
+        await self.set_many({user_id: token})
+
+    @abc.abstractmethod
+    async def set_many(self, tokens):
+        """Stores several tokens at once.
+
+        Parameters
+        ----------
+        tokens: Dict[Union[:class:`int`, :class:`str`], Dict[:class:`str`, Any]]
+            Tokens to store, keyed by user ID.
+        """
+
+    @abc.abstractmethod
+    async def delete(self, user_id):
+        """Removes a user's token, if there is one.
+
+        Parameters
+        ----------
+        user_id: Union[:class:`int`, :class:`str`]
+            The user's ID.
+        """
+
+    async def close(self):
+        """Releases any resources held by the store."""
+
+
+class MemoryTokenStore(TokenStore):
+    """Keeps tokens in a dict, in the current process. Tokens are lost when the process exits."""
+
+    def __init__(self):
+        self._tokens = {}
+
+    def __len__(self):
+        return len(self._tokens)
+
+    async def get(self, user_id):
+        return self._tokens.get(str(user_id))
+
+    async def set_many(self, tokens):
+        for user_id, token in tokens.items():
+            self._tokens[str(user_id)] = token
+
+    async def delete(self, user_id):
+        self._tokens.pop(str(user_id), None)
+
+
+class SQLiteTokenStore(TokenStore):
+    """Keeps tokens in an SQLite database.
+
+    Queries run on a dedicated thread, so they never block the event loop.
+    Tokens are stored as JSON, one row per user. The thread and the connection are opened
+    on first use, so the store can be used again after :meth:`close`.
+
+    Parameters
+    ----------
+    path: :class:`str`
+        Path to the database file. It is created if it doesn't exist.
+    table: :class:`str`
+        Name of the table tokens are stored in. Defaults to ``discord_tokens``.
+    """
+
+    def __init__(self, path, *, table="discord_tokens"):
+        if not _IDENTIFIER_RE.match(table):
+            raise ValueError(f"Invalid table name {table!r}.")
+        self.path = path
+        self.table = table
+        self._conn = None
+        self._executor = None
+
+    def _connection(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} "
+                "(user_id TEXT PRIMARY KEY, token TEXT NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    async def _run(self, func, *args):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="starlette-discord-sqlite"
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def _get(self, user_id):
+        row = (
+            self._connection()
+            .execute(f"SELECT token FROM {self.table} WHERE user_id = ?", (user_id,))
+            .fetchone()
+        )
+        return json_loads(row[0]) if row is not None else None
+
+    def _set_many(self, rows):
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table} (user_id, token) VALUES (?, ?)",
+                rows,
+            )
+
+    def _delete(self, user_id):
+        conn = self._connection()
+        with conn:
+            conn.execute(f"DELETE FROM {self.table} WHERE user_id = ?", (user_id,))
+
+    def _close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    async def get(self, user_id):
+        return await self._run(self._get, str(user_id))
+
+    async def set_many(self, tokens):
+        rows = [(str(user_id), json_dumps(token)) for user_id, token in tokens.items()]
+        if rows:
+            await self._run(self._set_many, rows)
+
+    async def delete(self, user_id):
+        await self._run(self._delete, str(user_id))
+
+    async def close(self):
+        if self._executor is None:
+            return
+        executor = self._executor
+        try:
+            await self._run(self._close)
+        finally:
+            self._executor = None
+            executor.shutdown(wait=False)
+
+
+class WriteBehindQueue:
+    """Buffers token writes and flushes them to a :class:`TokenStore` in batches.
+
+    Writes for the same user are coalesced, so only the latest token is written.
+    Pending writes are visible through :meth:`get` before they are flushed.
+
+    .. note::
+        Used by :class:`DiscordOAuthClient` to persist refreshed tokens when it has a token store.
+
+    Parameters
+    ----------
+    store: :class:`TokenStore`
+        The store to flush writes to.
+    flush_interval: :class:`float`
+        Seconds between flushes. Defaults to ``1``.
+    max_batch: :class:`int`
+        Number of pending writes that triggers an early flush. Defaults to ``500``.
+    """
+
+    def __init__(self, store, *, flush_interval=1.0, max_batch=500):
+        self.store = store
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._pending = {}
+        self._full = None
+        self._task = None
+
+    def __len__(self):
+        return len(self._pending)
+
+    def get(self, user_id):
+        """Returns the pending token for a user, or ``None`` if nothing is pending."""
+        return self._pending.get(str(user_id))
+
+    def put(self, user_id, token):
+        """Schedule a token to be written."""
+        self._pending[str(user_id)] = token
+        if self._full is not None and len(self._pending) >= self.max_batch:
+            self._full.set()
+
+    def discard(self, user_id):
+        """Drop a pending write, e.g. because the token was deleted."""
+        self._pending.pop(str(user_id), None)
+
+    async def flush(self):
+        """Write every pending token to the store now."""
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        try:
+            await self.store.set_many(batch)
+        except BaseException:
+            # put the batch back, without overwriting anything newer. This includes
+            # cancellation by stop(), whose final flush then writes it.
+            self._pending = {**batch, **self._pending}
+            raise
+
+    async def start(self):
+        """Start flushing in the background."""
+        if self._task is None:
+            self._full = asyncio.Event()
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        """Stop flushing in the background, after a final flush."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+            self._full = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._full.wait(), self.flush_interval)
+            self._full.clear()
+            try:
+                await self.flush()
+            except Exception:
+                log.exception("Flushing %d tokens failed, retrying later.", len(self))
@@ -0,0 +1,208 @@
+import contextlib
+import logging
+import time
+
+import aiohttp
+
+from .ratelimit import RateLimiter
+
+log = logging.getLogger(__name__)
+
+
+class RequestTimings:
+    """Per-phase timings of a single HTTP request, in seconds.
+
+    Phases that didn't happen for a request, such as DNS resolution on a reused
+    connection, are ``None``.
+
+    Attributes
+    ----------
+    method: :class:`str`
+        The HTTP method.
+    url: :class:`str`
+        The request URL.
+    status: Optional[:class:`int`]
+        The response status, or ``None`` if the request failed before a response was received.
+    reused: Optional[:class:`bool`]
+        Whether the request was sent on a pooled connection instead of a new one.
+    queued: Optional[:class:`float`]
+        Time spent waiting for a free connection in the pool.
+    dns: Optional[:class:`float`]
+        Time spent resolving the host. ``0`` if the address was served from the DNS cache.
+    connect: Optional[:class:`float`]
+        Time spent opening a new connection, including the TLS handshake.
+    ttfb: Optional[:class:`float`]
+        Time from the request being sent to the response headers being received,
+        i.e. time spent waiting for Discord.
+    total: Optional[:class:`float`]
+        Time from the start of the request to the response headers being received, or to the failure.
+    """
+
+    __slots__ = (
+        "method",
+        "url",
+        "status",
+        "reused",
+        "queued",
+        "dns",
+        "connect",
+        "ttfb",
+        "total",
+    )
+
+    def __init__(self, method, url):
+        self.method = method
+        self.url = url
+        self.status = None
+        self.reused = None
+        self.queued = None
+        self.dns = None
+        self.connect = None
+        self.ttfb = None
+        self.total = None
+
+    def __repr__(self):
+        phases = " ".join(
+            f"{name}={getattr(self, name):.4f}"
+            for name in ("queued", "dns", "connect", "ttfb", "total")
+            if getattr(self, name) is not None
+        )
+        return f"<RequestTimings {self.method} {self.url} status={self.status} reused={self.reused} {phases}>"
+
+    def to_dict(self):
+        """Returns the timings as a :class:`dict`."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def raise_for_status(resp):
+    """Like :meth:`aiohttp.ClientResponse.raise_for_status`, but attaches the request's
+    :class:`RequestTimings` (if it was traced) to the raised error as ``timings``.
+    """
+    try:
+        resp.raise_for_status()
+    except aiohttp.ClientResponseError as e:
+        e.timings = getattr(resp, "timings", None)
+        raise
+
+
+class RequestTracer:
+    """Records per-phase connection timings of every request made through its :attr:`trace_config`.
+
+    Completed :class:`RequestTimings` are recorded in ``metrics`` (if given) and passed to every
+    callback added with :meth:`add_callback`. They are also attached to responses and
+    exceptions as a ``timings`` attribute, so errors raised by the library carry them.
+
+    .. note::
+        Created by :class:`DiscordOAuthClient` when ``trace_requests=True``. Every session the
+        client creates, and its :attr:`~DiscordOAuthClient.bot`, then uses the tracer.
+
+    Parameters
+    ----------
+    metrics: Optional[:class:`~starlette_discord.metrics.Metrics`]
+        Registry to record timings in.
+    """
+
+    def __init__(self, metrics=None):
+        self.metrics = metrics
+        self._callbacks = []
+
+        trace_config = self.trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_connection_queued_start.append(self._on_queued_start)
+        trace_config.on_connection_queued_end.append(self._on_queued_end)
+        trace_config.on_connection_reuseconn.append(self._on_reuseconn)
+        trace_config.on_dns_cache_hit.append(self._on_dns_cache_hit)
+        trace_config.on_dns_resolvehost_start.append(self._on_dns_start)
+        trace_config.on_dns_resolvehost_end.append(self._on_dns_end)
+        trace_config.on_connection_create_start.append(self._on_create_start)
+        trace_config.on_connection_create_end.append(self._on_create_end)
+        # added in aiohttp 3.8, older versions measure from when the connection was ready.
+        if hasattr(trace_config, "on_request_headers_sent"):
+            trace_config.on_request_headers_sent.append(self._on_headers_sent)
+        trace_config.on_request_end.append(self._on_request_end)
+        trace_config.on_request_exception.append(self._on_request_exception)
+
+    def add_callback(self, callback):
+        """Register a function called with the :class:`RequestTimings` of every completed request."""
+        self._callbacks.append(callback)
+
+    def remove_callback(self, callback):
+        """Unregister a callback added with :meth:`add_callback`."""
+        self._callbacks.remove(callback)
+
+    async def _on_request_start(self, session, ctx, params):
+        ctx.start = ctx.ready = time.perf_counter()
+        ctx.sent = None
+        ctx.timings = RequestTimings(params.method, str(params.url))
+
+    async def _on_queued_start(self, session, ctx, params):
+        ctx.queued_start = time.perf_counter()
+
+    async def _on_queued_end(self, session, ctx, params):
+        ctx.timings.queued = time.perf_counter() - ctx.queued_start
+
+    async def _on_reuseconn(self, session, ctx, params):
+        ctx.timings.reused = True
+        ctx.ready = time.perf_counter()
+
+    async def _on_dns_cache_hit(self, session, ctx, params):
+        ctx.timings.dns = 0.0
+
+    async def _on_dns_start(self, session, ctx, params):
+        ctx.dns_start = time.perf_counter()
+
+    async def _on_dns_end(self, session, ctx, params):
+        ctx.timings.dns = time.perf_counter() - ctx.dns_start
+
+    async def _on_create_start(self, session, ctx, params):
+        ctx.create_start = time.perf_counter()
+
+    async def _on_create_end(self, session, ctx, params):
+        now = ctx.ready = time.perf_counter()
+        timings = ctx.timings
+        timings.reused = False
+        # DNS resolution happens while the connection is being created.
+        timings.connect = now - ctx.create_start - (timings.dns or 0.0)
+
+    async def _on_headers_sent(self, session, ctx, params):
+        ctx.sent = time.perf_counter()
+
+    async def _on_request_end(self, session, ctx, params):
+        now = time.perf_counter()
+        timings = ctx.timings
+        timings.status = params.response.status
+        timings.ttfb = now - (ctx.sent or ctx.ready)
+        timings.total = now - ctx.start
+        with contextlib.suppress(AttributeError):
+            params.response.timings = timings
+        self._record(timings)
+
+    async def _on_request_exception(self, session, ctx, params):
+        timings = ctx.timings
+        timings.total = time.perf_counter() - ctx.start
+        with contextlib.suppress(AttributeError):
+            params.exception.timings = timings
+        self._record(timings)
+
+    def _record(self, timings):
+        metrics = self.metrics
+        if metrics is not None:
+            if timings.reused is not None:
+                metrics.inc(
+                    "discord_connections_total", reused=str(timings.reused).lower()
+                )
+            if timings.queued is not None:
+                metrics.observe("discord_pool_wait_seconds", timings.queued)
+            if timings.dns:
+                metrics.observe("discord_dns_seconds", timings.dns)
+            if timings.connect is not None:
+                metrics.observe("discord_connect_seconds", timings.connect)
+            if timings.ttfb is not None:
+                route = RateLimiter.route(timings.method, timings.url)[0]
+                metrics.observe("discord_ttfb_seconds", timings.ttfb, route=route)
+
+        for callback in self._callbacks:
+            try:
+                callback(timings)
+            except Exception:
+                log.exception("Request timings callback %r failed.", callback)
@@ -0,0 +1,80 @@
+import asyncio
+import base64
+import hashlib
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def token_fingerprint(token):
+    """Returns a short, stable fingerprint of an access token.
+
+    Used to key per-user state without keeping the token itself around.
+    """
+    if not token:
+        return None
+    return hashlib.blake2b(token.encode(), digest_size=8).hexdigest()
+
+
+def urlsafe_b64encode(data):
+    """Encodes bytes as URL-safe base64, without padding."""
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def urlsafe_b64decode(data):
+    """Decodes unpadded URL-safe base64 from :func:`urlsafe_b64encode`."""
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+# json_loads accepts str or bytes, json_dumps always returns str.
+# orjson is used when it is installed, it is several times faster than the stdlib.
+if orjson is not None:
+    json_loads = orjson.loads
+
+    def json_dumps(obj):
+        return orjson.dumps(obj).decode("utf-8")
+
+else:
+    json_loads = json.loads
+
+    def json_dumps(obj):
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=True)
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls that share a key.
+
+    While a call for a key is in flight, later calls with the same key wait for it and receive
+    its result (or exception) instead of starting their own. The shared call is shielded,
+    so cancelling one waiter doesn't cancel it for the others.
+    """
+
+    __slots__ = ("_calls",)
+
+    def __init__(self):
+        self._calls = {}
+
+    def __contains__(self, key):
+        return key in self._calls
+
+    def __len__(self):
+        return len(self._calls)
+
+    async def run(self, key, func, *args, **kwargs):
+        """Runs ``await func(*args, **kwargs)``, unless a call for ``key`` is already in flight."""
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(func(*args, **kwargs))
+            self._calls[key] = future
+            future.add_done_callback(lambda f: self._forget(key, f))
+        return await asyncio.shield(future)
+
+    def _forget(self, key, future):
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        if not future.cancelled():
+            # avoid "exception was never retrieved" if every waiter went away.
+            future.exception()
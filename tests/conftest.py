@@ -0,0 +1,39 @@
+import pytest
+
+from benchmarks.fake_discord import FakeDiscord
+from starlette_discord import DiscordOAuthClient
+
+# the other modules in this directory are example apps that need real credentials.
+collect_ignore = [
+    "test_dpy_fastapi.py",
+    "test_fastapi.py",
+    "test_starlette.py",
+    "test_state_fastapi.py",
+    "test_token_session.py",
+]
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def fake_discord():
+    """A :class:`FakeDiscord` served on a free local port, with its API URL as ``fake.url``."""
+    fake = FakeDiscord(ratelimit=0)
+    runner, fake.url = await fake.serve()
+    try:
+        yield fake
+    finally:
+        await runner.cleanup()
+
+
+@pytest.fixture
+async def client(fake_discord):
+    """A :class:`DiscordOAuthClient` pointed at :func:`fake_discord`."""
+    client = DiscordOAuthClient(
+        1, "secret", "http://localhost/callback", ("identify", "guilds"), api_url=fake_discord.url
+    )
+    async with client:
+        yield client
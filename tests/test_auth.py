@@ -0,0 +1,123 @@
+import time
+
+import pytest
+from starlette.authentication import UnauthenticatedUser
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+
+from starlette_discord.auth import DiscordAuthBackend, DiscordUser, current_user, require_user
+from starlette_discord.cookie import CookieCodec
+from starlette_discord.models import User
+
+pytestmark = pytest.mark.anyio
+
+
+def make_request(session=None, cookie=None):
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": []}
+    if session is not None:
+        scope["session"] = session
+    if cookie is not None:
+        scope["headers"].append((b"cookie", cookie.encode("latin-1")))
+    return Request(scope)
+
+
+async def authenticate(backend, request):
+    # what AuthenticationMiddleware does.
+    result = await backend.authenticate(request)
+    if result is None:
+        request.scope["auth"], request.scope["user"] = None, UnauthenticatedUser()
+    else:
+        request.scope["auth"], request.scope["user"] = result
+    return result
+
+
+async def test_requests_without_a_token_are_unauthenticated(client):
+    backend = DiscordAuthBackend(client)
+    assert await authenticate(backend, make_request()) is None
+    request = make_request(session={})
+    assert await authenticate(backend, request) is None
+    assert await current_user(request) is None
+    with pytest.raises(HTTPException) as info:
+        await require_user(request)
+    assert info.value.status_code == 401
+
+
+async def test_users_are_resolved_on_demand_and_cached(client, fake_discord):
+    backend = DiscordAuthBackend(client)
+    token = await client._exchange("code")
+    requests = fake_discord.requests
+
+    request = make_request(session={"token": token})
+    credentials, user = await authenticate(backend, request)
+    assert isinstance(user, DiscordUser)
+    assert set(credentials.scopes) == {"authenticated", "identify", "guilds"}
+    assert user.is_authenticated
+    assert user.display_name == "" and user.identity == ""
+    assert fake_discord.requests == requests
+
+    resolved = await current_user(request)
+    assert isinstance(resolved, User)
+    assert await require_user(request) is resolved
+    assert user.display_name == resolved.username
+    assert user.identity == str(resolved.id)
+    assert fake_discord.requests == requests + 1
+
+    # another request with the same token is served from the identity cache.
+    request = make_request(session={"token": token})
+    await authenticate(backend, request)
+    assert (await current_user(request)).id == resolved.id
+    assert fake_discord.requests == requests + 1
+
+    assert len(backend.identities) == 1
+    backend.invalidate(token)
+    assert len(backend.identities) == 0
+
+
+async def test_rejected_tokens_resolve_to_none(client):
+    backend = DiscordAuthBackend(client)
+    request = make_request(session={"token": "revoked"})
+    await authenticate(backend, request)
+    assert await current_user(request) is None
+    with pytest.raises(HTTPException):
+        await require_user(request)
+
+    expired = {"access_token": "expired", "expires_at": time.time() - 10}
+    request = make_request(session={"token": expired})
+    await authenticate(backend, request)
+    assert await current_user(request) is None
+
+
+async def test_refreshed_tokens_are_written_back(client):
+    backend = DiscordAuthBackend(client)
+    token = await client._exchange("code")
+    token["expires_at"] = time.time() - 10
+    session = {"token": token}
+    request = make_request(session=session)
+    await authenticate(backend, request)
+    assert await current_user(request) is not None
+    assert session["token"]["access_token"] != token["access_token"]
+    assert session["token"]["expires_at"] > time.time()
+
+
+async def test_cookie_identity_is_known_without_requests(client, fake_discord):
+    codec = CookieCodec(b"s" * 32)
+    backend = DiscordAuthBackend(client, cookie=codec)
+    token = await client._exchange("code")
+    account = await client.user_session(dict(token)).identify()
+    requests = fake_discord.requests
+
+    cookie = codec.dumps(token, account, [3, 1, 2])
+    request = make_request(cookie=f"discord_session={cookie}")
+    credentials, user = await authenticate(backend, request)
+    assert "authenticated" in credentials.scopes
+    assert user.identity == str(account.id)
+    assert user.display_name == account.username
+    assert user.guild_ids == {1, 2, 3}
+    assert fake_discord.requests == requests
+
+    assert await authenticate(backend, make_request(cookie="discord_session=invalid")) is None
+
+
+async def test_current_user_requires_the_middleware(client):
+    with pytest.raises(RuntimeError):
+        await current_user(make_request(session={}))
@@ -0,0 +1,119 @@
+import time
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from starlette_discord import DiscordOAuthClient
+from starlette_discord.bot import BotHTTP
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def bot_client(fake_discord):
+    client = DiscordOAuthClient(
+        1,
+        "secret",
+        "http://localhost/callback",
+        ("identify", "guilds.join"),
+        api_url=fake_discord.url,
+        bot_token="bot",
+    )
+    async with client:
+        yield client
+
+
+async def test_join_guilds(bot_client):
+    tokens = [await bot_client._exchange(f"code{i}") for i in range(3)]
+    items = [(tokens[0], 10), (tokens[1], 20, 1234), (tokens[2]["access_token"], 30)]
+    results = {r.guild_id: r async for r in bot_client.join_guilds(items, concurrency=2)}
+    assert sorted(results) == [10, 20, 30]
+    assert all(r.ok and r.member is not None for r in results.values())
+    assert results[20].user_id == 1234
+    assert results[10].user_id is not None
+    assert results[10].token == tokens[0]
+
+
+async def test_join_guilds_returns_refreshed_tokens(bot_client):
+    token = {**await bot_client._exchange("code"), "expires_at": time.time() - 1}
+    [result] = [r async for r in bot_client.join_guilds([(token, 10)])]
+    assert result.ok
+    assert result.token["access_token"] != token["access_token"]
+    assert result.token["expires_at"] > time.time()
+
+
+async def test_join_guilds_reports_failures(bot_client):
+    [result] = [r async for r in bot_client.join_guilds([("revoked", 10, 1234)])]
+    assert not result.ok
+    assert isinstance(result.error, aiohttp.ClientResponseError)
+    assert result.error.status == 403
+    assert result.token == {"access_token": "revoked"}
+
+
+async def test_join_guilds_requires_a_bot_token(client):
+    with pytest.raises(RuntimeError):
+        async for _ in client.join_guilds([("token", 10)]):
+            pass
+
+
+@pytest.fixture
+async def recorded_bot():
+    """A :class:`BotHTTP` whose requests are recorded by a local server, as ``bot.requests``."""
+    requests = []
+
+    async def handler(request):
+        body = await request.json() if request.can_read_body else None
+        requests.append((request.method, request.path, dict(request.headers), body))
+        if request.method == "DELETE" or request.path.endswith("/roles/3"):
+            return web.Response(status=204)
+        return web.json_response({"path": request.path})
+
+    app = web.Application()
+    app.router.add_route("*", "/{path:.*}", handler)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    url = f"http://127.0.0.1:{runner.addresses[0][1]}"
+    client = DiscordOAuthClient(
+        1, "secret", "http://localhost/callback", api_url=url, bot_token="bot"
+    )
+    try:
+        async with client:
+            client.bot.requests = requests
+            yield client.bot
+    finally:
+        await runner.cleanup()
+
+
+def test_bot_requires_a_token():
+    with pytest.raises(ValueError):
+        BotHTTP(None, "")
+
+
+async def test_bot_endpoints(recorded_bot):
+    bot = recorded_bot
+    assert await bot.get_member(1, 2) == {"path": "/guilds/1/members/2"}
+    assert await bot.add_member(1, 2, "access", nick="nick") == {"path": "/guilds/1/members/2"}
+    assert await bot.edit_member(1, 2, roles=[3]) == {"path": "/guilds/1/members/2"}
+    assert await bot.remove_member(1, 2) is None
+    assert await bot.add_role(1, 2, 3) is None
+    assert await bot.remove_role(1, 2, 3) is None
+    assert await bot.get_roles(1) == {"path": "/guilds/1/roles"}
+    assert [(method, path, body) for method, path, _, body in bot.requests] == [
+        ("GET", "/guilds/1/members/2", None),
+        ("PUT", "/guilds/1/members/2", {"access_token": "access", "nick": "nick"}),
+        ("PATCH", "/guilds/1/members/2", {"roles": [3]}),
+        ("DELETE", "/guilds/1/members/2", None),
+        ("PUT", "/guilds/1/members/2/roles/3", None),
+        ("DELETE", "/guilds/1/members/2/roles/3", None),
+        ("GET", "/guilds/1/roles", None),
+    ]
+    assert all(headers["Authorization"] == "Bot bot" for _, _, headers, _ in bot.requests)
+
+
+async def test_bot_audit_log_reason(recorded_bot):
+    await recorded_bot.remove_member(1, 2, reason="spam / ads: 100%")
+    headers = recorded_bot.requests[0][2]
+    assert headers["X-Audit-Log-Reason"] == "spam %2F ads%3A 100%25"
@@ -0,0 +1,96 @@
+import pytest
+
+from starlette_discord.cache import ResponseCache, TTLCache
+from starlette_discord.metrics import Metrics
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=-1)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert "b" not in cache
+    assert len(cache) == 1
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_with_no_room_stores_nothing():
+    cache = TTLCache(maxsize=0)
+    cache.set("a", 1)
+    assert len(cache) == 0
+
+
+def test_responses_are_keyed_by_endpoint_and_token():
+    cache = ResponseCache()
+    cache.set("identify", "token-a", "user-a")
+    assert cache.get("identify", "token-a") == "user-a"
+    assert cache.get("identify", "token-b") is None
+    assert cache.get("guilds", "token-a") is None
+    assert cache.stats["identify"] == {"hits": 1, "misses": 1}
+    assert cache.stats["guilds"] == {"hits": 0, "misses": 1}
+
+
+def test_endpoint_ttls():
+    cache = ResponseCache(ttls={"guilds": -1})
+    cache.set("identify", "token", "user")
+    cache.set("guilds", "token", "guilds")
+    assert cache.get("identify", "token") == "user"
+    assert cache.get("guilds", "token") is None
+
+
+def test_missing_token_is_never_cached():
+    cache = ResponseCache()
+    cache.set("identify", None, "user")
+    assert len(cache) == 0
+    assert cache.get("identify", None) is None
+
+
+def test_disabled_cache():
+    cache = ResponseCache(maxsize=0)
+    cache.set("identify", "token", "user")
+    assert not cache.enabled
+    assert cache.get("identify", "token") is None
+
+
+def test_invalidate_by_token_and_endpoint():
+    cache = ResponseCache()
+    for endpoint in ("identify", "guilds"):
+        cache.set(endpoint, "token", endpoint)
+    cache.invalidate("token", endpoint="guilds")
+    assert cache.get("identify", "token") == "identify"
+    assert cache.get("guilds", "token") is None
+    cache.invalidate("token")
+    assert len(cache) == 0
+
+
+def test_invalidate_by_user_id_covers_every_token():
+    cache = ResponseCache()
+    cache.set("identify", "token-a", "user", user_id=1)
+    cache.set("guilds", "token-b", "guilds", user_id=1)
+    cache.set("identify", "token-c", "other", user_id=2)
+    cache.invalidate(user_id=1)
+    assert cache.get("identify", "token-a") is None
+    assert cache.get("guilds", "token-b") is None
+    assert cache.get("identify", "token-c") == "other"
+
+
+@pytest.mark.parametrize("hit", [True, False])
+def test_hits_and_misses_are_counted_in_metrics(hit):
+    metrics = Metrics()
+    cache = ResponseCache(metrics=metrics)
+    if hit:
+        cache.set("identify", "token", "user")
+    cache.get("identify", "token")
+    name = "discord_cache_hits_total" if hit else "discord_cache_misses_total"
+    assert metrics.get(name, endpoint="identify") == 1
@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+from oauthlib.oauth2.rfc6749.errors import InvalidGrantError
+
+from starlette_discord import DiscordOAuthClient
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_user_session_fetches_through_fake_api(client, fake_discord):
+    session = client.user_session(await client._exchange("code"))
+    result = await session.fetch(identify=True, guilds=True, connections=True)
+    assert result.ok
+    assert len(result.guilds) == fake_discord.guild_count
+    assert session.user_id == result.user.id
+
+
+async def test_responses_are_cached_across_sessions(client, fake_discord):
+    token = await client._exchange("code")
+    await client.user_session(dict(token)).identify()
+    requests = fake_discord.requests
+    await client.user_session(dict(token)).identify()
+    assert fake_discord.requests == requests
+
+
+async def test_concurrent_refreshes_share_one_request(client, fake_discord):
+    token = await client._exchange("code")
+    requests = fake_discord.requests
+    refreshed = await asyncio.gather(*(client.refresh(dict(token)) for _ in range(5)))
+    assert fake_discord.requests == requests + 1
+    assert len({t["access_token"] for t in refreshed}) == 1
+
+
+@pytest.mark.parametrize(
+    "kwargs, expected",
+    [
+        ({"after": 10}, slice(11, None)),
+        ({"before": 20}, slice(19, None, -1)),
+        ({"after": 10, "before": 20}, slice(11, 20)),
+        ({"after": 10, "before": 20, "page_size": 3}, slice(11, 20)),
+        ({"after": 10, "limit": 4}, slice(11, 15)),
+    ],
+)
+async def test_iter_guilds_bounds(client, kwargs, expected):
+    session = client.user_session(await client._exchange("code"))
+    ids = sorted((await session.guilds()).ids)
+    for name in ("before", "after"):
+        if name in kwargs:
+            kwargs[name] = ids[kwargs[name]]
+    assert [g.id async for g in session.iter_guilds(**kwargs)] == ids[expected]
+
+
+async def test_concurrent_exchanges_of_a_code_share_one_request(client, fake_discord):
+    tokens = await asyncio.gather(*(client._exchange("code") for _ in range(3)))
+    assert fake_discord.requests == 1
+    assert tokens[0] == tokens[1] == tokens[2]
+    assert tokens[0] is not tokens[1]
+
+
+async def test_exchanged_code_is_not_replayable(client, fake_discord):
+    first = await client._exchange("code")
+    second = await client._exchange("code")
+    assert fake_discord.requests == 2
+    assert first["access_token"] != second["access_token"]
+
+
+async def test_exchange_grace_remembers_exchanged_tokens(fake_discord):
+    async with DiscordOAuthClient(
+        1, "secret", "http://localhost", api_url=fake_discord.url, exchange_grace=60
+    ) as client:
+        first = await client._exchange("code")
+        second = await client._exchange("code")
+    assert fake_discord.requests == 1
+    assert first == second and first is not second
+
+
+async def test_refreshed_tokens_are_copies(client):
+    token = await client._exchange("code")
+    first, second = await asyncio.gather(client.refresh(dict(token)), client.refresh(dict(token)))
+    late = await client.refresh(dict(token))
+    assert first == second == late
+    assert first is not second and first is not late
+
+
+async def test_background_refresh_remembers_tokens_past_the_margin(fake_discord):
+    # other holders of the token refresh it lazily, once it has expired,
+    # so they only arrive refresh_margin seconds after the refresher.
+    client = DiscordOAuthClient(
+        1,
+        "secret",
+        "http://localhost/callback",
+        api_url=fake_discord.url,
+        background_refresh=True,
+        refresh_margin=0.2,
+        refresh_grace=0.05,
+    )
+    async with client:
+        token = await client._exchange("code")
+        refreshed = await client.refresh(dict(token))
+        requests = fake_discord.requests
+        await asyncio.sleep(0.1)
+        assert await client.refresh(dict(token)) == refreshed
+        assert fake_discord.requests == requests
+
+
+async def test_refreshed_token_belongs_to_the_same_user(client):
+    token = await client._exchange("code")
+    user = await client.user_session(token).identify()
+    refreshed = await client.refresh(dict(token))
+    assert refreshed["access_token"] != token["access_token"]
+    assert (await client.user_session(refreshed).identify()).id == user.id
+
+
+async def test_used_refresh_token_is_rejected(fake_discord):
+    async with DiscordOAuthClient(
+        1, "secret", "http://localhost", api_url=fake_discord.url, refresh_grace=0
+    ) as client:
+        token = await client._exchange("code")
+        await client.refresh(dict(token))
+        with pytest.raises(InvalidGrantError):
+            await client.refresh(dict(token))
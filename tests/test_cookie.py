@@ -0,0 +1,100 @@
+import time
+
+import pytest
+
+from starlette_discord.cookie import MAX_SIZE, CookieCodec
+from starlette_discord.models import User
+from starlette_discord.utils import urlsafe_b64decode, urlsafe_b64encode
+
+from benchmarks.payloads import user
+
+SECRET = b"s" * 32
+
+
+def make_token(**kwargs):
+    token = {
+        "access_token": "access",
+        "refresh_token": "refresh",
+        "expires_at": int(time.time()) + 600,
+        "scope": ["identify", "guilds"],
+    }
+    token.update(kwargs)
+    return token
+
+
+def tamper(value, index):
+    raw = bytearray(urlsafe_b64decode(value))
+    raw[index] ^= 1
+    return urlsafe_b64encode(bytes(raw))
+
+
+def test_round_trip():
+    codec = CookieCodec(SECRET)
+    token = make_token()
+    account = User(data=user())
+    session = codec.loads(codec.dumps(token, account, [3, 1, 2]))
+    assert session.token == {**token, "token_type": "Bearer"}
+    assert session.user_id == account.id
+    assert session.username == account.username
+    assert session.guild_ids == {1, 2, 3}
+    assert not session.expired
+
+
+def test_guilds_are_optional():
+    codec = CookieCodec(SECRET)
+    assert codec.loads(codec.dumps(make_token())).guild_ids is None
+    assert codec.loads(codec.dumps(make_token(), guilds=[])).guild_ids == frozenset()
+
+
+@pytest.mark.parametrize("index", [0, 1, 10, 20, -1])
+def test_tampered_cookie_is_rejected(index):
+    codec = CookieCodec(SECRET)
+    assert codec.loads(tamper(codec.dumps(make_token()), index)) is None
+
+
+def test_cookie_from_another_secret_is_rejected():
+    value = CookieCodec(b"t" * 32).dumps(make_token())
+    assert CookieCodec(SECRET).loads(value) is None
+
+
+def test_cookie_older_than_max_age_is_rejected():
+    value = CookieCodec(SECRET).dumps(make_token())
+    assert CookieCodec(SECRET, max_age=60).loads(value) is not None
+    assert CookieCodec(SECRET, max_age=-1).loads(value) is None
+
+
+@pytest.mark.parametrize("value", [None, "", "!!!", "AQ", "a" * (MAX_SIZE + 1)])
+def test_malformed_cookie_is_rejected(value):
+    assert CookieCodec(SECRET).loads(value) is None
+
+
+def test_oversized_cookie_is_refused():
+    with pytest.raises(ValueError):
+        CookieCodec(SECRET).dumps(make_token(), guilds=range(1, 5000))
+
+
+def test_encrypted_round_trip():
+    pytest.importorskip("cryptography")
+    codec = CookieCodec(SECRET, encrypt=True)
+    token = make_token()
+    value = codec.dumps(token, guilds=[5, 4])
+    assert b"access" not in urlsafe_b64decode(value)
+    session = codec.loads(value)
+    assert session.token == {**token, "token_type": "Bearer"}
+    assert session.guild_ids == {4, 5}
+
+
+@pytest.mark.parametrize("index", [0, 1, 12, 20, -1])
+def test_tampered_encrypted_cookie_is_rejected(index):
+    pytest.importorskip("cryptography")
+    codec = CookieCodec(SECRET, encrypt=True)
+    assert codec.loads(tamper(codec.dumps(make_token()), index)) is None
+
+
+def test_encrypted_and_signed_cookies_are_not_interchangeable():
+    pytest.importorskip("cryptography")
+    encrypted = CookieCodec(SECRET, encrypt=True)
+    signed = CookieCodec(SECRET)
+    assert signed.loads(encrypted.dumps(make_token())) is None
+    assert encrypted.loads(signed.dumps(make_token())) is None
+    assert CookieCodec(b"t" * 32, encrypt=True).loads(encrypted.dumps(make_token())) is None
@@ -0,0 +1,84 @@
+import pytest
+
+from starlette_discord.metrics import Metrics
+from starlette_discord.ratelimit import RateLimiter
+
+URL = "https://discord.com/api/v9/users/@me"
+ROUTE = "GET /api/v9/users/@me"
+
+
+class Response:
+    def __init__(self, status):
+        self.status = status
+        self.headers = {"Retry-After": "0"}
+
+    def release(self):
+        pass
+
+
+def test_render_counters_and_gauges():
+    metrics = Metrics()
+    metrics.inc("discord_responses_total", route="GET /x", status=200)
+    metrics.inc("discord_responses_total", 2, route="GET /x", status=200)
+    metrics.set("discord_pool_connections_limit", 100)
+    metrics.add("discord_requests_in_flight", 1)
+    metrics.add("discord_requests_in_flight", -1)
+    metrics.inc("custom_total", label='quote " and \\ backslash')
+    lines = metrics.render().splitlines()
+    assert lines[:3] == [
+        "# TYPE custom_total counter",
+        'custom_total{label="quote \\" and \\\\ backslash"} 1',
+        "# HELP discord_responses_total Responses received from the Discord API, by route and status code.",
+    ]
+    assert 'discord_responses_total{route="GET /x",status="200"} 3' in lines
+    assert "# TYPE discord_pool_connections_limit gauge" in lines
+    assert "discord_pool_connections_limit 100" in lines
+    assert "discord_requests_in_flight 0" in lines
+    assert metrics.get("discord_responses_total", route="GET /x", status=200) == 3
+    assert metrics.get("discord_responses_total", route="GET /y", status=200) == 0
+
+
+def test_render_histograms():
+    metrics = Metrics(buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        metrics.observe("discord_request_seconds", value, route="GET /x")
+    lines = metrics.render().splitlines()
+    assert lines[1:] == [
+        "# TYPE discord_request_seconds histogram",
+        'discord_request_seconds_bucket{route="GET /x",le="0.1"} 1',
+        'discord_request_seconds_bucket{route="GET /x",le="1"} 3',
+        'discord_request_seconds_bucket{route="GET /x",le="+Inf"} 4',
+        'discord_request_seconds_sum{route="GET /x"} 6.05',
+        'discord_request_seconds_count{route="GET /x"} 4',
+    ]
+    assert metrics.get("discord_request_seconds", route="GET /x") == 4
+
+
+def test_listeners_and_collectors():
+    metrics = Metrics()
+    recorded = []
+    metrics.add_listener(lambda *args: recorded.append(args))
+    metrics.add_collector(lambda: metrics.set("sampled", 7))
+    metrics.inc("counted", route="r")
+    with metrics.time("timed"):
+        pass
+    assert recorded[0] == ("counter", "counted", 1, {"route": "r"})
+    assert recorded[1][:2] == ("histogram", "timed")
+    assert "sampled 7" in metrics.render()
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("max_retries", [0, 2])
+async def test_every_429_is_counted(max_retries):
+    metrics = Metrics()
+    limiter = RateLimiter(max_retries=max_retries, metrics=metrics)
+    responses = [Response(429) for _ in range(max_retries + 1)]
+
+    async def send(method, url, **kwargs):
+        return responses.pop(0)
+
+    assert (await limiter.request(send, "GET", URL)).status == 429
+    assert metrics.get("discord_ratelimited_total", route=ROUTE, scope="bucket") == max_retries + 1
+    assert metrics.get("discord_retries_total", route=ROUTE) == max_retries
+    assert metrics.get("discord_responses_total", route=ROUTE, status=429) == max_retries + 1
+    assert metrics.get("discord_request_seconds", route=ROUTE) == 1
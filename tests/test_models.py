@@ -0,0 +1,111 @@
+import pytest
+
+from starlette_discord.models import Connection, Guild, GuildList, User
+
+USER = {
+    "id": "80351110224678912",
+    "username": "Nelly",
+    "discriminator": "1337",
+    "avatar": "8342729096ea3675442027381ff50dfe",
+    "flags": 64,
+    "public_flags": 64,
+    "banner": None,
+    "banner_color": None,
+    "accent_color": 16711680,
+    "locale": "en-US",
+    "mfa_enabled": True,
+    "email": "nelly@discord.com",
+    "verified": True,
+}
+
+CONNECTION = {
+    "type": "github",
+    "id": "1234",
+    "name": "nelly",
+    "visibility": 1,
+    "friend_sync": False,
+    "show_activity": True,
+    "verified": True,
+}
+
+
+def guild_payload(id_, **fields):
+    return {
+        "id": str(id_),
+        "name": f"Guild {id_}",
+        "icon": None,
+        "owner": False,
+        "permissions": "0",
+        "features": [],
+        **fields,
+    }
+
+
+@pytest.fixture
+def payloads():
+    return [guild_payload(id_) for id_ in (30, 10, 20)]
+
+
+def test_guild_list_builds_guilds_on_access(payloads):
+    guilds = GuildList(payloads)
+    assert len(guilds) == 3
+    assert guilds._guilds == [None, None, None]
+    guild = guilds[1]
+    assert isinstance(guild, Guild)
+    assert guild.id == 10
+    assert guilds[1] is guild
+    assert guilds._guilds[0] is None and guilds._guilds[2] is None
+
+
+def test_guild_list_indexing(payloads):
+    guilds = GuildList(payloads)
+    assert guilds[-1].id == 20
+    assert [g.id for g in guilds[:2]] == [30, 10]
+    assert [g.id for g in guilds] == [30, 10, 20]
+    with pytest.raises(IndexError):
+        guilds[3]
+
+
+def test_guild_list_lookups_by_id_build_nothing(payloads):
+    guilds = GuildList(payloads)
+    assert 20 in guilds
+    assert "20" in guilds
+    assert Guild(data=payloads[2]) in guilds
+    assert 40 not in guilds
+    assert "not an id" not in guilds
+    assert guilds.ids == [30, 10, 20]
+    assert guilds._guilds == [None, None, None]
+    assert guilds.get(20) is guilds[2]
+    assert guilds.get(40, "missing") == "missing"
+
+
+def test_guild_list_json_is_the_payload(payloads):
+    guilds = GuildList(payloads)
+    assert guilds.json() is payloads
+
+
+@pytest.mark.parametrize(
+    "cls, data",
+    [(User, USER), (Guild, guild_payload(10, features=["COMMUNITY"])), (Connection, CONNECTION)],
+)
+def test_models_without_json_rebuild_it(cls, data):
+    kept = cls(data=data)
+    dropped = cls(data=data, keep_json=False)
+    assert kept.json() is data
+    assert dropped._json_data is None
+    assert dropped.json() == data
+    assert not hasattr(dropped, "__dict__")
+
+
+def test_guild_list_without_json_drops_payloads(payloads):
+    original = list(payloads)
+    guilds = GuildList(payloads, keep_json=False)
+    guild = guilds[1]
+    assert guild._json_data is None
+    assert guilds._data[1] is None
+    # the caller's list is left alone.
+    assert payloads == original
+    assert guilds.ids == [30, 10, 20]
+    assert guilds.get(10) is guild
+    assert guilds.json() == original
+    assert guilds.permission_index().ids() == [10, 20, 30]
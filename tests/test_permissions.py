@@ -0,0 +1,81 @@
+import pytest
+
+from starlette_discord import permissions
+from starlette_discord.models import GuildList
+from starlette_discord.permissions import (
+    ADMINISTRATOR,
+    KICK_MEMBERS,
+    MANAGE_GUILD,
+    MANAGE_ROLES,
+    GuildPermissionIndex,
+)
+
+PAYLOADS = [
+    {"id": "40", "permissions": str(MANAGE_GUILD | MANAGE_ROLES), "owner": False},
+    {"id": "10", "permissions": str(MANAGE_GUILD), "owner": False},
+    {"id": "30", "permissions": "0", "owner": True},
+    {"id": "20", "permissions": str(ADMINISTRATOR), "owner": False},
+    {"id": str(1 << 62), "permissions": str(KICK_MEMBERS), "owner": False},
+]
+
+
+@pytest.fixture(params=["numpy", "array"])
+def index(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(permissions, "_import_numpy", lambda: None)
+    index = GuildPermissionIndex(PAYLOADS)
+    assert (index._numpy is not None) == (request.param == "numpy")
+    return index
+
+
+def test_ids_are_sorted(index):
+    assert len(index) == 5
+    assert index.ids() == [10, 20, 30, 40, 1 << 62]
+
+
+def test_lookups(index):
+    assert 40 in index
+    assert index.contains("10")
+    assert 50 not in index
+    assert 0 not in index
+    assert index.permissions(40) == MANAGE_GUILD | MANAGE_ROLES
+    assert index.permissions(1 << 62) == KICK_MEMBERS
+    assert index.permissions(50) is None
+    assert index.is_owner(30)
+    assert not index.is_owner(40)
+    assert not index.is_owner(50)
+
+
+def test_has_permissions(index):
+    assert index.has_permissions(40, MANAGE_GUILD | MANAGE_ROLES)
+    assert not index.has_permissions(10, MANAGE_GUILD | MANAGE_ROLES)
+    # owners and administrators have every permission.
+    assert index.has_permissions(30, MANAGE_ROLES)
+    assert index.has_permissions(20, MANAGE_ROLES)
+    assert not index.has_permissions(50, 0)
+
+
+def test_bulk_queries(index):
+    assert index.with_permissions(MANAGE_GUILD) == [10, 20, 30, 40]
+    assert index.with_permissions(MANAGE_GUILD | MANAGE_ROLES) == [20, 30, 40]
+    assert index.with_permissions(KICK_MEMBERS) == [20, 30, 1 << 62]
+    assert index.owned() == [30]
+
+
+def test_index_from_guild_list():
+    payloads = [{**p, "name": p["id"], "features": []} for p in PAYLOADS]
+    guilds = GuildList(payloads)
+    index = guilds.permission_index()
+    assert guilds.permission_index() is index
+    assert index.ids() == [10, 20, 30, 40, 1 << 62]
+    assert GuildPermissionIndex(list(guilds)).ids() == index.ids()
+
+
+def test_empty_index(index):
+    index = GuildPermissionIndex([])
+    assert len(index) == 0
+    assert 10 not in index
+    assert index.with_permissions(MANAGE_GUILD) == []
+    assert index.owned() == []
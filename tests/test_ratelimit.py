@@ -0,0 +1,112 @@
+import time
+
+import pytest
+
+from starlette_discord.ratelimit import RateLimitBucket, RateLimiter
+
+pytestmark = pytest.mark.anyio
+
+URL = "https://discord.com/api/v9/users/@me"
+
+
+class Response:
+    def __init__(self, status=200, headers=None):
+        self.status = status
+        self.headers = headers or {}
+        self.released = False
+
+    def release(self):
+        self.released = True
+
+
+class Sender:
+    """Returns the given responses in order, recording every request."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    async def __call__(self, method, url, **kwargs):
+        self.requests.append((method, url, time.monotonic()))
+        return self.responses.pop(0)
+
+
+def test_route_normalizes_snowflakes_and_major_parameter():
+    route = RateLimiter.route("put", "https://x/api/guilds/81384788765712384/members/80351110224678912")
+    assert route == ("PUT /api/guilds/{id}/members/{id}", "81384788765712384")
+
+
+async def test_bucket_waits_until_reset():
+    bucket = RateLimitBucket()
+    await bucket.acquire()
+    bucket.update(
+        {"X-RateLimit-Limit": "1", "X-RateLimit-Remaining": "0", "X-RateLimit-Reset-After": "0.05"}
+    )
+    start = time.monotonic()
+    await bucket.acquire()
+    assert time.monotonic() - start >= 0.04
+    assert bucket.remaining == 0
+
+
+async def test_exhausted_bucket_delays_next_request():
+    limiter = RateLimiter()
+    headers = {
+        "X-RateLimit-Bucket": "abc",
+        "X-RateLimit-Limit": "1",
+        "X-RateLimit-Remaining": "0",
+        "X-RateLimit-Reset-After": "0.05",
+    }
+    send = Sender(Response(headers=headers), Response(headers=headers))
+    await limiter.request(send, "GET", URL, token="a")
+    await limiter.request(send, "GET", URL, token="a")
+    assert send.requests[1][2] - send.requests[0][2] >= 0.04
+
+
+async def test_buckets_are_tracked_per_token():
+    limiter = RateLimiter()
+    headers = {"X-RateLimit-Limit": "1", "X-RateLimit-Remaining": "0", "X-RateLimit-Reset-After": "10"}
+    send = Sender(Response(headers=headers), Response(headers=headers))
+    await limiter.request(send, "GET", URL, token="a")
+    start = time.monotonic()
+    await limiter.request(send, "GET", URL, token="b")
+    assert time.monotonic() - start < 1
+
+
+async def test_429_is_retried_after_retry_after():
+    limiter = RateLimiter()
+    limited = Response(429, {"Retry-After": "0.02"})
+    send = Sender(limited, Response(200))
+    resp = await limiter.request(send, "GET", URL)
+    assert resp.status == 200
+    assert limited.released
+    assert len(send.requests) == 2
+    assert send.requests[1][2] - send.requests[0][2] >= 0.015
+
+
+async def test_429_is_returned_after_max_retries():
+    limiter = RateLimiter(max_retries=1)
+    send = Sender(Response(429, {"Retry-After": "0"}), Response(429, {"Retry-After": "0"}))
+    resp = await limiter.request(send, "GET", URL)
+    assert resp.status == 429
+    assert len(send.requests) == 2
+
+
+async def test_global_429_delays_every_route():
+    limiter = RateLimiter(max_retries=0)
+    send = Sender(Response(429, {"Retry-After": "0.05", "X-RateLimit-Global": "true"}), Response(200))
+    # the first request isn't retried, but the global limit still applies to the next one.
+    assert (await limiter.request(send, "GET", URL)).status == 429
+    await limiter.request(send, "GET", "https://discord.com/api/v9/users/@me/guilds")
+    assert send.requests[1][2] - send.requests[0][2] >= 0.04
+
+
+async def test_requests_stay_under_fake_discord_limit(fake_discord):
+    from starlette_discord import DiscordOAuthClient
+
+    fake_discord.ratelimit = 2
+    fake_discord.ratelimit_window = 0.2
+    async with DiscordOAuthClient(1, "s", "http://localhost", api_url=fake_discord.url) as client:
+        session = client.user_session(await client._exchange("code"))
+        for _ in range(5):
+            await session.identify(use_cache=False)
+    assert fake_discord.statuses == {200: 6}
@@ -0,0 +1,95 @@
+import asyncio
+import time
+
+import pytest
+from oauthlib.oauth2 import InvalidGrantError
+
+from starlette_discord.refresher import TokenRefresher
+
+pytestmark = pytest.mark.anyio
+
+
+class Client:
+    """Stands in for DiscordOAuthClient, failing with the queued errors before succeeding."""
+
+    token_store = None
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = []
+        self.refreshed = asyncio.Event()
+
+    async def refresh(self, token, user_id=None):
+        self.calls.append(token["refresh_token"])
+        if self.errors:
+            raise self.errors.pop(0)
+        self.refreshed.set()
+        return {
+            "access_token": "new",
+            "refresh_token": "new-refresh",
+            "expires_at": time.time() + 3600,
+        }
+
+
+def make_token(expires_in):
+    return {"access_token": "old", "refresh_token": "old-refresh", "expires_at": time.time() + expires_in}
+
+
+async def run(refresher, until):
+    await refresher.start()
+    try:
+        await asyncio.wait_for(until(), 2)
+    finally:
+        await refresher.stop()
+
+
+async def test_due_token_is_refreshed_and_replaced():
+    client = Client()
+    refresher = TokenRefresher(client, margin=60)
+    refresher.register(make_token(30), key="user")
+
+    async def replaced():
+        while refresher.get("user")["access_token"] != "new":
+            await asyncio.sleep(0.005)
+
+    await run(refresher, replaced)
+    assert client.calls == ["old-refresh"]
+
+
+async def test_token_not_due_is_left_alone():
+    client = Client()
+    refresher = TokenRefresher(client, margin=60)
+    refresher.register(make_token(3600), key="user")
+    await refresher.start()
+    await asyncio.sleep(0.05)
+    await refresher.stop()
+    assert client.calls == []
+
+
+async def test_transient_failure_is_retried():
+    client = Client(ConnectionError("down"))
+    refresher = TokenRefresher(client, margin=60, retry_delay=0.01)
+    refresher.register(make_token(30), key="user")
+    await run(refresher, client.refreshed.wait)
+    assert client.calls == ["old-refresh", "old-refresh"]
+
+
+async def test_revoked_token_is_dropped():
+    client = Client(InvalidGrantError())
+    refresher = TokenRefresher(client, margin=60, retry_delay=0.01)
+    refresher.register(make_token(30), key="user")
+
+    async def dropped():
+        while "user" in refresher:
+            await asyncio.sleep(0.005)
+
+    await run(refresher, dropped)
+    assert client.calls == ["old-refresh"]
+
+
+def test_register_requires_refresh_token_and_expiry():
+    refresher = TokenRefresher(Client())
+    with pytest.raises(ValueError):
+        refresher.register({"access_token": "a", "expires_at": 1})
+    with pytest.raises(ValueError):
+        refresher.register({"access_token": "a", "refresh_token": "r"})
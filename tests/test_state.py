@@ -0,0 +1,69 @@
+import pytest
+
+from starlette_discord import DiscordOAuthClient
+from starlette_discord.state import StateSigner
+from starlette_discord.utils import urlsafe_b64decode, urlsafe_b64encode
+
+SECRET = b"s" * 32
+
+
+def tamper(value, index):
+    raw = bytearray(urlsafe_b64decode(value))
+    raw[index] ^= 1
+    return urlsafe_b64encode(bytes(raw))
+
+
+def test_issued_state_verifies():
+    signer = StateSigner(SECRET)
+    state = signer.issue()
+    assert len(state) == 43
+    assert signer.verify(state)
+
+
+@pytest.mark.parametrize("index", [0, 5, 16, -1])
+def test_tampered_state_is_rejected(index):
+    signer = StateSigner(SECRET)
+    assert not signer.verify(tamper(signer.issue(), index))
+
+
+def test_state_from_another_secret_is_rejected():
+    assert not StateSigner(SECRET).verify(StateSigner(b"t" * 32).issue())
+
+
+def test_bound_state_requires_the_same_value():
+    signer = StateSigner(SECRET)
+    state = signer.issue(bind="session-a")
+    assert signer.verify(state, bind="session-a")
+    assert not signer.verify(state, bind="session-b")
+    assert not signer.verify(state)
+
+
+def test_expired_state_is_rejected():
+    signer = StateSigner(SECRET, ttl=-1)
+    assert not signer.verify(signer.issue())
+
+
+@pytest.mark.parametrize("state", [None, "", "not base64!", "a" * 43, "a" * 100])
+def test_malformed_state_is_rejected(state):
+    assert not StateSigner(SECRET).verify(state)
+
+
+def test_client_states_must_be_bound():
+    client = DiscordOAuthClient(1, "secret", "http://localhost/callback", state_secret=SECRET)
+    with pytest.raises(ValueError):
+        client.new_state()
+    # a state the attacker got for their own session fails for the victim's.
+    state = client.new_state(bind="attacker-session")
+    assert client.verify_state(state, bind="attacker-session")
+    assert not client.verify_state(state, bind="victim-session")
+    with pytest.raises(ValueError):
+        client.verify_state(state, None)
+
+
+def test_client_without_a_secret_issues_random_states():
+    client = DiscordOAuthClient(1, "secret", "http://localhost/callback")
+    assert client.new_state() != client.new_state()
+    with pytest.raises(RuntimeError):
+        client.new_state(bind="session")
+    with pytest.raises(RuntimeError):
+        client.verify_state("state", bind="session")
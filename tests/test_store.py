@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+
+from starlette_discord import DiscordOAuthClient
+from starlette_discord.store import (
+    MemoryTokenStore,
+    SQLiteTokenStore,
+    TokenStore,
+    WriteBehindQueue,
+)
+
+pytestmark = pytest.mark.anyio
+
+TOKEN = {"access_token": "access", "refresh_token": "refresh", "expires_at": 1700000000}
+
+
+async def test_sqlite_store_persists_across_instances(tmp_path):
+    path = str(tmp_path / "tokens.db")
+    store = SQLiteTokenStore(path)
+    await store.set(1, TOKEN)
+    await store.set_many({2: {"access_token": "two"}, "3": {"access_token": "three"}})
+    await store.close()
+
+    store = SQLiteTokenStore(path)
+    try:
+        assert await store.get("1") == TOKEN
+        assert await store.get(3) == {"access_token": "three"}
+        await store.delete(2)
+        assert await store.get(2) is None
+    finally:
+        await store.close()
+
+
+async def test_sqlite_store_can_be_reopened(tmp_path):
+    store = SQLiteTokenStore(str(tmp_path / "tokens.db"))
+    await store.set(1, TOKEN)
+    await store.close()
+    await store.close()
+    assert await store.get(1) == TOKEN
+    await store.close()
+
+
+def test_sqlite_store_rejects_unsafe_table_names(tmp_path):
+    with pytest.raises(ValueError):
+        SQLiteTokenStore(str(tmp_path / "tokens.db"), table="tokens; DROP TABLE x")
+
+
+async def test_write_behind_queue_coalesces_writes():
+    store = MemoryTokenStore()
+    queue = WriteBehindQueue(store)
+    queue.put(1, {"access_token": "old"})
+    queue.put(1, {"access_token": "new"})
+    assert queue.get(1) == {"access_token": "new"}
+    assert await store.get(1) is None
+
+    await queue.flush()
+    assert len(queue) == 0
+    assert await store.get(1) == {"access_token": "new"}
+
+
+async def test_failed_flush_keeps_newer_writes():
+    class FailingStore(MemoryTokenStore):
+        async def set_many(self, tokens):
+            queue.put(1, {"access_token": "newer"})
+            raise RuntimeError("unavailable")
+
+    queue = WriteBehindQueue(FailingStore())
+    queue.put(1, {"access_token": "old"})
+    queue.put(2, {"access_token": "two"})
+    with pytest.raises(RuntimeError):
+        await queue.flush()
+    assert queue.get(1) == {"access_token": "newer"}
+    assert queue.get(2) == {"access_token": "two"}
+
+
+
+async def test_stop_during_a_flush_keeps_the_batch():
+    class SlowStore(MemoryTokenStore):
+        async def set_many(self, tokens):
+            started.set()
+            await asyncio.sleep(0.2)
+            await super().set_many(tokens)
+
+    started = asyncio.Event()
+    store = SlowStore()
+    queue = WriteBehindQueue(store, flush_interval=0)
+    await queue.start()
+    queue.put(1, {"access_token": "new"})
+    await started.wait()
+    await queue.stop()
+    assert await store.get(1) == {"access_token": "new"}
+    assert len(queue) == 0
+
+
+def test_token_store_requires_every_method():
+    class IncompleteStore(TokenStore):
+        async def get(self, user_id):
+            return None
+
+    with pytest.raises(TypeError):
+        IncompleteStore()
+
+async def test_client_lifespan_can_run_again(tmp_path):
+    store = SQLiteTokenStore(str(tmp_path / "tokens.db"))
+    client = DiscordOAuthClient(1, "secret", "http://localhost", token_store=store)
+    for user_id in range(3):
+        async with client:
+            await client.save_token(user_id, TOKEN)
+    async with client:
+        assert [await client.load_token(user_id) for user_id in range(3)] == [TOKEN] * 3
+
+
+async def test_shutdown_closes_transport_when_flush_fails(tmp_path):
+    class FailingStore(MemoryTokenStore):
+        async def set_many(self, tokens):
+            raise RuntimeError("unavailable")
+
+    client = DiscordOAuthClient(1, "secret", "http://localhost", token_store=FailingStore())
+    await client.startup()
+    http = client.http
+    client._token_writes.put(1, TOKEN)
+    with pytest.raises(RuntimeError):
+        await client.shutdown()
+    assert http.closed
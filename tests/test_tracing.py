@@ -0,0 +1,84 @@
+import socket
+
+import aiohttp
+import pytest
+
+from starlette_discord import DiscordOAuthClient
+from starlette_discord.metrics import Metrics
+from starlette_discord.tracing import RequestTimings, RequestTracer
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def traced_client(fake_discord):
+    client = DiscordOAuthClient(
+        1,
+        "secret",
+        "http://localhost/callback",
+        api_url=fake_discord.url,
+        metrics=Metrics(),
+        trace_requests=True,
+    )
+    async with client:
+        yield client
+
+
+async def test_timings_of_new_and_reused_connections(traced_client):
+    recorded = []
+    traced_client.tracer.add_callback(recorded.append)
+    session = traced_client.user_session(await traced_client._exchange("code"))
+    await session.identify(use_cache=False)
+    await session.identify(use_cache=False)
+
+    # the exchange opened the connection, both identify requests reused it.
+    exchange, first, second = recorded
+    assert exchange.reused is False
+    assert exchange.connect is not None and exchange.connect >= 0
+    assert first.reused is True and second.reused is True
+    assert first.connect is None
+    for timings in recorded:
+        assert timings.status == 200
+        assert 0 <= timings.ttfb <= timings.total
+    assert first.method == "GET" and first.url.endswith("/users/@me")
+
+    metrics = traced_client.metrics
+    assert metrics.get("discord_connections_total", reused="false") == 1
+    assert metrics.get("discord_connections_total", reused="true") == 2
+    assert metrics.get("discord_connect_seconds") == 1
+    assert metrics.get("discord_ttfb_seconds", route="GET /api/v9/users/@me") == 2
+
+
+async def test_errors_carry_timings(traced_client):
+    session = traced_client.user_session({"access_token": "revoked"})
+    with pytest.raises(aiohttp.ClientResponseError) as info:
+        await session.identify()
+    assert isinstance(info.value.timings, RequestTimings)
+    assert info.value.timings.status == 401
+
+
+async def test_connection_errors_carry_timings():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    tracer = RequestTracer()
+    async with aiohttp.ClientSession(trace_configs=[tracer.trace_config]) as http:
+        with pytest.raises(aiohttp.ClientConnectionError) as info:
+            await http.get(f"http://127.0.0.1:{port}/")
+    timings = info.value.timings
+    assert timings.status is None
+    assert timings.ttfb is None
+    assert timings.total >= 0
+
+
+async def test_failing_callback_is_logged(traced_client, caplog):
+    def fail(timings):
+        raise RuntimeError("callback failed")
+
+    recorded = []
+    traced_client.tracer.add_callback(fail)
+    traced_client.tracer.add_callback(recorded.append)
+    await traced_client._exchange("code")
+    assert len(recorded) == 1
+    assert "callback failed" in caplog.text
+    traced_client.tracer.remove_callback(fail)
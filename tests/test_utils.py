@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from starlette_discord.utils import SingleFlight
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_single_flight_shares_concurrent_calls():
+    flight = SingleFlight()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    results = await asyncio.gather(*(flight.run("key", work) for _ in range(5)))
+    assert results == [1] * 5
+    assert calls == 1
+    assert "key" not in flight
+
+
+async def test_single_flight_survives_cancelled_waiter():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def work():
+        await release.wait()
+        return "done"
+
+    first = asyncio.ensure_future(flight.run("key", work))
+    second = asyncio.ensure_future(flight.run("key", work))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert await second == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+
+async def test_single_flight_shares_exceptions_and_forgets_them():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0)
+        raise RuntimeError("boom")
+
+    results = await asyncio.gather(
+        flight.run("key", fail), flight.run("key", fail), return_exceptions=True
+    )
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert len(flight) == 0